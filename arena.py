@@ -0,0 +1,281 @@
+import colorsys
+import math
+import random
+
+from engine import (MatchConfig, MatchResult, HealthPickup, InvincibilityPickup, Pickup,
+                    random_spawn, rand_point_in_arena)
+from fighter import Fighter
+from spatial import SpatialHash
+
+ARENA_FILL = 0.15   # share of the arena the crowd covers when fighters are auto-sized
+
+
+def crowd_config(n, config=None):
+    """MatchConfig with fighters shrunk so n of them fit the arena"""
+    c = config or MatchConfig()
+    _, _, aw, ah = c.arena
+    size = max(6, min(c.fighter_width, int(math.sqrt(ARENA_FILL * aw * ah / n))))
+    return c.copy(fighter_width=size, fighter_height=size)
+
+
+def fighter_colors(n):
+    """n evenly spread, fully saturated colours"""
+    return [tuple(int(255 * v) for v in colorsys.hsv_to_rgb(i / n, 0.85, 1.0)) for i in range(n)]
+
+
+class ArenaMatch:
+    """Free-for-all round for any number of fighters, last one standing wins.
+
+    Same per-frame rules as engine.Match -- wall bounces, pickups, contact
+    reverses both fighters and costs each of them `damage` -- generalised
+    from RED vs BLUE to n fighters. Fighter contacts and pickup grabs go
+    through a SpatialHash broadphase, so a frame costs roughly O(n).
+
+    A fighter touching several others reverses once but takes damage for
+    every contact. KO'd fighters leave the arena.
+
+    fighters="arrays" keeps the crowd in a fighter_store.FighterStore
+    (needs NumPy) and moves, ticks and damages everyone in bulk; .fighters
+    then holds FighterViews. Both backends play out identically for a seed.
+
+    Events name fighters by index:
+
+        ("pickup_spawn", kind, cx, cy)
+        ("pickup_expired", kind, cx, cy)
+        ("pickup_taken", kind, cx, cy, i)
+        ("collision", i, j, dmg_i, dmg_j, (cx, cy))
+        ("ko", i)
+        ("round_over", winner)      # index of the survivor, or None
+    """
+
+    def __init__(self, n, config=None, seed=None, rng=None, spawns=None, fighters="objects"):
+        if n < 2:
+            raise ValueError("an arena needs at least two fighters")
+        if fighters not in ("objects", "arrays"):
+            raise ValueError(f"unknown fighter backend {fighters!r}")
+        self.n = n
+        self.config = c = config or crowd_config(n)
+        self.seed = seed
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.grid = SpatialHash(max(c.fighter_width, c.fighter_height, 2 * Pickup.RADIUS))
+        colors = fighter_colors(n)
+        starts = []
+        for i in range(n):
+            x, y = spawns[i] if spawns is not None else random_spawn(self.rng, c)
+            dx = c.dx * self.rng.choice((-1, 1)); dy = c.dy * self.rng.choice((-1, 1))
+            starts.append((x, y, dx, dy))
+        if fighters == "arrays":
+            from fighter_store import FighterStore
+            self.store = FighterStore(starts, colors, c.fighter_width, c.fighter_height,
+                                      c.health, *c.arena)
+            self.fighters = self.store.views
+        else:
+            self.store = None
+            self.fighters = [Fighter(x, y, dx, dy, c.fighter_width, c.fighter_height,
+                                     colors[i], c.health, *c.arena)
+                             for i, (x, y, dx, dy) in enumerate(starts)]
+        self.alive = list(range(n))
+        self.pickups = []
+        self.pickup_cooldown = c.pickup_start_cooldown
+        self.frame = 0
+        self.over = False
+        self.winner = None
+        self.timed_out = False
+        self.stats = {
+            "collisions": 0,
+            "pickups_spawned": 0,
+            "fighters": [{"damage_taken": 0, "healed": 0, "pickups": 0} for _ in range(n)],
+        }
+
+    def step(self):
+        """Advance one frame and return the list of events it produced"""
+        events = []
+        self.frame += 1
+        store = self.store
+        fighters = self.fighters
+        if store is not None:
+            store.move(); store.update_effects(); store.ease_health()
+        else:
+            for i in self.alive:
+                fighters[i].move(); fighters[i].update_effects()
+            for f in fighters:   # health bars of the fallen still run down
+                f.update_health_bar_value()
+        if self.over:
+            self._age_pickups(events)
+            return events
+
+        c = self.config
+        grid = self.grid
+        grid.clear()
+        if store is not None:
+            xs, ys = store.x.tolist(), store.y.tolist()
+            for i in self.alive:
+                grid.insert(i, xs[i], ys[i], c.fighter_width, c.fighter_height)
+        else:
+            for i in self.alive:
+                f = fighters[i]
+                grid.insert(i, f.x, f.y, f.width, f.height)
+
+        self._maybe_spawn_pickup(events)
+        self._age_pickups(events)
+        self._resolve_pickup_collisions(events)
+
+        pairs = grid.pairs()
+        if pairs:
+            if store is not None:
+                self._collide_arrays(pairs, events)
+            else:
+                self._collide_objects(pairs, events)
+
+        if len(self.alive) <= 1:
+            self._finish(self.alive[0] if self.alive else None, events)
+        elif self.frame >= c.max_frames:
+            self.timed_out = True
+            self._finish(None, events)
+        return events
+
+    # --- contacts ---
+    def _collide_objects(self, pairs, events):
+        c = self.config
+        fighters = self.fighters
+        hit = set()
+        for i, j in pairs:
+            a, b = fighters[i], fighters[j]
+            di = a.take_damage(c.damage); dj = b.take_damage(c.damage)
+            self.stats["collisions"] += 1
+            self.stats["fighters"][i]["damage_taken"] += di
+            self.stats["fighters"][j]["damage_taken"] += dj
+            cx = (max(a.x, b.x) + min(a.x + a.width, b.x + b.width)) // 2
+            cy = (max(a.y, b.y) + min(a.y + a.height, b.y + b.height)) // 2
+            events.append(("collision", i, j, di, dj, (cx, cy)))
+            hit.add(i); hit.add(j)
+        for i in sorted(hit):
+            fighters[i].dx *= -1; fighters[i].dy *= -1
+
+        dead = [i for i in self.alive if fighters[i].health <= 0]
+        if dead:
+            for i in dead: events.append(("ko", i))
+            self.alive = [i for i in self.alive if fighters[i].health > 0]
+
+    def _collide_arrays(self, pairs, events):
+        """_collide_objects for a FighterStore: every contact's damage and
+        every reversal applied in one go"""
+        c = self.config
+        s = self.store
+        flat = [k for pair in pairs for k in pair]
+        dealt = s.damage(flat, c.damage).tolist()
+        # equal sizes, so the overlap's centre is the midpoint of the two boxes
+        xs = s.x[flat].tolist(); ys = s.y[flat].tolist()
+        side = self.stats["fighters"]
+        for k, (i, j) in enumerate(pairs):
+            di, dj = dealt[2 * k], dealt[2 * k + 1]
+            side[i]["damage_taken"] += di
+            side[j]["damage_taken"] += dj
+            cx = (xs[2 * k] + xs[2 * k + 1] + c.fighter_width) // 2
+            cy = (ys[2 * k] + ys[2 * k + 1] + c.fighter_height) // 2
+            events.append(("collision", i, j, di, dj, (cx, cy)))
+        self.stats["collisions"] += len(pairs)
+        hit = sorted(set(flat))
+        s.dx[hit] *= -1; s.dy[hit] *= -1
+
+        dead = (s.alive & (s.health <= 0)).nonzero()[0]
+        if len(dead):
+            s.kill(dead)
+            dead = dead.tolist()
+            for i in dead: events.append(("ko", i))
+            dead = set(dead)
+            self.alive = [i for i in self.alive if i not in dead]
+
+    def run(self):
+        """Step until one fighter is left (or max_frames) and return the MatchResult"""
+        while not self.over:
+            self.step()
+        return self.result()
+
+    def result(self):
+        return MatchResult(self.winner, self.frame, self.stats, self.timed_out)
+
+    def _finish(self, winner, events):
+        self.over = True
+        self.winner = winner
+        events.append(("round_over", winner))
+
+    # --- pickups ---
+    def _maybe_spawn_pickup(self, events):
+        c = self.config
+        if self.pickup_cooldown > 0:
+            self.pickup_cooldown -= 1; return
+        if len(self.pickups) >= c.max_pickups: return
+        if self.rng.random() >= c.pickup_chance: return
+        cx, cy = rand_point_in_arena(Pickup.RADIUS, self.rng, c)
+        kind = self.rng.choice(["health", "inv"])
+        if kind == "health":
+            pk = HealthPickup(cx, cy, c.pickup_lifetime, amount=c.damage)
+        else:
+            pk = InvincibilityPickup(cx, cy, c.pickup_lifetime, frames=c.invincibility_frames)
+        self.pickups.append(pk)
+        self.pickup_cooldown = c.pickup_cooldown
+        self.stats["pickups_spawned"] += 1
+        events.append(("pickup_spawn", pk.KIND, cx, cy))
+
+    def _age_pickups(self, events):
+        for pk in self.pickups: pk.update()
+        if any(pk.dead for pk in self.pickups):
+            for pk in self.pickups:
+                if pk.dead: events.append(("pickup_expired", pk.KIND, pk.cx, pk.cy))
+            self.pickups = [pk for pk in self.pickups if not pk.dead]
+
+    def _resolve_pickup_collisions(self, events):
+        kept = []
+        for p in self.pickups:
+            hits = self.grid.query(*p.rect)
+            if not hits:
+                kept.append(p); continue
+            i = hits[0] if len(hits) == 1 else self.rng.choice(hits)
+            target = self.fighters[i]
+            before = target.health
+            p.apply(target)
+            side = self.stats["fighters"][i]
+            side["pickups"] += 1
+            side["healed"] += target.health - before
+            events.append(("pickup_taken", p.KIND, p.cx, p.cy, i))
+        self.pickups = kept
+
+
+def simulate_arena(n, config=None, seed=None, fighters="objects"):
+    """Play one n-fighter free-for-all and return its MatchResult"""
+    return ArenaMatch(n, config, seed=seed, fighters=fighters).run()
+
+
+def view(n, seed=None, fighters="objects"):
+    """Watch a free-for-all in a window"""
+    import pygame
+    from engine import ARENA_X, ARENA_Y, ARENA_WIDTH, ARENA_HEIGHT
+    pygame.init()
+    screen = pygame.display.set_mode((600, 400))
+    clock = pygame.time.Clock()
+    match = ArenaMatch(n, seed=seed, fighters=fighters)
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+        match.step()
+        screen.fill("black")
+        pygame.draw.rect(screen, "white", (ARENA_X-5, ARENA_Y-5, ARENA_WIDTH+10, ARENA_HEIGHT+10))
+        pygame.draw.rect(screen, "black", (ARENA_X, ARENA_Y, ARENA_WIDTH, ARENA_HEIGHT))
+        for pk in match.pickups: pk.draw(screen)
+        for i in match.alive: match.fighters[i].draw(screen)
+        status = f"winner {match.winner}" if match.over else f"{len(match.alive)} left"
+        pygame.display.set_caption(f"HitBox arena  frame {match.frame}  {status}  {clock.get_fps():.0f} fps")
+        pygame.display.flip()
+        clock.tick(60)
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    import sys
+    args = [a for a in sys.argv[1:] if a != "--arrays"]
+    view(int(args[0]) if len(args) > 0 else 100,
+         int(args[1]) if len(args) > 1 else None,
+         fighters="arrays" if "--arrays" in sys.argv else "objects")
@@ -0,0 +1,103 @@
+import os
+import runpy
+import sys
+
+import pygame
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TICK_MS = 1000.0 / 60
+
+
+class FixedClock:
+    """Stand-in for pygame.time.Clock: every frame is exactly one simulation
+    tick and nothing ever sleeps"""
+
+    def tick(self, *args):
+        return TICK_MS
+
+    def get_fps(self):
+        return 60.0
+
+
+def play(seconds=None, rounds=None, on_frame=None, bet="RED"):
+    """Run main.py's real loop with scripted input and no frame cap.
+
+    The script presses through the splash screen, bets on `bet`, and picks
+    Play Again after every round. It quits `seconds` of game time after the
+    first round starts, or once `rounds` rounds have reached their game-over
+    menu. on_frame(screen, frame) is called for every presented frame from
+    the first round on, the last one included. Returns the number of such
+    frames.
+
+    main.py ends with pygame.quit(), so re-initialise pygame before drawing
+    anything else afterwards.
+    """
+    if seconds is None and rounds is None:
+        raise ValueError("give seconds or rounds")
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    limit = None if seconds is None else int(seconds * 60)
+    run = {"frame": 0, "from": None, "rounds": 0, "in_round": False}
+    real_get = pygame.event.get
+
+    def scripted_events():
+        g = sys.modules["__main__"].__dict__   # the running main.py's globals
+        state = g["state"]
+        call = run["frame"]
+        run["frame"] += 1
+        if run["from"] is None:
+            if state == g["STATE_PLAYING"]:
+                run["from"] = call
+        elif on_frame is not None:
+            # the previous frame has been presented; the screen still holds it
+            on_frame(g["screen"], call - run["from"] - 1)
+
+        events = list(real_get())
+        if state == g["STATE_GAMEOVER_TRANS"] and not run["in_round"]:
+            run["rounds"] += 1
+        run["in_round"] = state == g["STATE_GAMEOVER_TRANS"]
+        done_rounds = rounds is not None and run["rounds"] >= rounds
+        if not g["transition"].active:
+            box = g["RED_BOX_RECT"] if bet == "RED" else g["BLUE_BOX_RECT"]
+            if state == g["STATE_SPLASH"]:
+                events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RETURN))
+            elif state == g["STATE_SELECT"]:
+                events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=box.center))
+            elif state == g["STATE_GAMEOVER"] and g["go_menu_alpha"] >= 255:
+                if done_rounds:
+                    events.append(pygame.event.Event(pygame.QUIT))
+                else:
+                    g["gameover_menu_index"] = 0   # "Play Again"
+                    events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RETURN))
+        # the frame this call starts is still presented, and handed over by
+        # quit() below, so quitting here leaves exactly `limit` frames
+        if limit is not None and run["from"] is not None and call - run["from"] >= limit - 1:
+            events.append(pygame.event.Event(pygame.QUIT))
+        return events
+
+    def pointer():
+        g = sys.modules["__main__"].__dict__
+        return (g["RED_BOX_RECT"] if bet == "RED" else g["BLUE_BOX_RECT"]).center
+
+    real_quit = pygame.quit
+
+    def quit():
+        # the loop presents one last frame after the QUIT event; deliver it
+        # while the display still exists
+        if on_frame is not None and run["from"] is not None:
+            on_frame(sys.modules["__main__"].__dict__["screen"], run["frame"] - 1 - run["from"])
+        real_quit()
+
+    saved = pygame.event.get, pygame.mouse.get_pos, pygame.time.Clock, pygame.quit
+    cwd = os.getcwd()
+    pygame.event.get = scripted_events
+    pygame.mouse.get_pos = pointer
+    pygame.time.Clock = FixedClock
+    pygame.quit = quit
+    os.chdir(HERE)  # fonts and assets load from relative paths
+    try:
+        runpy.run_path(os.path.join(HERE, "main.py"), run_name="__main__")
+    finally:
+        os.chdir(cwd)
+        pygame.event.get, pygame.mouse.get_pos, pygame.time.Clock, pygame.quit = saved
+    return 0 if run["from"] is None else run["frame"] - run["from"]
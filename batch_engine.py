@@ -0,0 +1,252 @@
+import numpy as np
+from engine import MatchConfig, Pickup
+
+# Winner codes used in BatchResult.winners
+DRAW = 0
+RED = 1
+BLUE = 2
+WINNER_NAMES = {DRAW: None, RED: "RED", BLUE: "BLUE"}
+
+PICKUP_HEALTH = 0
+PICKUP_INV = 1
+
+# Rows stepped together; small enough for the working set to stay in cache
+DEFAULT_WIDTH = 16384
+
+STATE = np.int16   # positions, speeds, health and timers all fit comfortably
+
+
+class BatchResult:
+    """Outcome of every round in a batch, indexed by round number"""
+
+    def __init__(self, winners, frames, timed_out):
+        self.winners = winners        # int8 array of DRAW / RED / BLUE
+        self.frames = frames          # frame on which each round was decided
+        self.timed_out = timed_out    # rounds that hit config.max_frames
+
+    def __len__(self):
+        return len(self.winners)
+
+    def counts(self):
+        """Number of RED wins, BLUE wins and draws"""
+        c = np.bincount(self.winners, minlength=3)
+        return {"RED": int(c[RED]), "BLUE": int(c[BLUE]), "DRAW": int(c[DRAW])}
+
+    def winner(self, i):
+        return WINNER_NAMES[int(self.winners[i])]
+
+
+class BatchMatch:
+    """N independent RED vs BLUE rounds stepped together as NumPy arrays.
+
+    Every step applies the same per-frame rules as engine.Match (Fighter.move
+    wall bounces, invincibility timers, pickup spawn/expiry/collection, AABB
+    contact with velocity reversal and take_damage) to a block of rounds at
+    once. Fighter state is stored as (2, width) arrays with row 0 = RED and
+    row 1 = BLUE; each round holds at most one pickup, like the arcade game.
+
+    Round lengths vary a lot (a few hundred frames up to max_frames), so a
+    row whose round ends is immediately restarted with the next pending
+    round instead of idling until the slowest round of the block is done.
+
+    Only the random draws differ from the scalar engine: rounds that never
+    roll for a pickup finish exactly like Match from the same spawns, and a
+    single row makes its pickup draws in Match's order, so the two agree
+    round for round when fed the same stream.
+    """
+
+    def __init__(self, n, config=None, seed=None, rng=None, spawns=None, width=DEFAULT_WIDTH):
+        self.config = c = config or MatchConfig()
+        if c.max_pickups != 1:
+            raise ValueError("BatchMatch supports exactly one active pickup per round")
+        if any(int(v) != v for v in (c.dx, c.dy, c.fighter_width, c.fighter_height, *c.arena)):
+            raise ValueError("BatchMatch needs integer speeds and arena geometry")
+        self.n = n
+        self.rng = rng if rng is not None else np.random.default_rng(seed)
+        # ((x1, y1), (x2, y2)) shared by all rounds, or an (n, 2, 2) array
+        self.spawns = None if spawns is None else np.broadcast_to(np.asarray(spawns), (n, 2, 2))
+
+        self.winners = np.zeros(n, dtype=np.int8)
+        self.end_frames = np.zeros(n, dtype=np.int32)
+        self.timed_out = np.zeros(n, dtype=bool)
+
+        w = min(n, width)
+        self.x = np.zeros((2, w), dtype=STATE)
+        self.y = np.zeros((2, w), dtype=STATE)
+        self.dx = np.zeros((2, w), dtype=STATE)
+        self.dy = np.zeros((2, w), dtype=STATE)
+        self.health = np.zeros((2, w), dtype=STATE)
+        self.inv_timer = np.zeros((2, w), dtype=STATE)
+        self.inv = np.zeros((2, w), dtype=bool)
+
+        self.pk_active = np.zeros(w, dtype=bool)
+        self.pk_x = np.zeros(w, dtype=STATE)         # pickup centre
+        self.pk_y = np.zeros(w, dtype=STATE)
+        self.pk_kind = np.zeros(w, dtype=np.int8)
+        self.pk_age = np.zeros(w, dtype=STATE)
+        self.cooldown = np.zeros(w, dtype=STATE)
+
+        self.ids = np.zeros(w, dtype=np.int64)       # round number held by each row
+        self.frame = np.zeros(w, dtype=np.int32)     # frames played in that round
+        self.next_id = 0
+        self._start(np.arange(w))
+
+    @property
+    def remaining(self):
+        """Rounds not decided yet, including ones not started"""
+        return len(self.ids) + self.n - self.next_id
+
+    def _start(self, rows):
+        """Load the next pending rounds into the given rows"""
+        c = self.config
+        k = len(rows)
+        ids = np.arange(self.next_id, self.next_id + k)
+        self.next_id += k
+        self.ids[rows] = ids
+        ax, ay, aw, ah = c.arena
+        if self.spawns is None:
+            # Same ranges as engine.random_spawn
+            self.x[:, rows] = self.rng.integers(ax, ax + aw - c.fighter_width + 1, size=(2, k))
+            self.y[:, rows] = self.rng.integers(ay, ay + ah - c.fighter_height + 1, size=(2, k))
+        else:
+            sp = self.spawns[ids]
+            self.x[:, rows] = sp[:, :, 0].T
+            self.y[:, rows] = sp[:, :, 1].T
+        self.dx[0, rows] = c.dx; self.dx[1, rows] = -c.dx
+        self.dy[0, rows] = c.dy; self.dy[1, rows] = -c.dy
+        self.health[:, rows] = c.health
+        self.inv_timer[:, rows] = 0
+        self.inv[:, rows] = False
+        self.pk_active[rows] = False
+        self.cooldown[rows] = c.pickup_start_cooldown
+        self.frame[rows] = 0
+
+    def step(self):
+        """Advance every row one frame and return the rows whose round ended"""
+        c = self.config
+        ax, ay, aw, ah = c.arena
+        w, h = c.fighter_width, c.fighter_height
+        x, y, dx, dy = self.x, self.y, self.dx, self.dy
+        self.frame += 1
+
+        # Fighter.move; bounces and contacts touch few rows, so they are
+        # applied through index lists rather than masked ufuncs
+        x += dx; y += dy
+        flip = np.flatnonzero((x <= ax) | (x >= ax + aw - w))
+        if len(flip): dx.flat[flip] *= -1
+        flip = np.flatnonzero((y <= ay) | (y >= ay + ah - h))
+        if len(flip): dy.flat[flip] *= -1
+
+        # Fighter.update_effects (invincibility part)
+        np.greater(self.inv_timer, 0, out=self.inv)
+        self.inv_timer -= self.inv
+
+        self._pickups()
+
+        # Fighter vs fighter AABB contact, as pygame.Rect.colliderect
+        hit = np.flatnonzero((np.abs(x[0] - x[1]) < w) & (np.abs(y[0] - y[1]) < h))
+        if len(hit):
+            dx[:, hit] *= -1
+            dy[:, hit] *= -1
+            if c.damage > 0:
+                hp = self.health[:, hit]
+                hurt = ~self.inv[:, hit]
+                hp[hurt] = np.maximum(hp[hurt] - c.damage, 0)
+                self.health[:, hit] = hp
+
+        dead = self.health <= 0
+        ended = dead[0] | dead[1]
+        timeout = self.frame >= c.max_frames
+        ended |= timeout
+        rows = np.flatnonzero(ended)
+        if len(rows):
+            d0 = dead[0, rows]; d1 = dead[1, rows]
+            ids = self.ids[rows]
+            self.winners[ids] = np.where(d0, np.where(d1, DRAW, BLUE), np.where(d1, RED, DRAW))
+            self.end_frames[ids] = self.frame[rows]
+            self.timed_out[ids] = timeout[rows] & ~d0 & ~d1
+        return rows
+
+    def _pickups(self):
+        c = self.config
+        R = Pickup.RADIUS
+        ax, ay, aw, ah = c.arena
+        w, h = c.fighter_width, c.fighter_height
+
+        # maybe_spawn_pickup: cooldown first, then one roll per free round
+        cooling = self.cooldown > 0
+        self.cooldown -= cooling
+        free = np.flatnonzero(~(cooling | self.pk_active))
+        if len(free):
+            spawn = free[self.rng.random(len(free)) < c.pickup_chance]
+            k = len(spawn)
+            if k:
+                self.pk_x[spawn] = self.rng.integers(ax + R, ax + aw - R + 1, size=k)
+                self.pk_y[spawn] = self.rng.integers(ay + R, ay + ah - R + 1, size=k)
+                self.pk_kind[spawn] = self.rng.integers(0, 2, size=k)
+                self.pk_age[spawn] = 0
+                self.pk_active[spawn] = True
+                self.cooldown[spawn] = c.pickup_cooldown
+
+        # Pickup.update and expiry
+        self.pk_age += self.pk_active
+        self.pk_active &= self.pk_age < c.pickup_lifetime
+
+        # resolve_pickup_collisions
+        px = self.pk_x - R; py = self.pk_y - R
+        touch = ((self.x < px + 2 * R) & (px < self.x + w) &
+                 (self.y < py + 2 * R) & (py < self.y + h) & self.pk_active)
+        taken = touch[0] | touch[1]
+        rows = np.flatnonzero(taken)
+        if not len(rows):
+            return
+        touch = touch[:, rows]
+        both = touch[0] & touch[1]
+        red_wins_tie = np.zeros(len(rows), dtype=bool)
+        if both.any():
+            red_wins_tie[both] = self.rng.random(int(both.sum())) < 0.5
+        to_red = (touch[0] & ~touch[1]) | (both & red_wins_tie)
+        side = np.where(to_red, 0, 1)
+
+        heal = self.pk_kind[rows] == PICKUP_HEALTH
+        if c.damage > 0 and heal.any():
+            s, r = side[heal], rows[heal]
+            self.health[s, r] = np.minimum(c.health, self.health[s, r] + c.damage)
+        inv = ~heal
+        if inv.any():
+            s, r = side[inv], rows[inv]
+            self.inv_timer[s, r] = np.maximum(self.inv_timer[s, r], c.invincibility_frames)
+            self.inv[s, r] = True
+        self.pk_active[rows] = False
+
+    def _drop(self, rows):
+        """Remove finished rows once there are no rounds left to load"""
+        keep = np.ones(len(self.ids), dtype=bool)
+        keep[rows] = False
+        for name in ("x", "y", "dx", "dy", "health", "inv_timer", "inv"):
+            setattr(self, name, np.ascontiguousarray(getattr(self, name)[:, keep]))
+        for name in ("pk_active", "pk_x", "pk_y", "pk_kind", "pk_age", "cooldown", "ids", "frame"):
+            setattr(self, name, getattr(self, name)[keep])
+
+    def run(self):
+        """Step until every round has a winner (or hit max_frames)"""
+        while len(self.ids):
+            done = self.step()
+            if not len(done):
+                continue
+            pending = self.n - self.next_id
+            if pending:
+                refill = done[:pending]
+                self._start(refill)
+                done = done[len(refill):]
+            if len(done):
+                self._drop(done)
+        return self.result()
+
+    def result(self):
+        return BatchResult(self.winners, self.end_frames, self.timed_out)
+
+
+def simulate_batch(n, config=None, seed=None, spawns=None):
+    """Run n independent rounds and return their BatchResult"""
+    return BatchMatch(n, config, seed=seed, spawns=spawns).run()
@@ -0,0 +1,303 @@
+"""Headless benchmarks for HitBox's hot paths.
+
+    python bench.py                  run everything, print a table
+    python bench.py --save-baseline  store the results in bench_baseline.json
+    python bench.py --compare        run again and exit 1 on regressions
+
+Timings only mean something against a baseline from the same machine, so
+none is committed: the first --compare run on a machine finds no baseline,
+saves its own results as one and exits 0; later runs compare against it.
+"""
+import json
+import os
+import platform
+import sys
+import time
+
+# Headless and reproducible: no window, no sound, no frame-time governor
+HERE = os.path.dirname(os.path.abspath(__file__))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ["HITBOX_PARTICLE_BUDGET"] = "0"
+# First round of this session ends ~36 s in, so the scripted match covers a KO
+# explosion, the game-over blur, Play Again and the start of a second round
+os.environ["HITBOX_SEED"] = "168"
+os.chdir(HERE)  # fonts and assets load from relative paths
+sys.path.insert(0, HERE)
+
+import pygame
+
+BASELINE_PATH = "bench_baseline.json"
+MIN_TIME = 0.5          # seconds of samples per benchmark
+MIN_SAMPLES = 5
+MAX_SAMPLES = 20000
+TOLERANCE = 0.15        # slower than baseline by more than this = regression
+MATCH_SECONDS = 60
+LONG_LIFE = 10 ** 9     # particles that never die while being measured
+
+PARTICLE_COUNTS = {"100": 100, "1k": 1000, "10k": 10000}
+PARTICLE_TYPES = ("normal", "spark", "explosion", "trail")
+
+
+# === Measurement ===
+def summarize(samples, items=1, unit="call"):
+    """Latency percentiles (ms) and throughput (items/s) of per-call samples"""
+    s = sorted(samples)
+    n = len(s)
+    mean = sum(s) / n
+    return {
+        "samples": n,
+        "unit": unit,
+        "items": items,
+        "mean_ms": mean * 1000,
+        "p50_ms": s[n // 2] * 1000,
+        "p95_ms": s[min(n - 1, int(n * 0.95))] * 1000,
+        "p99_ms": s[min(n - 1, int(n * 0.99))] * 1000,
+        "max_ms": s[-1] * 1000,
+        "throughput": items / mean if mean > 0 else 0.0,
+    }
+
+
+def measure(fn, items=1, unit="call", min_time=MIN_TIME):
+    """Call fn repeatedly for at least min_time seconds, timing each call"""
+    fn()  # warm caches
+    clock = time.perf_counter
+    samples = []
+    start = clock()
+    while len(samples) < MAX_SAMPLES and (len(samples) < MIN_SAMPLES or clock() - start < min_time):
+        t = clock()
+        fn()
+        samples.append(clock() - t)
+    return summarize(samples, items, unit)
+
+
+# === Benchmarks ===
+# Each setup returns (fn, items per call, unit); setups get the imported game.
+BENCHMARKS = []
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+def _filled_particles(backend, n):
+    from engine import ARENA_X, ARENA_Y, ARENA_WIDTH, ARENA_HEIGHT
+    bounds = (ARENA_X, ARENA_Y, ARENA_WIDTH, ARENA_HEIGHT)
+    cx, cy = ARENA_X + ARENA_WIDTH // 2, ARENA_Y + ARENA_HEIGHT // 2
+    if backend == "array":
+        from particle_arrays import ArrayParticleSystem
+        ps = ArrayParticleSystem(bounds, capacity=n, seed=1)
+        for k in range(n):
+            ps._emit(cx, cy, (255, 160, 60), 8, 8, LONG_LIFE, PARTICLE_TYPES[k % 4], 1)
+    else:
+        import random
+        from particles import ParticleSystem
+        ps = ParticleSystem(bounds, capacity=n, rng=random.Random(1))
+        for k in range(n):
+            ps._spawn(1, cx, cy, (255, 160, 60), 8, 8, LONG_LIFE, PARTICLE_TYPES[k % 4])
+    return ps
+
+
+def _particle_benchmarks(backend):
+    for label, n in PARTICLE_COUNTS.items():
+        def update(game, n=n):
+            ps = _filled_particles(backend, n)
+            return ps.update, n, "particles"
+
+        def draw(game, n=n):
+            ps = _filled_particles(backend, n)
+            for _ in range(10):
+                ps.update()  # spread them out
+            return (lambda: ps.draw(game.screen)), n, "particles"
+
+        benchmark(f"particles.{backend}.update.{label}")(update)
+        benchmark(f"particles.{backend}.draw.{label}")(draw)
+
+
+_particle_benchmarks("objects")
+try:
+    import numpy  # noqa: F401  (array backend is optional)
+    _particle_benchmarks("array")
+except ImportError:
+    pass
+
+
+@benchmark("fighter.move_update_effects")
+def _fighters_move(game):
+    from engine import MatchConfig, random_spawn
+    from fighter import Fighter
+    import random
+    c = MatchConfig()
+    rng = random.Random(1)
+    fighters = [Fighter(*random_spawn(rng, c), c.dx, c.dy, c.fighter_width, c.fighter_height,
+                        (255, 0, 0), c.health, *c.arena) for _ in range(100)]
+
+    def step():
+        for f in fighters:
+            f.move(); f.update_effects()
+    return step, len(fighters), "fighter-ticks"
+
+
+@benchmark("fighter.draw_trail")
+def _fighter_trail(game):
+    from engine import MatchConfig
+    from fighter import Fighter
+    c = MatchConfig()
+    f = Fighter(200, 150, c.dx, c.dy, c.fighter_width, c.fighter_height,
+                (255, 0, 0), c.health, *c.arena)
+    for _ in range(30):
+        f.move(); f.update_effects()
+    return (lambda: f._draw_trail(game.screen)), 1, "call"
+
+
+@benchmark("transition.checker_phase")
+def _transition(game):
+    steps = [(k / 24, invert) for invert in (False, True) for k in range(25)]
+    state = {"i": 0}
+
+    def draw():
+        p, invert = steps[state["i"]]
+        state["i"] = (state["i"] + 1) % len(steps)
+        game.transition._draw_checker_phase(game.screen, p, invert)
+    for _ in steps:
+        draw()  # both checkerboards are built once per run; time the blits
+    return draw, 1, "call"
+
+
+@benchmark("fast_blur")
+def _blur(game):
+    return (lambda: game.fast_blur(game.screen)), 1, "call"
+
+
+@benchmark("gameover_overlay")
+def _gameover(game):
+    game.result_text = "YOU WON"
+    game.gameover_backdrop.reset()
+    # mid-fade: blurs the live frame every call, the expensive case
+    return (lambda: game.draw_gameover_overlay(game.screen, 0.5, False, 0)), 1, "call"
+
+
+@benchmark("text.cached")
+def _text_cached(game):
+    return (lambda: game.render_text(game.font_item, "Play Again", (255, 255, 255), 200)), 1, "call"
+
+
+@benchmark("text.uncached")
+def _text_uncached(game):
+    counter = [0]
+
+    def render():
+        counter[0] += 1
+        game.font_item.render(f"SCORE {counter[0]:06d}", True, (255, 255, 255))
+    return render, 1, "call"
+
+
+def run_match(seconds=MATCH_SECONDS):
+    """Frame times of the real main loop playing `seconds` of scripted game
+    (autoplay.play: bet on RED, Play Again after every round, one tick per
+    frame, no frame cap). main.py ends with pygame.quit(), so this goes last."""
+    import autoplay
+    clock = time.perf_counter
+    samples = []
+    last = [None]
+
+    def on_frame(screen, frame):
+        now = clock()
+        if last[0] is not None:
+            samples.append(now - last[0])
+        last[0] = now
+    autoplay.play(seconds=seconds, on_frame=on_frame)
+    return summarize(samples, 1, "frame")
+
+
+# === Running and comparing ===
+def run(filter_text=None, min_time=MIN_TIME, match=True, log=print):
+    import main as game
+    results = {}
+    for name, setup in BENCHMARKS:
+        if filter_text and filter_text not in name:
+            continue
+        fn, items, unit = setup(game)
+        results[name] = measure(fn, items, unit, min_time)
+        log(format_row(name, results[name]))
+    if match and (not filter_text or filter_text in "match.scripted_60s"):
+        results["match.scripted_60s"] = run_match()
+        log(format_row("match.scripted_60s", results["match.scripted_60s"]))
+    return {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+def format_row(name, r):
+    return (f"{name:<34} mean {r['mean_ms']:9.4f} ms  p95 {r['p95_ms']:9.4f}  "
+            f"p99 {r['p99_ms']:9.4f}  {r['throughput']:12.0f} {r['unit']}/s")
+
+
+def compare(current, baseline, tolerance=TOLERANCE):
+    """Rows of (name, baseline ms, current ms, ratio, regressed) for every
+    benchmark present in both runs, compared on median latency (less noisy
+    than the mean on a busy machine)"""
+    rows = []
+    base = baseline["results"]
+    for name, r in current["results"].items():
+        if name not in base:
+            continue
+        old, new = base[name]["p50_ms"], r["p50_ms"]
+        ratio = new / old if old > 0 else 1.0
+        rows.append((name, old, new, ratio, ratio > 1.0 + tolerance))
+    return rows
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Headless HitBox benchmarks")
+    parser.add_argument("--filter", help="only benchmarks whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="shorter sampling (noisier)")
+    parser.add_argument("--no-match", action="store_true", help="skip the scripted 60 s match")
+    parser.add_argument("--json", metavar="PATH", help="write the results here")
+    parser.add_argument("--save-baseline", nargs="?", const=BASELINE_PATH, metavar="PATH",
+                        help=f"store the results as the baseline (default {BASELINE_PATH})")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_PATH, metavar="PATH",
+                        help="compare against a stored baseline; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="allowed slowdown before a benchmark counts as regressed")
+    args = parser.parse_args(argv)
+
+    current = run(args.filter, 0.1 if args.quick else MIN_TIME, match=not args.no_match)
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(current, f, indent=2, sort_keys=True)
+            print(f"wrote {path}")
+    if not args.compare:
+        return 0
+
+    if not os.path.exists(args.compare):
+        with open(args.compare, "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+        print(f"no baseline at {args.compare}; saved this run as the baseline")
+        return 0
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    rows = compare(current, baseline, args.tolerance)
+    print(f"\nvs {args.compare} ({baseline['meta'].get('time', '?')}), tolerance {args.tolerance:.0%}")
+    for name, old, new, ratio, regressed in rows:
+        flag = "REGRESSED" if regressed else ""
+        print(f"{name:<34} {old:9.4f} -> {new:9.4f} ms  {ratio - 1:+7.1%}  {flag}")
+    regressions = [row[0] for row in rows if row[4]]
+    print(f"{len(regressions)} regression(s)" if regressions else "no regressions")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import random
+
+import server
+from scoring import START_SCORE, POINT_LOSS
+
+
+class BetClient:
+    """Minimal client for server.MatchHost's newline-delimited JSON protocol.
+
+    Requests are fire-and-forget; every message the host sends (replies and
+    pushes alike) is read by recv(). Used by the bot run below and handy for
+    poking a running host from a REPL.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=8765):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def send(self, op, **fields):
+        fields["op"] = op
+        self.writer.write(json.dumps(fields).encode() + b"\n")
+        await self.writer.drain()
+
+    async def recv(self):
+        """Next message from the host, or None once it hangs up"""
+        line = await self.reader.readline()
+        return json.loads(line) if line else None
+
+    async def expect(self, *ops):
+        """Skip pushes until a message with one of `ops` arrives"""
+        while True:
+            msg = await self.recv()
+            if msg is None or msg["op"] in ops:
+                return msg
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def bot(name, host, port, rounds, rng, tally):
+    """Watches a random table, bets a random side whenever its betting
+    opens until `rounds` bets are settled, and checks that every settled
+    score follows the game's rules"""
+    client = await BetClient.connect(host, port)
+    await client.send("hello", name=name)
+    welcome = await client.expect("welcome")
+    score = welcome["score"]
+    await client.send("list")
+    table = rng.choice((await client.expect("matches"))["matches"])["id"]
+    await client.send("watch", match=table)
+    settled = 0
+    while settled < rounds:
+        msg = await client.recv()
+        if msg is None:
+            break
+        op = msg["op"]
+        if op in ("watching", "betting") and msg.get("phase", server.BETTING) == server.BETTING:
+            await client.send("bet", match=table, side=rng.choice(server.SIDES))
+        elif op == "error" and msg.get("request") == "bet":
+            tally["rejected"] += 1   # closed just before it arrived; wait for the next round
+        elif op == "score":
+            expected = score + msg["delta"]
+            if expected <= 0:
+                expected = START_SCORE
+            if msg["score"] != expected or msg["delta"] not in (0, msg["pays"], POINT_LOSS):
+                tally["mismatches"] += 1
+            score = msg["score"]
+            tally["settled"] += 1
+            tally["won" if msg["delta"] > 0 else "lost" if msg["delta"] < 0 else "drawn"] += 1
+            settled += 1
+        if op in ("betting", "started", "result"):
+            tally["pushes"] += 1
+    await client.close()
+    return score
+
+
+async def run_bots(clients=100, rounds=2, host="127.0.0.1", port=None, matches=50, seed=1,
+                   betting_seconds=1.0, result_seconds=0.5, odds=False):
+    """Connect `clients` bots to a host; with port=None an in-process host
+    is started on a free port first. Returns a summary dict."""
+    match_host = None
+    if port is None:
+        match_host = server.MatchHost(matches, seed, betting_seconds, result_seconds, odds=odds)
+        port = await match_host.start(host, 0)
+    tally = {"settled": 0, "won": 0, "lost": 0, "drawn": 0, "rejected": 0,
+             "pushes": 0, "mismatches": 0}
+    rng = random.Random(seed)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    try:
+        scores = await asyncio.gather(*(
+            bot(f"bot-{i}", host, port, rounds, random.Random(rng.getrandbits(64)), tally)
+            for i in range(clients)))
+    finally:
+        if match_host is not None:
+            stats = match_host.stats()
+            await match_host.stop()
+    summary = dict(tally, clients=clients, seconds=loop.time() - start,
+                   mean_score=sum(scores) / len(scores))
+    if match_host is not None:
+        summary["host"] = stats
+    return summary
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Bot bettors for a HitBox match host")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=2, help="bets settled per bot")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="connect to a running host (default: start one)")
+    parser.add_argument("--matches", type=int, default=50, help="tables on the in-process host")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--odds", action="store_true", help="price rounds on the in-process host")
+    args = parser.parse_args()
+    summary = asyncio.run(run_bots(args.clients, args.rounds, args.host, args.port,
+                                   args.matches, args.seed, odds=args.odds))
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,378 @@
+import asyncio
+import struct
+import time
+from collections import deque
+
+from engine import Match, HealthPickup, InvincibilityPickup
+from replay import KINDS, write_varint, read_varint, pack_event, unpack_event
+from rng import RngStreams
+
+# === Wire format ===
+# Every message is a u16 length followed by one snapshot of the tick it names:
+#   round, tick, back (varints)      back = tick - base tick, 0 = full snapshot
+#   flags                            FLAG_PICKUPS, FLAG_EVENTS
+#   fighter count (varint)           full snapshots only; deltas keep the base's
+#   per fighter: change mask, then a zigzag varint for every set bit: the
+#                field minus its prediction from the base (see predict())
+#   FLAG_PICKUPS: count, then kind/cx/cy, tick - born, lifetime per pickup
+#   FLAG_EVENTS:  groups of (tick - event tick, count, replay-packed events)
+#                 for every tick after the base, so nothing is missed
+# Spectators answer with the u32 tick of snapshots they received (acks);
+# the next snapshot is encoded against the newest acked tick.
+TICK_RATE = 60
+HISTORY_TICKS = 120       # base states kept; older acks get a full snapshot
+SEND_EVERY = 3            # 20 snapshots a second; spectators predict in between
+MAX_CATCHUP_TICKS = 5
+RESULT_TICKS = 3 * 60     # fighters drift on after a KO before the next round
+MAX_BUFFER = 64 * 1024    # skip spectators with this much unsent data
+
+FIELDS = ("x", "y", "dx", "dy", "health", "invincible_timer", "hurt_timer", "invincible")
+FLAG_PICKUPS = 1
+FLAG_EVENTS = 2
+
+_LENGTH = struct.Struct("<H")
+_ACK = struct.Struct("<I")
+_PICKUP = struct.Struct("<Bhh")
+_NO_FIGHTER = (0,) * len(FIELDS)
+
+
+def fighter_state(f):
+    """A fighter's broadcast fields, quantized to whole pixels and frames"""
+    return (round(f.x), round(f.y), round(f.dx), round(f.dy), round(f.health),
+            f.invincible_timer, f.hurt_timer, int(f.invincible))
+
+
+def match_state(match, tick):
+    """(fighters, pickups) of a match; pickups carry the tick they spawned
+    on instead of their age, so they only change on spawn/expiry/pickup"""
+    fighters = tuple(fighter_state(f) for f in match.fighters)
+    pickups = tuple((pk.KIND, pk.cx, pk.cy, tick - pk.age, pk.lifetime) for pk in match.pickups)
+    return fighters, pickups
+
+
+def predict(base, ticks):
+    """Where a fighter would be `ticks` after base if nothing happened to it.
+
+    Fields are sent relative to this, so a fighter moving in a straight
+    line with nothing ticking down costs one zero mask byte per snapshot.
+    """
+    x, y, dx, dy, health, inv_timer, hurt, inv = base
+    return (x + dx * ticks, y + dy * ticks, dx, dy, health,
+            max(0, inv_timer - ticks), max(0, hurt - ticks), inv)
+
+
+def _zigzag(v):
+    return v << 1 if v >= 0 else (-v << 1) - 1
+
+def _unzigzag(z):
+    return z >> 1 if not z & 1 else -((z + 1) >> 1)
+
+
+def encode(round_no, tick, state, base_tick=None, base=None, events=()):
+    """One snapshot payload; `events` is a list of (tick, [events])"""
+    fighters, pickups = state
+    if base is not None and len(base[0]) != len(fighters):
+        raise ValueError(f"{len(fighters)} fighters can't be sent against a base with {len(base[0])}")
+    back = 0 if base is None else tick - base_tick
+    flags = FLAG_EVENTS if events else 0
+    if base is None or pickups != base[1]:
+        flags |= FLAG_PICKUPS
+    out = bytearray()
+    write_varint(out, round_no)
+    write_varint(out, tick)
+    write_varint(out, back)
+    out.append(flags)
+    if base is None:
+        write_varint(out, len(fighters))
+    for i, fields in enumerate(fighters):
+        guess = _NO_FIGHTER if base is None else predict(base[0][i], back)
+        mask = 0
+        diffs = []
+        for bit, (v, g) in enumerate(zip(fields, guess)):
+            if v != g:
+                mask |= 1 << bit
+                diffs.append(v - g)
+        out.append(mask)
+        for d in diffs:
+            write_varint(out, _zigzag(d))
+    if flags & FLAG_PICKUPS:
+        out.append(len(pickups))
+        for kind, cx, cy, born, lifetime in pickups:
+            out += _PICKUP.pack(KINDS.index(kind), cx, cy)
+            write_varint(out, tick - born)
+            write_varint(out, lifetime)
+    if flags & FLAG_EVENTS:
+        out.append(len(events))
+        for ev_tick, evs in events:
+            write_varint(out, tick - ev_tick)
+            out.append(len(evs))
+            for ev in evs:
+                out += pack_event(ev)
+    return bytes(out)
+
+
+# === Spectator side ===
+class SnapshotDecoder:
+    """Rebuilds match state from a spectator's snapshot stream.
+
+    Keeps the states it may still be sent deltas against (everything from
+    the newest base the host has used), and hands out each tick's events
+    exactly once even though deltas repeat them until an ack gets through.
+    """
+
+    def __init__(self):
+        self.states = {}          # tick -> (fighters, pickups)
+        self.round = None
+        self.tick = None
+        self.events_through = -1  # newest tick whose events were handed out
+        self._buf = bytearray()
+
+    def feed(self, data):
+        """Bytes off the socket -> list of decoded snapshots, oldest first"""
+        self._buf += data
+        out = []
+        buf = self._buf
+        pos = 0
+        while len(buf) - pos >= _LENGTH.size:
+            (n,) = _LENGTH.unpack_from(buf, pos)
+            if len(buf) - pos - _LENGTH.size < n:
+                break
+            start = pos + _LENGTH.size
+            out.append(self.decode(bytes(buf[start:start + n])))
+            pos = start + n
+        del buf[:pos]
+        return out
+
+    def decode(self, data):
+        """One payload -> (round, tick, fighters, pickups, new events)"""
+        round_no, pos = read_varint(data, 0)
+        tick, pos = read_varint(data, pos)
+        back, pos = read_varint(data, pos)
+        flags = data[pos]; pos += 1
+        if back:
+            base = self.states[tick - back]
+            count = len(base[0])
+        else:
+            base = None
+            count, pos = read_varint(data, pos)
+        fighters = []
+        for i in range(count):
+            guess = _NO_FIGHTER if base is None else predict(base[0][i], back)
+            mask = data[pos]; pos += 1
+            fields = list(guess)
+            for bit in range(len(FIELDS)):
+                if mask & (1 << bit):
+                    z, pos = read_varint(data, pos)
+                    fields[bit] += _unzigzag(z)
+            fighters.append(tuple(fields))
+        if flags & FLAG_PICKUPS:
+            pickups = []
+            n = data[pos]; pos += 1
+            for _ in range(n):
+                kind, cx, cy = _PICKUP.unpack_from(data, pos)
+                pos += _PICKUP.size
+                age, pos = read_varint(data, pos)
+                lifetime, pos = read_varint(data, pos)
+                pickups.append((KINDS[kind], cx, cy, tick - age, lifetime))
+            pickups = tuple(pickups)
+        else:
+            pickups = base[1]
+        events = []
+        if flags & FLAG_EVENTS:
+            groups = data[pos]; pos += 1
+            for _ in range(groups):
+                ago, pos = read_varint(data, pos)
+                n = data[pos]; pos += 1
+                for _ in range(n):
+                    ev, pos = unpack_event(data, pos)
+                    if tick - ago > self.events_through:
+                        events.append(ev)
+        self.events_through = max(self.events_through, tick)
+
+        state = (tuple(fighters), pickups)
+        # the host never goes back to an older base, nor past its history
+        oldest = tick - back if back else tick - HISTORY_TICKS
+        for t in [t for t in self.states if t < oldest]:
+            del self.states[t]
+        self.states[tick] = state
+        self.round, self.tick = round_no, tick
+        return round_no, tick, state[0], pickups, events
+
+
+def ack(tick):
+    return _ACK.pack(tick)
+
+
+def build_pickup(kind, cx, cy, born, lifetime, tick):
+    """Pickup object for drawing a decoded (kind, cx, cy, born, lifetime)"""
+    pk = HealthPickup(cx, cy, lifetime) if kind == "health" else InvincibilityPickup(cx, cy, lifetime)
+    pk.age = tick - born
+    return pk
+
+
+# === Host side ===
+class Spectator(asyncio.Protocol):
+    """One watcher: its transport, the newest tick it acknowledged and the
+    newest tick written to it (events after that are still owed)"""
+
+    def __init__(self, broadcaster):
+        self.broadcaster = broadcaster
+        self.transport = None
+        self.acked = None
+        self.sent = None
+        self._buf = b""
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.sent = self.broadcaster.tick
+        self.broadcaster.spectators.add(self)
+
+    def connection_lost(self, exc):
+        self.broadcaster.spectators.discard(self)
+
+    def data_received(self, data):
+        buf = self._buf + data
+        n = len(buf) - len(buf) % _ACK.size
+        if n:
+            (tick,) = _ACK.unpack_from(buf, n - _ACK.size)   # only the newest matters
+            if self.acked is None or tick > self.acked:
+                self.acked = tick
+        self._buf = buf[n:]
+
+
+class Broadcaster:
+    """Fans one match's state out to any number of spectators.
+
+    Call publish(match, events) after every match.step(). Every SEND_EVERY
+    ticks it sends each spectator a snapshot delta-encoded against the
+    newest tick that spectator acknowledged. Encodings are cached per base
+    tick, so spectators that acked the same tick (nearly all of them, on a
+    local network) share one encode and one bytes object; the per-spectator
+    cost is a transport write. Spectators that fall behind are skipped
+    until their socket drains, then caught up with a single delta.
+    """
+
+    def __init__(self, send_every=SEND_EVERY, history=HISTORY_TICKS):
+        self.send_every = send_every
+        self.history = history
+        self.spectators = set()
+        self.tick = 0
+        self.round = 0
+        self._states = {}          # tick -> (fighters, pickups)
+        self._events = {}          # tick -> events of that tick, if any
+        self._order = deque()
+        self.snapshots = 0         # messages written
+        self.bytes_sent = 0
+        self.encodes = 0
+        self.skipped = 0           # sends skipped for backed-up spectators
+        self.fanout_time = 0.0
+
+    def new_round(self):
+        self.round += 1
+
+    def publish(self, match, events=()):
+        self.tick += 1
+        tick = self.tick
+        self._states[tick] = match_state(match, tick)
+        if events:
+            self._events[tick] = list(events)
+        self._order.append(tick)
+        while len(self._order) > self.history:
+            old = self._order.popleft()
+            self._states.pop(old, None)
+            self._events.pop(old, None)
+        if tick % self.send_every == 0 and self.spectators:
+            self._fan_out(tick)
+
+    def _events_after(self, first, tick):
+        return [(t, self._events[t]) for t in range(first + 1, tick + 1) if t in self._events]
+
+    def _fan_out(self, tick):
+        start = time.perf_counter()
+        state = self._states[tick]
+        encoded = {}
+        sent = 0
+        for s in self.spectators:
+            transport = s.transport
+            if transport.get_write_buffer_size() > MAX_BUFFER:
+                self.skipped += 1
+                continue
+            base = s.acked if s.acked in self._states and s.acked < tick else None
+            # a full snapshot still owes the events since the last write
+            first = max(s.sent, tick - self.history)
+            key = base if base is not None else (first,)
+            data = encoded.get(key)
+            if data is None:
+                if base is None:
+                    payload = encode(self.round, tick, state, events=self._events_after(first, tick))
+                else:
+                    payload = encode(self.round, tick, state, base, self._states[base],
+                                     self._events_after(base, tick))
+                data = encoded[key] = _LENGTH.pack(len(payload)) + payload
+            transport.write(data)
+            s.sent = tick
+            sent += len(data)
+            self.snapshots += 1
+        self.encodes += len(encoded)
+        self.bytes_sent += sent
+        self.fanout_time += time.perf_counter() - start
+
+    def stats(self):
+        seconds = self.tick / TICK_RATE
+        n = max(self.snapshots, 1)
+        return {"tick": self.tick, "spectators": len(self.spectators),
+                "snapshots": self.snapshots, "encodes": self.encodes, "skipped": self.skipped,
+                "bytes_per_snapshot": self.bytes_sent / n,
+                "bytes_per_second": self.bytes_sent / max(seconds, 1e-9),
+                "fanout_us_per_snapshot": 1e6 * self.fanout_time / n,
+                "fanout_cpu": self.fanout_time / max(seconds, 1e-9)}
+
+
+async def run_rounds(broadcaster, seed=None, result_ticks=RESULT_TICKS, rounds=None):
+    """Play rounds back to back at TICK_RATE, publishing every tick"""
+    streams = RngStreams(seed)
+    loop = asyncio.get_running_loop()
+    step = 1.0 / TICK_RATE
+    next_tick = loop.time()
+    played = 0
+    while rounds is None or played < rounds:
+        match = Match(seed=streams.next_seed("rounds"))
+        broadcaster.new_round()
+        after = 0
+        while after < result_ticks:
+            ran = 0
+            while loop.time() >= next_tick and ran < MAX_CATCHUP_TICKS and after < result_ticks:
+                broadcaster.publish(match, match.step())
+                if match.over:
+                    after += 1
+                next_tick += step
+                ran += 1
+            if loop.time() >= next_tick:
+                next_tick = loop.time()
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+        played += 1
+
+
+async def serve(host="127.0.0.1", port=8766, seed=None, send_every=SEND_EVERY, report=10.0):
+    broadcaster = Broadcaster(send_every)
+    loop = asyncio.get_running_loop()
+    server = await loop.create_server(lambda: Spectator(broadcaster), host, port)
+    print(f"broadcasting on {host}:{server.sockets[0].getsockname()[1]}")
+    loop.create_task(run_rounds(broadcaster, seed))
+    while True:
+        await asyncio.sleep(report)
+        print(broadcaster.stats())
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Broadcast HitBox rounds to spectators")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--send-every", type=int, default=SEND_EVERY, help="ticks per snapshot")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.seed, args.send_every))
+    except KeyboardInterrupt:
+        pass
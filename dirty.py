@@ -0,0 +1,52 @@
+import pygame
+
+# Past this many rects one pygame.display.update call with their union is
+# cheaper than updating every rect separately
+MAX_DIRTY_RECTS = 48
+
+
+class DirtyRects:
+    """Presents a frame by updating only the screen areas that changed.
+
+    The frame is still drawn into the screen surface as usual; while
+    drawing, everything that moves or animates adds its on-screen rect.
+    present() then hands pygame.display.update() this frame's rects plus the
+    previous frame's, so whatever moved away is cleared on the display too.
+    Frames where that bookkeeping doesn't hold (screen shake, menus,
+    transitions) call present(full=True), which flips the whole screen.
+    """
+
+    def __init__(self, enabled=True, screen_rect=None):
+        self.enabled = enabled
+        self.screen_rect = screen_rect
+        self.rects = []
+        self.previous = []
+        self.full = True  # first frame always goes out whole
+
+    def add(self, rect):
+        """Mark a rect (or None, for nothing drawn) as changed this frame"""
+        if rect is not None and self.enabled:
+            self.rects.append(pygame.Rect(rect))
+
+    def invalidate(self):
+        """Force the next present() to flip the whole screen"""
+        self.full = True
+
+    def present(self, full=False):
+        rects, self.rects = self.rects, []
+        if not self.enabled or full or self.full:
+            pygame.display.flip()
+            # the frame after a full redraw (last shake frame, leaving a
+            # menu) still differs everywhere, so it goes out whole as well
+            self.full = full
+            self.previous = rects
+            return
+        update = rects + self.previous
+        self.previous = rects
+        if self.screen_rect is not None:
+            update = [r.clip(self.screen_rect) for r in update]
+        update = [r for r in update if r.w > 0 and r.h > 0]
+        if len(update) > MAX_DIRTY_RECTS:
+            update = [update[0].unionall(update[1:])]
+        if update:
+            pygame.display.update(update)
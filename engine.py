@@ -0,0 +1,335 @@
+import random
+import pygame
+from fighter import Fighter
+
+# === Arena Settings ===
+ARENA_X = 50
+ARENA_Y = 50
+ARENA_WIDTH = 500
+ARENA_HEIGHT = 300
+
+# === Combat Tuning ===
+DAMAGE = 10  # collision damage; Health pickup heals by this amount too
+
+# === Fighter Settings ===
+FIGHTER_SIZE = 50
+FIGHTER_WIDTH = FIGHTER_SIZE
+FIGHTER_HEIGHT = FIGHTER_SIZE
+FIGHTER_DX = 4
+FIGHTER_DY = 3
+FIGHTER_HEALTH = 100
+RED_COLOR = (255, 0, 0)
+BLUE_COLOR = (0, 0, 255)
+SIDES = ("RED", "BLUE")  # fighter1 is RED, fighter2 is BLUE
+
+# === Pickup Settings ===
+PICKUP_SPAWN_CHANCE = 0.015          # per-frame roll once the cooldown is over
+PICKUP_COOLDOWN_FRAMES = 4 * 60
+PICKUP_START_COOLDOWN = 2 * 60       # no pickups during the first seconds of a round
+MAX_ACTIVE_PICKUPS = 1
+
+# Safety cap for headless rounds; a round that reaches it is scored as a draw
+MAX_ROUND_FRAMES = 60 * 60 * 5
+
+
+# === Pickups ===
+class Pickup:
+    RADIUS = 14
+    LIFETIME = 6 * 60
+    KIND = "generic"
+
+    def __init__(self, cx, cy, lifetime=None):
+        self.cx = cx; self.cy = cy
+        self.age = 0
+        self.lifetime = self.LIFETIME if lifetime is None else lifetime
+        d = self.RADIUS * 2
+        self.rect = pygame.Rect(cx - self.RADIUS, cy - self.RADIUS, d, d)
+
+    @property
+    def dead(self): return self.age >= self.lifetime
+    def update(self): self.age += 1
+    def colliding_fighters(self, f1, f2):
+        hits = []
+        if self.rect.colliderect(f1.get_rect()): hits.append(1)
+        if self.rect.colliderect(f2.get_rect()): hits.append(2)
+        return hits
+    def apply(self, fighter): raise NotImplementedError
+    def draw(self, screen, offset=(0,0)): raise NotImplementedError
+
+class HealthPickup(Pickup):
+    KIND = "health"
+
+    def __init__(self, cx, cy, lifetime=None, amount=DAMAGE):
+        super().__init__(cx, cy, lifetime)
+        self.amount = amount
+
+    def apply(self, fighter):
+        fighter.heal(self.amount)
+
+    def draw(self, screen, offset=(0,0)):
+        x = self.cx + offset[0]; y = self.cy + offset[1]
+        pygame.draw.circle(screen, (34,197,94), (x,y), self.RADIUS)
+        pygame.draw.circle(screen, (20,20,20), (x,y), self.RADIUS, 2)
+        arm = self.RADIUS // 2 + 2; thick = 4
+        pygame.draw.rect(screen, (255,255,255), (x - thick//2, y - arm, thick, 2*arm))
+        pygame.draw.rect(screen, (255,255,255), (x - arm, y - thick//2, 2*arm, thick))
+
+class InvincibilityPickup(Pickup):
+    KIND = "inv"
+    DURATION_FRAMES = 5 * 60
+
+    def __init__(self, cx, cy, lifetime=None, frames=DURATION_FRAMES):
+        super().__init__(cx, cy, lifetime)
+        self.frames = frames
+
+    def apply(self, fighter):
+        fighter.grant_invincibility(self.frames)
+
+    def draw(self, screen, offset=(0,0)):
+        x = self.cx + offset[0]; y = self.cy + offset[1]
+        palette = [(255,255,255),(255,0,0),(255,165,0),(255,255,0),
+                   (0,255,0),(0,255,255),(0,128,255),(170,0,255),(255,105,180)]
+        idx = (self.age // 3) % len(palette)
+        pygame.draw.circle(screen, palette[idx], (x,y), self.RADIUS)
+        pygame.draw.circle(screen, (20,20,20), (x,y), self.RADIUS, 2)
+
+
+# === Match configuration ===
+class MatchConfig:
+    """Rules and tuning for one round; the defaults are the arcade game's"""
+
+    def __init__(self, damage=DAMAGE, dx=FIGHTER_DX, dy=FIGHTER_DY, health=FIGHTER_HEALTH,
+                 fighter_width=FIGHTER_WIDTH, fighter_height=FIGHTER_HEIGHT,
+                 arena=(ARENA_X, ARENA_Y, ARENA_WIDTH, ARENA_HEIGHT),
+                 pickup_chance=PICKUP_SPAWN_CHANCE, pickup_cooldown=PICKUP_COOLDOWN_FRAMES,
+                 pickup_start_cooldown=PICKUP_START_COOLDOWN, max_pickups=MAX_ACTIVE_PICKUPS,
+                 pickup_lifetime=Pickup.LIFETIME,
+                 invincibility_frames=InvincibilityPickup.DURATION_FRAMES,
+                 max_frames=MAX_ROUND_FRAMES):
+        self.damage = damage
+        self.dx = dx
+        self.dy = dy
+        self.health = health
+        self.fighter_width = fighter_width
+        self.fighter_height = fighter_height
+        self.arena = tuple(arena)  # (x, y, width, height)
+        self.pickup_chance = pickup_chance
+        self.pickup_cooldown = pickup_cooldown
+        self.pickup_start_cooldown = pickup_start_cooldown
+        self.max_pickups = max_pickups
+        self.pickup_lifetime = pickup_lifetime
+        self.invincibility_frames = invincibility_frames
+        self.max_frames = max_frames
+
+    def copy(self, **overrides):
+        """Return a copy of this config with some fields replaced"""
+        values = dict(self.__dict__)
+        values.update(overrides)
+        return MatchConfig(**values)
+
+
+def random_spawn(rng=random, config=None):
+    """Random top-left corner for a fighter that fits inside the arena"""
+    c = config or MatchConfig()
+    ax, ay, aw, ah = c.arena
+    x = rng.randint(ax, ax + aw - c.fighter_width)
+    y = rng.randint(ay, ay + ah - c.fighter_height)
+    return x, y
+
+def rand_point_in_arena(radius, rng=random, config=None):
+    c = config or MatchConfig()
+    ax, ay, aw, ah = c.arena
+    cx = rng.randint(ax + radius, ax + aw - radius)
+    cy = rng.randint(ay + radius, ay + ah - radius)
+    return cx, cy
+
+
+# === Headless match ===
+class MatchResult:
+    """Outcome of a finished round"""
+
+    def __init__(self, winner, frames, stats, timed_out=False):
+        self.winner = winner        # "RED", "BLUE" or None for a draw
+        self.frames = frames
+        self.stats = stats
+        self.timed_out = timed_out
+
+    def __repr__(self):
+        return f"MatchResult(winner={self.winner!r}, frames={self.frames}, timed_out={self.timed_out})"
+
+
+class Match:
+    """One RED vs BLUE round with no display, fonts, particles or sound.
+
+    step() advances exactly one frame of the arcade rules and returns the
+    gameplay events of that frame, so a front end can layer its own effects
+    (sparks, shake, damage text) on top:
+
+        ("pickup_spawn", kind, cx, cy)
+        ("pickup_expired", kind, cx, cy)
+        ("pickup_taken", kind, cx, cy, who)         # who: 1 = RED, 2 = BLUE
+        ("collision", dmg1, dmg2, (cx, cy))         # centre of the overlap
+        ("ko", who)
+        ("round_over", winner)                      # "RED", "BLUE" or None
+
+    Once the round is over, step() keeps the fighters drifting and the
+    pickups ageing, which is what the game shows behind its game-over screen.
+
+    Set .timer to an object with a lap(name) method (perf_overlay.FrameProfiler)
+    to have step() report its "fighters", "pickups" and "collisions" phases.
+    """
+
+    def __init__(self, config=None, seed=None, rng=None, spawns=None):
+        self.config = config or MatchConfig()
+        self.seed = seed   # with spawns=None the whole round is a function of it
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.timer = None
+        self.reset(spawns)
+
+    def reset(self, spawns=None):
+        """Start a new round, optionally from fixed ((x1, y1), (x2, y2)) spawns"""
+        c = self.config
+        if spawns is None:
+            spawns = (random_spawn(self.rng, c), random_spawn(self.rng, c))
+        (x1, y1), (x2, y2) = spawns
+        self.fighter1 = Fighter(x1, y1, c.dx, c.dy, c.fighter_width, c.fighter_height,
+                                RED_COLOR, c.health, *c.arena)
+        self.fighter2 = Fighter(x2, y2, -c.dx, -c.dy, c.fighter_width, c.fighter_height,
+                                BLUE_COLOR, c.health, *c.arena)
+        self.pickups = []
+        self.pickup_cooldown = c.pickup_start_cooldown
+        self.frame = 0
+        self.over = False
+        self.winner = None
+        self.timed_out = False
+        self.stats = {
+            "collisions": 0,
+            "pickups_spawned": 0,
+            "RED":  {"damage_taken": 0, "healed": 0, "pickups": 0},
+            "BLUE": {"damage_taken": 0, "healed": 0, "pickups": 0},
+        }
+
+    @property
+    def fighters(self):
+        return (self.fighter1, self.fighter2)
+
+    def step(self):
+        """Advance one frame and return the list of events it produced"""
+        events = []
+        self.frame += 1
+        f1, f2 = self.fighter1, self.fighter2
+        timer = self.timer
+        f1.move(); f2.move()
+        f1.update_effects(); f2.update_effects()
+        if timer is not None: timer.lap("fighters")
+
+        if self.over:
+            self._age_pickups(events)
+            if timer is not None: timer.lap("pickups")
+            return events
+
+        self._maybe_spawn_pickup(events)
+        self._age_pickups(events)
+        self._resolve_pickup_collisions(events)
+        if timer is not None: timer.lap("pickups")
+
+        if f1.collides_with(f2):
+            f1.dx *= -1; f1.dy *= -1
+            f2.dx *= -1; f2.dy *= -1
+            dmg1 = f1.take_damage(self.config.damage)
+            dmg2 = f2.take_damage(self.config.damage)
+            self.stats["collisions"] += 1
+            self.stats["RED"]["damage_taken"] += dmg1
+            self.stats["BLUE"]["damage_taken"] += dmg2
+            overlap = f1.get_rect().clip(f2.get_rect())
+            events.append(("collision", dmg1, dmg2, overlap.center))
+        if timer is not None: timer.lap("collisions")
+
+        if f1.health <= 0: events.append(("ko", 1))
+        if f2.health <= 0: events.append(("ko", 2))
+        if f1.health <= 0 or f2.health <= 0:
+            self._finish(self.round_winner(), events)
+        elif self.frame >= self.config.max_frames:
+            self.timed_out = True
+            self._finish(None, events)
+        return events
+
+    def run(self):
+        """Step until the round is decided and return its MatchResult"""
+        while not self.over:
+            self.step()
+        return self.result()
+
+    def result(self):
+        return MatchResult(self.winner, self.frame, self.stats, self.timed_out)
+
+    def round_winner(self):
+        red_dead  = self.fighter1.health <= 0
+        blue_dead = self.fighter2.health <= 0
+        if red_dead and blue_dead: return None
+        if red_dead:  return "BLUE"
+        if blue_dead: return "RED"
+        return None
+
+    def _finish(self, winner, events):
+        self.over = True
+        self.winner = winner
+        events.append(("round_over", winner))
+
+    # --- pickups ---
+    def _maybe_spawn_pickup(self, events):
+        c = self.config
+        if self.pickup_cooldown > 0:
+            self.pickup_cooldown -= 1; return
+        if len(self.pickups) >= c.max_pickups: return
+        roll = self._spawn_roll()
+        if roll is None: return
+        kind, cx, cy = roll
+        if kind == "health":
+            pk = HealthPickup(cx, cy, c.pickup_lifetime, amount=c.damage)
+        else:
+            pk = InvincibilityPickup(cx, cy, c.pickup_lifetime, frames=c.invincibility_frames)
+        self.pickups.append(pk)
+        self.pickup_cooldown = c.pickup_cooldown
+        self.stats["pickups_spawned"] += 1
+        events.append(("pickup_spawn", pk.KIND, cx, cy))
+
+    # The only two random decisions of a round; replay.ReplayMatch overrides
+    # them to take the recorded outcome instead
+    def _spawn_roll(self):
+        """This frame's pickup spawn as (kind, cx, cy), or None"""
+        c = self.config
+        if self.rng.random() >= c.pickup_chance: return None
+        cx, cy = rand_point_in_arena(Pickup.RADIUS, self.rng, c)
+        kind = self.rng.choice(["health", "inv"])
+        return kind, cx, cy
+
+    def _tie_break(self, pickup):
+        """Which fighter (1 or 2) gets a pickup both are touching"""
+        return 1 if self.rng.random() < 0.5 else 2
+
+    def _age_pickups(self, events):
+        for pk in self.pickups: pk.update()
+        if any(pk.dead for pk in self.pickups):
+            for pk in self.pickups:
+                if pk.dead: events.append(("pickup_expired", pk.KIND, pk.cx, pk.cy))
+            self.pickups = [pk for pk in self.pickups if not pk.dead]
+
+    def _resolve_pickup_collisions(self, events):
+        new_list = []
+        for p in self.pickups:
+            hits = p.colliding_fighters(self.fighter1, self.fighter2)
+            if not hits:
+                new_list.append(p); continue
+            if len(hits) == 2:
+                who = self._tie_break(p)
+            else:
+                who = hits[0]
+            target = self.fighter1 if who == 1 else self.fighter2
+            before = target.health
+            p.apply(target)
+            side = self.stats[SIDES[who - 1]]
+            side["pickups"] += 1
+            side["healed"] += target.health - before
+            events.append(("pickup_taken", p.KIND, p.cx, p.cy, who))
+        self.pickups = new_list
@@ -0,0 +1,208 @@
+import random
+from engine import (MatchConfig, MatchResult, Pickup, random_spawn, rand_point_in_arena, SIDES)
+
+NEVER = float("inf")
+
+
+def _ceil_div(a, b):
+    return -((-a) // b)
+
+
+def _wall_frames(p, v, lo, hi):
+    """Frames until Fighter.move flips v: first j >= 1 with p + j*v <= lo or >= hi"""
+    if v > 0:
+        if p + v <= lo: return 1
+        return max(1, _ceil_div(hi - p, v))
+    if v < 0:
+        if p + v >= hi: return 1
+        return max(1, _ceil_div(p - lo, -v))
+    return NEVER  # flipping a zero speed changes nothing
+
+
+def _window(p, v, lo, hi):
+    """Integer range [first, last] of j >= 1 with lo < p + j*v < hi, or None"""
+    if v == 0:
+        return (1, NEVER) if lo < p < hi else None
+    if v < 0:
+        p, v, lo, hi = -p, -v, -hi, -lo
+    first = max(1, (lo - p) // v + 1)
+    last = _ceil_div(hi - p, v) - 1
+    return (first, last) if first <= last else None
+
+
+def _overlap_frames(px, pvx, py, pvy, xlo, xhi, ylo, yhi):
+    """First j >= 1 at which both axes are inside their open windows"""
+    wx = _window(px, pvx, xlo, xhi)
+    if wx is None: return NEVER
+    wy = _window(py, pvy, ylo, yhi)
+    if wy is None: return NEVER
+    first = max(wx[0], wy[0])
+    return first if first <= min(wx[1], wy[1]) else NEVER
+
+
+class EventMatch:
+    """Event-driven twin of engine.Match.
+
+    Between events fighters fly in straight lines, so instead of ticking
+    every frame this jumps straight to the next frame on which something can
+    happen -- a wall bounce, fighter contact, a pickup spawning, expiring or
+    being touched, or the frame cap -- and runs the normal per-frame rules
+    there. Invincibility is kept as the last frame it lasts, so its end needs
+    no stop of its own.
+
+    Random draws are made in the same order as Match makes them, so for the
+    same seed (or the same random.Random state) run() returns exactly the
+    same MatchResult as Match(...).run().
+    """
+
+    def __init__(self, config=None, seed=None, rng=None, spawns=None):
+        self.config = c = config or MatchConfig()
+        if c.max_pickups not in (0, 1):
+            raise ValueError("EventMatch supports at most one active pickup")
+        self.rng = rng if rng is not None else random.Random(seed)
+        if spawns is None:
+            spawns = (random_spawn(self.rng, c), random_spawn(self.rng, c))
+        (x1, y1), (x2, y2) = spawns
+        self.x = [x1, x2]; self.y = [y1, y2]
+        self.dx = [c.dx, -c.dx]; self.dy = [c.dy, -c.dy]
+        self.health = [c.health, c.health]
+        self.inv_until = [0, 0]          # last frame each fighter counts as invincible
+
+        self.frame = 0
+        self.pickup = None               # (kind, cx, cy, spawn frame)
+        self.cooldown_done = c.pickup_start_cooldown  # frame the spawn cooldown reaches 0
+        self.next_spawn = None           # (frame, kind, cx, cy) once rolled
+        self.over = False
+        self.winner = None
+        self.timed_out = False
+        self.events = 0                  # frames actually simulated
+        self.stats = {
+            "collisions": 0,
+            "pickups_spawned": 0,
+            "RED":  {"damage_taken": 0, "healed": 0, "pickups": 0},
+            "BLUE": {"damage_taken": 0, "healed": 0, "pickups": 0},
+        }
+        self._roll_spawn(1)
+
+    def _roll_spawn(self, earliest):
+        """Roll maybe_spawn_pickup for every frame the slot is free, from `earliest` on"""
+        c = self.config
+        self.next_spawn = None
+        if c.max_pickups == 0:
+            return
+        f = max(earliest, self.cooldown_done + 1)
+        while f <= c.max_frames:
+            if self.rng.random() < c.pickup_chance:
+                cx, cy = rand_point_in_arena(Pickup.RADIUS, self.rng, c)
+                kind = self.rng.choice(["health", "inv"])
+                self.next_spawn = (f, kind, cx, cy)
+                return
+            f += 1
+
+    def _frames_to_next_event(self):
+        c = self.config
+        ax, ay, aw, ah = c.arena
+        w, h = c.fighter_width, c.fighter_height
+        x, y, dx, dy = self.x, self.y, self.dx, self.dy
+        F = self.frame
+
+        k = c.max_frames - F
+        for i in (0, 1):
+            k = min(k, _wall_frames(x[i], dx[i], ax, ax + aw - w),
+                       _wall_frames(y[i], dy[i], ay, ay + ah - h))
+        k = min(k, _overlap_frames(x[0] - x[1], dx[0] - dx[1], y[0] - y[1], dy[0] - dy[1],
+                                   -w, w, -h, h))
+        if self.pickup is not None:
+            _, cx, cy, born = self.pickup
+            k = min(k, born + c.pickup_lifetime - 1 - F)
+            R = Pickup.RADIUS
+            for i in (0, 1):
+                k = min(k, _overlap_frames(x[i], dx[i], y[i], dy[i],
+                                           cx - R - w, cx + R, cy - R - h, cy + R))
+        elif self.next_spawn is not None:
+            k = min(k, self.next_spawn[0] - F)
+        return max(1, k)
+
+    def step(self):
+        """Jump to the next event frame and play it; returns that frame"""
+        c = self.config
+        ax, ay, aw, ah = c.arena
+        w, h = c.fighter_width, c.fighter_height
+        x, y, dx, dy = self.x, self.y, self.dx, self.dy
+
+        k = self._frames_to_next_event()
+        F = self.frame = self.frame + k
+        self.events += 1
+
+        # Fighter.move for the k frames, then this frame's wall check
+        for i in (0, 1):
+            x[i] += k * dx[i]; y[i] += k * dy[i]
+            if x[i] <= ax or x[i] + w >= ax + aw: dx[i] *= -1
+            if y[i] <= ay or y[i] + h >= ay + ah: dy[i] *= -1
+
+        # maybe_spawn_pickup
+        if self.pickup is None and self.next_spawn is not None and self.next_spawn[0] == F:
+            _, kind, cx, cy = self.next_spawn
+            self.pickup = (kind, cx, cy, F)
+            self.next_spawn = None
+            self.cooldown_done = F + c.pickup_cooldown
+            self.stats["pickups_spawned"] += 1
+
+        # Pickup.update / expiry
+        if self.pickup is not None and F - self.pickup[3] + 1 >= c.pickup_lifetime:
+            self.pickup = None
+            self._roll_spawn(F + 1)
+
+        # resolve_pickup_collisions
+        if self.pickup is not None:
+            kind, cx, cy, _ = self.pickup
+            R = Pickup.RADIUS
+            hits = [i for i in (0, 1)
+                    if cx - R - w < x[i] < cx + R and cy - R - h < y[i] < cy + R]
+            if hits:
+                if len(hits) == 2:
+                    i = 0 if self.rng.random() < 0.5 else 1
+                else:
+                    i = hits[0]
+                side = self.stats[SIDES[i]]
+                side["pickups"] += 1
+                if kind == "health":
+                    if c.damage > 0:
+                        before = self.health[i]
+                        self.health[i] = min(c.health, self.health[i] + c.damage)
+                        side["healed"] += self.health[i] - before
+                else:
+                    self.inv_until[i] = max(self.inv_until[i], F + c.invincibility_frames)
+                self.pickup = None
+                self._roll_spawn(F + 1)
+
+        # Fighter vs fighter contact
+        if abs(x[0] - x[1]) < w and abs(y[0] - y[1]) < h:
+            dx[0] *= -1; dy[0] *= -1
+            dx[1] *= -1; dy[1] *= -1
+            self.stats["collisions"] += 1
+            for i in (0, 1):
+                if F > self.inv_until[i] and c.damage > 0:
+                    old = self.health[i]
+                    self.health[i] = max(0, old - c.damage)
+                    self.stats[SIDES[i]]["damage_taken"] += old - self.health[i]
+
+        red_dead = self.health[0] <= 0; blue_dead = self.health[1] <= 0
+        if red_dead or blue_dead:
+            self.over = True
+            self.winner = None if red_dead and blue_dead else ("BLUE" if red_dead else "RED")
+        elif F >= c.max_frames:
+            self.over = True
+            self.timed_out = True
+        return F
+
+    def run(self):
+        """Play events until the round is decided and return its MatchResult"""
+        while not self.over:
+            self.step()
+        return MatchResult(self.winner, self.frame, self.stats, self.timed_out)
+
+
+def simulate(config=None, seed=None, spawns=None):
+    """Play one round event by event and return its MatchResult"""
+    return EventMatch(config, seed=seed, spawns=spawns).run()
@@ -1,10 +1,50 @@
 import pygame
 
+HURT_FLASH_FRAMES = 8
+BLINK_PERIOD = 4
+MAX_TRAIL_LENGTH = 8
+TRAIL_SPACING = 3  # add trail point every N frames
+
+# Simple Mario-style cycling while invincible
+INVINCIBLE_PALETTE = [
+    (255, 255, 255),
+    (255, 0, 0),
+    (255, 165, 0),
+    (255, 255, 0),
+    (0, 255, 0),
+    (0, 255, 255),
+    (0, 128, 255),
+    (170, 0, 255),
+    (255, 105, 180),
+]
+
+
+def build_trail_segments(base_color, width, max_trail_length):
+    """One (surface, half size) trail segment per age 1..max_trail_length
+    (None where fully faded); index 0 is unused"""
+    # A darker version of the fighter's color for the trail
+    trail_color = tuple(max(0, int(c * 0.6)) for c in base_color)
+    segments = [None]
+    for age in range(1, max_trail_length + 1):
+        # Older = more transparent/smaller
+        alpha = max(0, 255 - (age * 32))  # fade out over time
+        size = max(2, width // 2 - age * 2)  # shrink over time
+        if alpha <= 0:
+            segments.append(None)
+            continue
+        surf = pygame.Surface((size, size), pygame.SRCALPHA)
+        surf.fill((*trail_color, alpha))
+        segments.append((surf, size // 2))
+    return segments
+
+
 class Fighter:
     def __init__(self, x, y, dx, dy, width, height, color, health,
                  arena_x, arena_y, arena_width, arena_height):
         self.x = x
         self.y = y
+        self.prev_x = x  # position before the last move(), for interpolation
+        self.prev_y = y
         self.dx = dx
         self.dy = dy
         self.width = width
@@ -26,16 +66,27 @@ class Fighter:
         self.invincible = False
         self.invincible_timer = 0   # frames remaining for invincibility
         self.hurt_timer = 0
-        self.hurt_flash_frames = 8
-        self.blink_period = 4
+        self.hurt_flash_frames = HURT_FLASH_FRAMES
+        self.blink_period = BLINK_PERIOD
         
-        # Movement trails
-        self.trail_positions = []  # stores (x, y, age) tuples
-        self.max_trail_length = 8
-        self.trail_spacing = 3  # add trail point every N frames
+        # Movement trails: a fixed ring of (x, y, birth tick) slots, oldest
+        # point at _trail_head - _trail_count
+        self.max_trail_length = MAX_TRAIL_LENGTH
+        self.trail_spacing = TRAIL_SPACING
         self.trail_counter = 0
+        self.trail_tick = 0
+        slots = -(-self.max_trail_length // self.trail_spacing)
+        self._trail_x = [0] * slots
+        self._trail_y = [0] * slots
+        self._trail_born = [0] * slots
+        self._trail_head = 0
+        self._trail_count = 0
+        self._trail_segments = None  # segment surface per age, built on first draw
+        self._trail_segments_color = None
 
     def move(self):
+        self.prev_x = self.x
+        self.prev_y = self.y
         self.x += self.dx
         self.y += self.dy
 
@@ -58,34 +109,41 @@ class Fighter:
             self.invincible = False
             
         # Update trail positions
+        self.trail_tick += 1
         self.trail_counter += 1
+        slots = len(self._trail_born)
         if self.trail_counter >= self.trail_spacing:
-            # Add current position to trail
-            center_x = self.x + self.width // 2
-            center_y = self.y + self.height // 2
-            self.trail_positions.append((center_x, center_y, 0))
+            # Add current position to trail, overwriting the oldest slot
+            head = self._trail_head
+            self._trail_x[head] = self.x + self.width // 2
+            self._trail_y[head] = self.y + self.height // 2
+            self._trail_born[head] = self.trail_tick
+            self._trail_head = (head + 1) % slots
+            self._trail_count = min(self._trail_count + 1, slots)
             self.trail_counter = 0
-            
-        # Age existing trail points and remove old ones
-        self.trail_positions = [(x, y, age + 1) for x, y, age in self.trail_positions 
-                               if age < self.max_trail_length]
+
+        # Points age by one per tick; drop the ones past max_trail_length
+        while self._trail_count:
+            oldest = (self._trail_head - self._trail_count) % slots
+            if self.trail_tick - self._trail_born[oldest] < self.max_trail_length:
+                break
+            self._trail_count -= 1
+
+    @property
+    def trail_positions(self):
+        """Live trail points as (x, y, age) tuples, oldest first"""
+        slots = len(self._trail_born)
+        points = []
+        for k in range(self._trail_count, 0, -1):
+            i = (self._trail_head - k) % slots
+            points.append((self._trail_x[i], self._trail_y[i],
+                           self.trail_tick - self._trail_born[i] + 1))
+        return points
 
     def _invincible_color(self):
-        # Simple Mario-style cycling
-        palette = [
-            (255, 255, 255),
-            (255, 0, 0),
-            (255, 165, 0),
-            (255, 255, 0),
-            (0, 255, 0),
-            (0, 255, 255),
-            (0, 128, 255),
-            (170, 0, 255),
-            (255, 105, 180),
-        ]
         # Cycle fast: change every 2 frames
-        idx = ((self.invincible_timer // 2) % len(palette))
-        return palette[idx]
+        idx = ((self.invincible_timer // 2) % len(INVINCIBLE_PALETTE))
+        return INVINCIBLE_PALETTE[idx]
 
     def draw(self, screen, offset=(0, 0)):
         # Draw trail first (behind fighter)
@@ -106,26 +164,48 @@ class Fighter:
             (self.x + offset[0], self.y + offset[1], self.width, self.height)
         )
         
+    def _build_trail_segments(self):
+        """Pre-fill one trail segment surface per age"""
+        self._trail_segments = build_trail_segments(self.base_color, self.width,
+                                                    self.max_trail_length)
+        self._trail_segments_color = self.base_color
+
     def _draw_trail(self, screen, offset=(0, 0)):
-        """Draw the movement trail behind the fighter"""
-        for i, (x, y, age) in enumerate(self.trail_positions):
-            # Calculate alpha/size based on age (older = more transparent/smaller)
-            alpha = max(0, 255 - (age * 32))  # fade out over time
-            size = max(2, self.width // 2 - age * 2)  # shrink over time
-            
-            if alpha <= 0:
+        """Draw the movement trail behind the fighter, oldest point first"""
+        if self._trail_segments_color != self.base_color:
+            self._build_trail_segments()
+        segments = self._trail_segments
+        slots = len(self._trail_born)
+        ox, oy = offset
+        for k in range(self._trail_count, 0, -1):
+            i = (self._trail_head - k) % slots
+            segment = segments[self.trail_tick - self._trail_born[i] + 1]
+            if segment is None:
                 continue
-                
-            # Create a darker version of the fighter's color for the trail
-            trail_color = tuple(max(0, int(c * 0.6)) for c in self.base_color)
-            
-            # Create surface with alpha for trail segment
-            trail_surf = pygame.Surface((size, size), pygame.SRCALPHA)
-            trail_surf.fill((*trail_color, alpha))
-            
+            surf, half = segment
             # Draw trail segment centered on position
-            screen.blit(trail_surf, 
-                       (x - size // 2 + offset[0], y - size // 2 + offset[1]))
+            screen.blit(surf, (self._trail_x[i] - half + ox, self._trail_y[i] - half + oy))
+
+    def interp_offset(self, offset, alpha):
+        """Draw offset that places the fighter `alpha` of the way from its
+        previous position to its current one"""
+        back = 1.0 - alpha
+        return (offset[0] - round((self.x - self.prev_x) * back),
+                offset[1] - round((self.y - self.prev_y) * back))
+
+    def dirty_rect(self, offset=(0, 0)):
+        """Screen area draw() touches: the body plus live trail segments"""
+        ox, oy = offset
+        left, top = self.x + ox, self.y + oy
+        right, bottom = left + self.width, top + self.height
+        slots = len(self._trail_born)
+        half = max(2, self.width // 2 - 2) // 2 + 1  # largest segment is the newest
+        for k in range(self._trail_count):
+            i = (self._trail_head - 1 - k) % slots
+            tx, ty = self._trail_x[i] + ox, self._trail_y[i] + oy
+            left = min(left, tx - half); top = min(top, ty - half)
+            right = max(right, tx + half); bottom = max(bottom, ty + half)
+        return pygame.Rect(left, top, right - left, bottom - top)
 
     def get_rect(self):
         return pygame.Rect(self.x, self.y, self.width, self.height)
@@ -151,3 +231,10 @@ class Fighter:
         if amount <= 0:
             return
         self.health = min(self.max_health, self.health + amount)
+
+    def update_health_bar_value(self, speed=1):
+        """Ease displayed_health up to `speed` towards health, so the bar lags hits"""
+        if self.displayed_health > self.health:
+            self.displayed_health = max(self.health, self.displayed_health - speed)
+        elif self.displayed_health < self.health:
+            self.displayed_health = min(self.health, self.displayed_health + speed)
@@ -0,0 +1,274 @@
+import numpy as np
+import pygame
+from fighter import (BLINK_PERIOD, HURT_FLASH_FRAMES, INVINCIBLE_PALETTE, MAX_TRAIL_LENGTH,
+                     TRAIL_SPACING, build_trail_segments)
+
+
+class FighterStore:
+    """Every fighter of a crowd kept as parallel NumPy arrays.
+
+    Row i holds what one Fighter object would: position, speed, health,
+    effect timers and a fixed ring of trail points. move(), update_effects(),
+    ease_health() and damage() advance all live fighters with whole-array
+    operations and the same rules as Fighter, so per-fighter cost stays a
+    few array elements however large the crowd gets. All fighters share one
+    size and one arena; view(i) gives the usual per-fighter API.
+    """
+
+    def __init__(self, spawns, colors, width, height, health,
+                 arena_x, arena_y, arena_width, arena_height):
+        n = len(spawns)
+        self.n = n
+        self.width = width
+        self.height = height
+        self.max_health = health
+        self.arena = (arena_x, arena_y, arena_width, arena_height)
+        x, y, dx, dy = zip(*spawns) if n else ((), (), (), ())
+        self.x = np.array(x, dtype=np.int64)
+        self.y = np.array(y, dtype=np.int64)
+        self.prev_x = self.x.copy()  # position before the last move(), for interpolation
+        self.prev_y = self.y.copy()
+        self.dx = np.array(dx, dtype=np.int64)
+        self.dy = np.array(dy, dtype=np.int64)
+        self.base_color = list(colors)
+
+        # Health and effects
+        self.health = np.full(n, health, dtype=np.int64)
+        self.displayed_health = self.health.copy()
+        self.invincible = np.zeros(n, dtype=bool)
+        self.invincible_timer = np.zeros(n, dtype=np.int64)
+        self.hurt_timer = np.zeros(n, dtype=np.int64)
+        self.alive = np.ones(n, dtype=bool)  # only live fighters move and tick
+
+        # Movement trails: one ring of trail slots per row
+        self.max_trail_length = MAX_TRAIL_LENGTH
+        self.trail_spacing = TRAIL_SPACING
+        slots = -(-MAX_TRAIL_LENGTH // TRAIL_SPACING)
+        self.trail_x = np.zeros((n, slots), dtype=np.int64)
+        self.trail_y = np.zeros((n, slots), dtype=np.int64)
+        self.trail_born = np.zeros((n, slots), dtype=np.int64)
+        self.trail_head = np.zeros(n, dtype=np.int64)
+        self.trail_count = np.zeros(n, dtype=np.int64)
+        self.trail_counter = np.zeros(n, dtype=np.int64)
+        self.trail_tick = np.zeros(n, dtype=np.int64)
+        self._rows = np.arange(n)
+        self._trail_segments = {}  # base colour -> segment surfaces
+
+        self.views = [FighterView(self, i) for i in range(n)]
+
+    def __len__(self):
+        return self.n
+
+    def view(self, i):
+        return self.views[i]
+
+    # --- bulk updates ---
+    def move(self):
+        """Fighter.move for every live fighter"""
+        alive = self.alive
+        np.copyto(self.prev_x, self.x, where=alive)
+        np.copyto(self.prev_y, self.y, where=alive)
+        self.x += self.dx * alive
+        self.y += self.dy * alive
+
+        # Bounce off arena walls
+        ax, ay, aw, ah = self.arena
+        flip = alive & ((self.x <= ax) | (self.x + self.width >= ax + aw))
+        self.dx[flip] *= -1
+        flip = alive & ((self.y <= ay) | (self.y + self.height >= ay + ah))
+        self.dy[flip] *= -1
+
+    def update_effects(self):
+        """Fighter.update_effects for every live fighter"""
+        alive = self.alive
+        self.hurt_timer -= alive & (self.hurt_timer > 0)
+        inv = self.invincible_timer > 0
+        self.invincible[alive] = inv[alive]
+        self.invincible_timer -= alive & inv
+
+        # Update trail positions
+        self.trail_tick += alive
+        self.trail_counter += alive
+        slots = self.trail_x.shape[1]
+        add = np.flatnonzero(alive & (self.trail_counter >= self.trail_spacing))
+        if len(add):
+            head = self.trail_head[add]
+            self.trail_x[add, head] = self.x[add] + self.width // 2
+            self.trail_y[add, head] = self.y[add] + self.height // 2
+            self.trail_born[add, head] = self.trail_tick[add]
+            self.trail_head[add] = (head + 1) % slots
+            self.trail_count[add] = np.minimum(self.trail_count[add] + 1, slots)
+            self.trail_counter[add] = 0
+
+        # Points age by one per tick; drop the ones past max_trail_length
+        rows = self._rows
+        for _ in range(slots):
+            oldest = (self.trail_head - self.trail_count) % slots
+            expired = (alive & (self.trail_count > 0)
+                       & (self.trail_tick - self.trail_born[rows, oldest] >= self.max_trail_length))
+            if not expired.any():
+                break
+            self.trail_count -= expired
+
+    def ease_health(self, speed=1):
+        """Fighter.update_health_bar_value for every fighter: displayed
+        health moves up to `speed` towards the real value"""
+        np.clip(self.health, self.displayed_health - speed, self.displayed_health + speed,
+                out=self.displayed_health)
+
+    def damage(self, idx, amount):
+        """Apply `amount` to fighters idx[0], idx[1], ... in that order.
+
+        A fighter may appear several times; each hit lands on what the ones
+        before it left, exactly as repeated take_damage() calls would.
+        Returns the damage each entry actually dealt.
+        """
+        idx = np.asarray(idx, dtype=np.int64)
+        if amount <= 0 or len(idx) == 0:
+            return np.zeros(len(idx), dtype=np.int64)
+        # how many earlier entries hit the same fighter
+        order = np.argsort(idx, kind="stable")
+        sorted_idx = idx[order]
+        starts = np.flatnonzero(np.r_[True, sorted_idx[1:] != sorted_idx[:-1]])
+        run = np.arange(len(idx)) - np.repeat(starts, np.diff(np.r_[starts, len(idx)]))
+        earlier = np.empty(len(idx), dtype=np.int64)
+        earlier[order] = run
+
+        left = self.health[idx] - earlier * amount
+        applied = np.clip(left, 0, amount)
+        applied[self.invincible[idx]] = 0
+        np.subtract.at(self.health, idx, applied)
+        self.hurt_timer[idx[applied > 0]] = HURT_FLASH_FRAMES
+        return applied
+
+    def kill(self, idx):
+        """Take fighters out of the bulk updates"""
+        self.alive[idx] = False
+
+    # --- drawing ---
+    def trail_segments(self, color):
+        segments = self._trail_segments.get(color)
+        if segments is None:
+            segments = self._trail_segments[color] = build_trail_segments(
+                color, self.width, self.max_trail_length)
+        return segments
+
+
+class FighterView:
+    """Fighter API over one row of a FighterStore.
+
+    Reads and writes go straight to the store's arrays, so a view can stand
+    in for a Fighter wherever the game or the match rules expect one.
+    """
+
+    __slots__ = ("store", "i")
+
+    def __init__(self, store, i):
+        self.store = store
+        self.i = i
+
+    def _field(name):
+        def get(self):
+            return getattr(self.store, name)[self.i].item()
+
+        def set(self, value):
+            getattr(self.store, name)[self.i] = value
+        return property(get, set)
+
+    x = _field("x")
+    y = _field("y")
+    prev_x = _field("prev_x")
+    prev_y = _field("prev_y")
+    dx = _field("dx")
+    dy = _field("dy")
+    health = _field("health")
+    displayed_health = _field("displayed_health")
+    invincible = _field("invincible")
+    invincible_timer = _field("invincible_timer")
+    hurt_timer = _field("hurt_timer")
+    del _field
+
+    @property
+    def width(self): return self.store.width
+
+    @property
+    def height(self): return self.store.height
+
+    @property
+    def max_health(self): return self.store.max_health
+
+    @property
+    def base_color(self): return self.store.base_color[self.i]
+
+    @base_color.setter
+    def base_color(self, color): self.store.base_color[self.i] = color
+
+    @property
+    def trail_positions(self):
+        """Live trail points as (x, y, age) tuples, oldest first"""
+        s, i = self.store, self.i
+        slots = s.trail_x.shape[1]
+        head, tick = int(s.trail_head[i]), int(s.trail_tick[i])
+        points = []
+        for k in range(int(s.trail_count[i]), 0, -1):
+            j = (head - k) % slots
+            points.append((int(s.trail_x[i, j]), int(s.trail_y[i, j]),
+                           tick - int(s.trail_born[i, j]) + 1))
+        return points
+
+    def draw(self, screen, offset=(0, 0)):
+        s = self.store
+        ox, oy = offset
+        # Draw trail first (behind fighter)
+        segments = s.trail_segments(self.base_color)
+        for tx, ty, age in self.trail_positions:
+            segment = segments[age]
+            if segment is not None:
+                surf, half = segment
+                screen.blit(surf, (tx - half + ox, ty - half + oy))
+
+        if self.invincible:
+            color = INVINCIBLE_PALETTE[(self.invincible_timer // 2) % len(INVINCIBLE_PALETTE)]
+        elif self.hurt_timer > 0 and (self.hurt_timer % BLINK_PERIOD) < (BLINK_PERIOD // 2):
+            color = (255, 255, 255)
+        else:
+            color = self.base_color
+        pygame.draw.rect(screen, color, (self.x + ox, self.y + oy, s.width, s.height))
+
+    def interp_offset(self, offset, alpha):
+        back = 1.0 - alpha
+        return (offset[0] - round((self.x - self.prev_x) * back),
+                offset[1] - round((self.y - self.prev_y) * back))
+
+    def dirty_rect(self, offset=(0, 0)):
+        """Screen area draw() touches: the body plus live trail segments"""
+        ox, oy = offset
+        w, h = self.store.width, self.store.height
+        rect = pygame.Rect(self.x + ox, self.y + oy, w, h)
+        half = max(2, w // 2 - 2) // 2 + 1
+        for tx, ty, _ in self.trail_positions:
+            rect.union_ip((tx + ox - half, ty + oy - half, 2 * half, 2 * half))
+        return rect
+
+    def get_rect(self):
+        return pygame.Rect(self.x, self.y, self.store.width, self.store.height)
+
+    def collides_with(self, other):
+        return self.get_rect().colliderect(other.get_rect())
+
+    def take_damage(self, amount):
+        return int(self.store.damage([self.i], amount)[0])
+
+    def grant_invincibility(self, frames):
+        self.invincible_timer = max(self.invincible_timer, frames)
+        self.invincible = True
+
+    def heal(self, amount):
+        if amount <= 0:
+            return
+        self.health = min(self.max_health, self.health + amount)
+
+    def update_health_bar_value(self, speed=1):
+        s, i = self.store, self.i
+        s.displayed_health[i] = np.clip(s.health[i], s.displayed_health[i] - speed,
+                                        s.displayed_health[i] + speed)
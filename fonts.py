@@ -0,0 +1,57 @@
+import pygame
+from collections import OrderedDict
+
+FONT_PATH = "assets/fonts/PressStart2P.ttf"
+TEXT_CACHE_SIZE = 256   # rendered strings kept around
+
+_fonts = {}
+
+
+def get_font(size, path=FONT_PATH):
+    """Shared Font for (path, size); the TTF is only parsed the first time"""
+    key = (path, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.Font(path, size)
+    return font
+
+
+class TextCache:
+    """Bounded LRU cache of rendered text surfaces.
+
+    Fonts come from get_font, so one Font object stands for one (path, size)
+    and the key is simply (font, text, color). Surfaces are shared between
+    callers: render() sets the requested alpha on every call, so blit the
+    result straight away instead of holding on to it.
+    """
+
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+
+    def render(self, font, text, color, alpha=255):
+        key = (font, text, color)
+        surf = self._surfaces.get(key)
+        if surf is None:
+            surf = font.render(text, True, color)
+            self._surfaces[key] = surf
+            if len(self._surfaces) > self.max_entries:
+                self._surfaces.popitem(last=False)
+        else:
+            self._surfaces.move_to_end(key)
+        surf.set_alpha(alpha)
+        return surf
+
+    def clear(self):
+        self._surfaces.clear()
+
+    def __len__(self):
+        return len(self._surfaces)
+
+
+text_cache = TextCache()
+
+
+def render_text(font, text, color, alpha=255):
+    """font.render(text, True, color) through the shared text cache"""
+    return text_cache.render(font, text, tuple(color), alpha)
@@ -0,0 +1,168 @@
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")   # keep stdout clean for "-"
+import pygame
+
+QUEUE_FRAMES = 8   # frames in flight between the renderer and the writer
+
+
+class RawSink:
+    """Frames appended to one rgb24 stream (a file, or stdout for piping)"""
+
+    def __init__(self, path, stdout=None):
+        self.path = path
+        self.piped = path == "-"
+        self.file = (stdout or sys.stdout.buffer) if self.piped else open(path, "wb")
+
+    def write(self, index, frame):
+        self.file.write(frame.data)   # frame is C-contiguous rows of RGB
+
+    def close(self):
+        self.file.flush()
+        if not self.piped:
+            self.file.close()
+
+
+class PngSink:
+    """Frames written as out_dir/frame_000000.png, ..."""
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        os.makedirs(out_dir, exist_ok=True)
+
+    def write(self, index, frame):
+        h, w, _ = frame.shape
+        surf = pygame.image.frombuffer(frame, (w, h), "RGB")   # wraps, no copy
+        pygame.image.save(surf, os.path.join(self.out_dir, f"frame_{index:06d}.png"))
+
+    def close(self):
+        pass
+
+
+class FrameWriter:
+    """Hands rendered frames to a sink on a background thread.
+
+    submit() copies the surface's pixels straight out of its memory (a
+    surfarray view, no intermediate bytes object) into one of `depth`
+    preallocated frame buffers and queues it; the writer thread encodes and
+    writes it and returns the buffer to the pool. Memory stays at `depth`
+    frames. Only when the writer is `depth` frames behind does submit()
+    wait for a buffer; those waits are counted in .stalls.
+    """
+
+    def __init__(self, sink, size, depth=QUEUE_FRAMES):
+        w, h = size
+        self.sink = sink
+        self.size = size
+        self._free = queue.Queue()
+        for _ in range(depth):
+            self._free.put(np.empty((h, w, 3), dtype=np.uint8))
+        self._work = queue.Queue()
+        self.frames = 0
+        self.stalls = 0
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name="frame-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, surface):
+        if self.error is not None:
+            raise self.error
+        try:
+            frame = self._free.get_nowait()
+        except queue.Empty:
+            self.stalls += 1
+            frame = self._free.get()
+        view = pygame.surfarray.pixels3d(surface)   # (w, h, 3), locks the surface
+        np.copyto(frame, view.transpose(1, 0, 2))   # one copy into row-major RGB
+        del view                                    # unlock before the next draw
+        self._work.put((self.frames, frame))
+        self.frames += 1
+
+    def _run(self):
+        while True:
+            item = self._work.get()
+            if item is None:
+                return
+            index, frame = item
+            try:
+                if self.error is None:
+                    self.sink.write(index, frame)
+            except Exception as e:   # surfaced on the next submit()/close()
+                self.error = e
+            self._free.put(frame)
+
+    def close(self):
+        """Wait for queued frames to be written, then close the sink"""
+        self._work.put(None)
+        self._thread.join()
+        self.sink.close()
+        if self.error is not None:
+            raise self.error
+
+
+def export(out, fmt="png", rounds=1, seconds=None, seed=None, bet="RED", depth=QUEUE_FRAMES):
+    """Render scripted rounds offscreen and stream their frames to `out`
+    (a directory for png, a file or "-" for raw rgb24). Returns stats."""
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ["HITBOX_PARTICLE_BUDGET"] = "0"   # full effects; nobody watches live
+    if seed is not None:
+        os.environ["HITBOX_SEED"] = str(seed)
+    import autoplay
+
+    if out != "-":
+        out = os.path.abspath(out)   # the game runs from the repo directory
+    stdout = sys.stdout
+    writer = [None]
+
+    def on_frame(screen, frame):
+        if writer[0] is None:
+            sink = PngSink(out) if fmt == "png" else RawSink(out, stdout.buffer)
+            writer[0] = FrameWriter(sink, screen.get_size(), depth)
+        writer[0].submit(screen)
+
+    start = time.perf_counter()
+    if out == "-":
+        sys.stdout = sys.stderr   # the game's own prints must not corrupt the stream
+    try:
+        autoplay.play(seconds=seconds, rounds=None if seconds else rounds, on_frame=on_frame, bet=bet)
+    finally:
+        sys.stdout = stdout
+        if writer[0] is not None:
+            writer[0].close()
+    elapsed = time.perf_counter() - start
+    w = writer[0]
+    stats = {"frames": w.frames if w else 0, "seconds": elapsed, "stalls": w.stalls if w else 0,
+             "size": list(w.size) if w else None, "fps": 60, "format": fmt}
+    if fmt == "rgb" and out != "-" and w is not None:
+        with open(out + ".json", "w") as f:
+            json.dump(dict(stats, pix_fmt="rgb24"), f, indent=2)
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Render HitBox rounds offscreen to frames")
+    parser.add_argument("out", help='PNG directory, raw file, or "-" for raw to stdout')
+    parser.add_argument("--format", choices=("png", "rgb"), default="png")
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--seconds", type=float, help="fixed length instead of whole rounds")
+    parser.add_argument("--seed", type=int, help="session seed (HITBOX_SEED)")
+    parser.add_argument("--bet", choices=("RED", "BLUE"), default="RED")
+    parser.add_argument("--queue", type=int, default=QUEUE_FRAMES, help="frames in flight")
+    args = parser.parse_args()
+    stats = export(args.out, args.format, args.rounds, args.seconds, args.seed, args.bet, args.queue)
+    w, h = stats["size"] or (0, 0)
+    print(f"{stats['frames']} frames ({w}x{h}) in {stats['seconds']:.1f} s, "
+          f"{stats['frames'] / max(stats['seconds'], 1e-9):.0f} fps, {stats['stalls']} writer stalls",
+          file=sys.stderr)
+    if args.format == "rgb":
+        print(f"encode with: ffmpeg -f rawvideo -pix_fmt rgb24 -s {w}x{h} -r 60 -i {args.out} out.mp4",
+              file=sys.stderr)
@@ -0,0 +1,42 @@
+import pygame
+
+
+class StaticLayer:
+    """Opaque background with static chrome baked in once per resolution.
+
+    `build(surface)` paints the chrome onto a surface already filled with
+    `background`; it runs the first time a screen size is drawn. draw() then
+    replaces the per-frame fill and primitive calls with one blit, filling
+    only the strips a shake offset uncovers.
+    """
+
+    def __init__(self, build, background=(0, 0, 0)):
+        self.build = build
+        self.background = background
+        self._surfaces = {}
+
+    def surface(self, size):
+        surf = self._surfaces.get(size)
+        if surf is None:
+            surf = pygame.Surface(size)
+            if pygame.display.get_surface() is not None:
+                surf = surf.convert()
+            surf.fill(self.background)
+            self.build(surf)
+            self._surfaces[size] = surf
+        return surf
+
+    def invalidate(self):
+        """Drop the baked surfaces, e.g. after the chrome itself changed"""
+        self._surfaces.clear()
+
+    def draw(self, screen, offset=(0, 0)):
+        ox, oy = offset
+        w, h = screen.get_size()
+        if ox or oy:
+            # uncovered edge strips
+            if ox > 0: screen.fill(self.background, (0, 0, ox, h))
+            elif ox < 0: screen.fill(self.background, (w + ox, 0, -ox, h))
+            if oy > 0: screen.fill(self.background, (0, 0, w, oy))
+            elif oy < 0: screen.fill(self.background, (0, h + oy, w, -oy))
+        return screen.blit(self.surface((w, h)), (ox, oy))
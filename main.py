@@ -1,8 +1,20 @@
 import pygame 
-import random
 import math
-from fighter import Fighter
-from particles import Particle, ParticleSystem
+import os
+from particles import ParticleSystem, ParticleGovernor
+from fonts import get_font, render_text
+from dirty import DirtyRects
+from layers import StaticLayer
+from rng import RngStreams
+from replay import MatchRecorder
+from perf_overlay import FrameProfiler, ProfilerOverlay, NetBlockCounter
+from profile_capture import capture_from_env
+from engine import Match, ARENA_X, ARENA_Y, ARENA_WIDTH, ARENA_HEIGHT
+from scoring import START_SCORE, bet_delta
+try:
+    from odds import estimate_odds_async, make_pool
+except ImportError:  # NumPy not installed: bets stay at even odds
+    estimate_odds_async = None
 
 # === Setup ===
 pygame.init()
@@ -12,24 +24,10 @@ pygame.display.set_caption("HitBox")
 clock = pygame.time.Clock()
 
 # === Arena Settings ===
-ARENA_MARGIN = 50
-ARENA_WIDTH = SCREEN_WIDTH - 2 * ARENA_MARGIN
-ARENA_HEIGHT = 300
-ARENA_X = ARENA_MARGIN
-ARENA_Y = ARENA_MARGIN
+# Arena geometry, combat tuning and fighter settings live in engine.py so the
+# headless Match and this front end share one set of rules.
 OUTLINE_THICKNESS = 5
 
-# === Combat Tuning ===
-DAMAGE = 10  # collision damage; Health pickup heals by this amount too
-
-# === Fighter Settings ===
-FIGHTER_SIZE = 50
-FIGHTER_WIDTH = FIGHTER_SIZE
-FIGHTER_HEIGHT = FIGHTER_SIZE
-dx = 4
-dy = 3
-health = 100
-
 # === Health Bar Settings ===
 HEALTH_BAR_WIDTH = 240
 HEALTH_BAR_HEIGHT = 40
@@ -39,15 +37,15 @@ BLUE_BAR_Y = ARENA_Y + ARENA_HEIGHT + 30
 RED_BAR_Y = BLUE_BAR_Y
 
 # === Fonts ===
-font_big    = pygame.font.Font("assets/fonts/PressStart2P.ttf", 72)
-font_title  = pygame.font.Font("assets/fonts/PressStart2P.ttf", 56)
-font_result = pygame.font.Font("assets/fonts/PressStart2P.ttf", 48)
-font_item   = pygame.font.Font("assets/fonts/PressStart2P.ttf", 42)
-font_label  = pygame.font.Font("assets/fonts/PressStart2P.ttf", 20)
-font_small  = pygame.font.Font("assets/fonts/PressStart2P.ttf", 18)
+font_big    = get_font(72)
+font_title  = get_font(56)
+font_result = get_font(48)
+font_item   = get_font(42)
+font_label  = get_font(20)
+font_small  = get_font(18)
 # Select screen fonts
-font_select_head = pygame.font.Font("assets/fonts/PressStart2P.ttf", 32)
-font_select_hint = pygame.font.Font("assets/fonts/PressStart2P.ttf", 20)
+font_select_head = get_font(32)
+font_select_hint = get_font(20)
 
 # === Game States ===
 STATE_SPLASH         = -1
@@ -56,9 +54,14 @@ STATE_PLAYING        = 0
 STATE_PAUSED         = 1
 STATE_GAMEOVER_TRANS = 2   # blur/fade + point-count animation
 STATE_GAMEOVER       = 3   # menu fades in here
+STATE_NAMES = {STATE_SPLASH: "STATE_SPLASH", STATE_SELECT: "STATE_SELECT",
+               STATE_PLAYING: "STATE_PLAYING", STATE_PAUSED: "STATE_PAUSED",
+               STATE_GAMEOVER_TRANS: "STATE_GAMEOVER_TRANS", STATE_GAMEOVER: "STATE_GAMEOVER"}
 state = STATE_SPLASH
 
 # === Transition (retro checkerboard) ===
+CHECKER_KEY = (255, 0, 255)  # colorkey for the see-through part of a frame
+
 class Transition:
     def __init__(self):
         self.active = False
@@ -70,6 +73,9 @@ class Transition:
         self.tile = 24
         self.cols = (SCREEN_WIDTH  + self.tile - 1) // self.tile
         self.rows = (SCREEN_HEIGHT + self.tile - 1) // self.tile
+        # one colorkeyed checkerboard per (screen size, tile, parity); each
+        # frame blits the covered (or uncovered) band of rows from it
+        self.boards = {}
 
     def start(self, duration_frames, next_state):
         self.active = True
@@ -89,34 +95,44 @@ class Transition:
             else:
                 self.active = False
 
-    def _draw_checker_phase(self, surf, p, invert=False):
+    def _checker_rows(self, p, rows):
+        """Rows covered by each tile parity at progress p"""
+        covered = []
         for parity in (0, 1):
             prog = max(0.0, min(1.0, p * 2.0 - parity))
-            if prog <= 0: 
-                continue
-            max_row = int(self.rows * prog + 0.999)
-            for j in range(max_row):
-                for i in range(self.cols):
-                    if ((i + j) & 1) != parity:
-                        continue
-                    x = i * self.tile
-                    y = j * self.tile
-                    if not invert:
-                        pygame.draw.rect(surf, (0,0,0), (x, y, self.tile, self.tile))
-        if invert:
-            overlay = pygame.Surface(surf.get_size(), pygame.SRCALPHA)
-            overlay.fill((0,0,0,255))
-            for parity in (0, 1):
-                prog = max(0.0, min(1.0, p * 2.0 - parity))
-                max_row = int(self.rows * prog + 0.999)
-                for j in range(max_row):
-                    for i in range(self.cols):
-                        if ((i + j) & 1) != parity: 
-                            continue
-                        x = i * self.tile
-                        y = j * self.tile
-                        pygame.draw.rect(overlay, (0,0,0,0), (x, y, self.tile, self.tile))
-            surf.blit(overlay, (0,0))
+            covered.append(int(rows * prog + 0.999) if prog > 0 else 0)
+        return tuple(covered)
+
+    def _checker_board(self, size, parity):
+        """Black tiles of one parity on a see-through board, built once per size"""
+        key = (size, self.tile, parity)
+        board = self.boards.get(key)
+        if board is not None:
+            return board
+        tile = self.tile
+        cols = (size[0] + tile - 1) // tile
+        rows = (size[1] + tile - 1) // tile
+        board = pygame.Surface(size)
+        board.fill(CHECKER_KEY)
+        board.set_colorkey(CHECKER_KEY)
+        for j in range(rows):
+            for i in range(cols):
+                if ((i + j) & 1) == parity:
+                    board.fill((0,0,0), (i * tile, j * tile, tile, tile))
+        self.boards[key] = board
+        return board
+
+    def _draw_checker_phase(self, surf, p, invert=False):
+        size = surf.get_size()
+        covered = self._checker_rows(p, (size[1] + self.tile - 1) // self.tile)
+        # "out" covers rows [0, covered) with black tiles, "in" leaves only
+        # the rows past them black
+        for parity in (0, 1):
+            edge = covered[parity] * self.tile
+            top, bottom = (edge, size[1]) if invert else (0, min(edge, size[1]))
+            if bottom > top:
+                band = pygame.Rect(0, top, size[0], bottom - top)
+                surf.blit(self._checker_board(size, parity), band, band)
 
     def draw_overlay(self, surf):
         if not self.active: return
@@ -142,15 +158,54 @@ GO_FADE_FRAMES = 54
 go_fade_t = 0
 go_menu_alpha = 0   # menu fades in during STATE_GAMEOVER
 
+# === Randomness ===
+# One seedable stream per subsystem: rounds, particles and screen effects
+# never share a generator, so a round's outcome depends on its seed alone.
+# HITBOX_SEED replays a whole session.
+rng_streams = RngStreams(int(os.environ["HITBOX_SEED"]) if os.environ.get("HITBOX_SEED") else None)
+fx_rng = rng_streams.stream("effects")   # shake and damage text jitter
+
 # === Shake ===
 shake_timer = 0
 shake_intensity = 1.0  # multiplier for shake strength
 shake_offset = [0, 0]
 
 # === Enhanced Particle System ===
-particle_system = ParticleSystem()
+# HITBOX_PARTICLES=array switches to the NumPy structure-of-arrays backend.
+# Bursts are thinned to keep particle update+draw under HITBOX_PARTICLE_BUDGET
+# ms per frame (0 turns the governor off, e.g. for pixel-exact seeded runs).
+PARTICLE_BACKEND = os.environ.get("HITBOX_PARTICLES", "objects")
+PARTICLE_BUDGET_MS = float(os.environ.get("HITBOX_PARTICLE_BUDGET", "4"))
+particle_governor = ParticleGovernor(PARTICLE_BUDGET_MS) if PARTICLE_BUDGET_MS > 0 else None
+if PARTICLE_BACKEND == "array":
+    from particle_arrays import ArrayParticleSystem
+    particle_system = ArrayParticleSystem(seed=rng_streams.seed_for("particles"),
+                                          governor=particle_governor)
+else:
+    particle_system = ParticleSystem(rng=rng_streams.stream("particles"),
+                                     governor=particle_governor)
 damage_texts = []
 
+# === Presentation ===
+# HITBOX_RENDER=dirty pushes only the changed parts of gameplay frames to the
+# display (pygame.display.update(rects)) instead of flipping the whole screen
+RENDER_MODE = os.environ.get("HITBOX_RENDER", "full")
+dirty = DirtyRects(enabled=(RENDER_MODE == "dirty"), screen_rect=screen.get_rect())
+
+# === Profiling ===
+# Every frame is timed phase by phase into ring buffers; F3 (or
+# HITBOX_PROFILE_OVERLAY=1 at start) shows mean/p95/p99/max per phase
+PROFILE_PHASES = ("events", "fighters", "pickups", "collisions", "effects", "particles",
+                  "d.arena", "d.fighters", "d.pickups", "d.particles", "d.hud", "d.overlay",
+                  "d.profiler", "present", "wait")
+profiler = FrameProfiler(PROFILE_PHASES)
+profiler_overlay = ProfilerOverlay(profiler, get_font(8),
+                                   visible=os.environ.get("HITBOX_PROFILE_OVERLAY") == "1")
+block_counter = NetBlockCounter()
+# F4 (or HITBOX_PROFILE_AT=start / a state name) runs the next
+# HITBOX_PROFILE_FRAMES frames under cProfile and saves them to HITBOX_PROFILE_DIR
+profile_capture = capture_from_env()
+
 # === Sound System ===
 class SoundManager:
     """Sound system with placeholder functions for future audio implementation"""
@@ -225,29 +280,32 @@ pickup_flashes = []  # stores (x, y, timer, color) for pickup collection flashes
 class DamageText:
     def __init__(self, x, y, amount, color=(255, 255, 255), lifetime=32):
         self.x = float(x); self.y = float(y)
-        self.vx = random.uniform(-0.3, 0.3); self.vy = -1.3
+        self.vx = fx_rng.uniform(-0.3, 0.3); self.vy = -1.3
         self.age = 0; self.lifetime = lifetime
         self.amount = int(amount); self.color = color
-        self.font = pygame.font.Font("assets/fonts/PressStart2P.ttf", 28)
+        self.font = get_font(28)
         self.jitter = 0.15
     @property
     def dead(self): return self.age >= self.lifetime
     def update(self):
-        self.x += self.vx + random.uniform(-self.jitter, self.jitter)
+        self.x += self.vx + fx_rng.uniform(-self.jitter, self.jitter)
         self.y += self.vy; self.vy *= 0.96; self.age += 1
     def draw(self, screen, offset=(0,0)):
         left = max(0, self.lifetime - self.age)
         alpha = int(255 * (left / self.lifetime))
-        surf = self.font.render(str(self.amount), True, self.color)
-        surf.set_alpha(alpha)
-        screen.blit(surf, (int(self.x)+offset[0], int(self.y)+offset[1]))
+        surf = render_text(self.font, str(self.amount), self.color, alpha)
+        return screen.blit(surf, (int(self.x)+offset[0], int(self.y)+offset[1]))
 
 # === Score System ===
-current_score = 100
-high_score = 100
-POINT_WIN = 25
-POINT_LOSS = -25
-points_delta = 0            # +25 / -25 / 0 (draw)
+current_score = START_SCORE
+high_score = START_SCORE
+ODDS_PRECISION = 0.03       # +/- on the select-screen odds; coarse so they arrive quickly
+bet_odds = None             # OddsEstimate locked in when the bet was placed
+# Worker processes for the odds engine, kept for the whole session so the
+# Monte Carlo runs never share the game loop's GIL. Started by the first
+# round priced, and only when running as the game (see prepare_next_round)
+odds_pool = None
+points_delta = 0            # win payout / -25 / 0 (draw)
 delta_color = (255, 255, 255) # white for loss or draw, yellow for gain
 delta_count_value = 0       # animated count shown during GAMEOVER_TRANS
 
@@ -256,21 +314,30 @@ def pad6(n):  # zero-padded like retro counters
 
 def draw_scoreboard(show_high=True):
     # top-left: SCORE
-    score_surf = font_small.render(f"SCORE {pad6(current_score)}", True, (255,255,255))
+    score_surf = render_text(font_small, f"SCORE {pad6(current_score)}", (255,255,255))
     screen.blit(score_surf, (8, 8))
     if show_high:
-        hi_surf = font_small.render(f"HI {pad6(high_score)}", True, (255,255,255))
+        hi_surf = render_text(font_small, f"HI {pad6(high_score)}", (255,255,255))
         hw, _ = hi_surf.get_size()
         screen.blit(hi_surf, (SCREEN_WIDTH - hw - 8, 8))
 
 # === UI Helpers ===
-def draw_health_bar(screen, x, y, current, displayed, max_health, color, offset, align="left"):
-    OUTLINE_PADDING = 4; FILL_PADDING = 5
+HEALTH_BAR_OUTLINE_PADDING = 4; HEALTH_BAR_FILL_PADDING = 5
+
+def draw_health_bar_frame(screen, x, y, offset=(0,0)):
+    """White outline and black inner box; static, so baked into arena_chrome"""
+    OUTLINE_PADDING = HEALTH_BAR_OUTLINE_PADDING
     x += offset[0]; y += offset[1]
     pygame.draw.rect(screen, (255,255,255), (x, y, HEALTH_BAR_WIDTH, HEALTH_BAR_HEIGHT))
+    pygame.draw.rect(screen, (0,0,0), (x + OUTLINE_PADDING, y + OUTLINE_PADDING,
+        HEALTH_BAR_WIDTH - 2*OUTLINE_PADDING, HEALTH_BAR_HEIGHT - 2*OUTLINE_PADDING))
+
+def draw_health_bar(screen, x, y, current, displayed, max_health, color, offset, align="left"):
+    """Health fills only; the frame comes from draw_health_bar_frame"""
+    OUTLINE_PADDING = HEALTH_BAR_OUTLINE_PADDING; FILL_PADDING = HEALTH_BAR_FILL_PADDING
+    x += offset[0]; y += offset[1]
     inner_x = x + OUTLINE_PADDING; inner_y = y + OUTLINE_PADDING
     inner_w = HEALTH_BAR_WIDTH - 2*OUTLINE_PADDING; inner_h = HEALTH_BAR_HEIGHT - 2*OUTLINE_PADDING
-    pygame.draw.rect(screen, (0,0,0), (inner_x, inner_y, inner_w, inner_h))
     usable_w = inner_w - 2*FILL_PADDING
     disp_w = int(usable_w * max(0, min(displayed, max_health))/max_health)
     curr_w = int(usable_w * max(0, min(current,  max_health))/max_health)
@@ -284,20 +351,28 @@ def draw_health_bar(screen, x, y, current, displayed, max_health, color, offset,
         cx = inner_x + inner_w - FILL_PADDING - curr_w
         pygame.draw.rect(screen, (255,255,255), (tx, fy, disp_w, fh))
         pygame.draw.rect(screen, color,          (cx, fy, curr_w, fh))
+    return pygame.Rect(x, y, HEALTH_BAR_WIDTH, HEALTH_BAR_HEIGHT)
 
-def draw_centered_label(text, bar_x, bar_y, bar_w, color, offset):
-    label = font_label.render(text, True, color)
+def draw_centered_label(text, bar_x, bar_y, bar_w, color, offset, surf=None):
+    surf = surf or screen
+    label = render_text(font_label, text, color)
     lw, _ = label.get_size()
     x = bar_x + offset[0] + (bar_w - lw)//2
     y = bar_y + offset[1] + HEALTH_BAR_HEIGHT + 6
-    screen.blit(label, (x, y))
+    surf.blit(label, (x, y))
 
-def update_health_bar_value(f):
-    speed = 1
-    if f.displayed_health > f.health:
-        f.displayed_health = max(f.health, f.displayed_health - speed)
-    elif f.displayed_health < f.health:
-        f.displayed_health = min(f.health, f.displayed_health + speed)
+def build_arena_chrome(surf):
+    """Arena outline, health bar frames and bar labels -- none of it moves"""
+    pygame.draw.rect(surf, "white",
+        (ARENA_X-OUTLINE_THICKNESS, ARENA_Y-OUTLINE_THICKNESS,
+         ARENA_WIDTH+2*OUTLINE_THICKNESS, ARENA_HEIGHT+2*OUTLINE_THICKNESS))
+    pygame.draw.rect(surf, "black", (ARENA_X, ARENA_Y, ARENA_WIDTH, ARENA_HEIGHT))
+    draw_health_bar_frame(surf, BLUE_BAR_X, BLUE_BAR_Y)
+    draw_health_bar_frame(surf, RED_BAR_X, RED_BAR_Y)
+    draw_centered_label("BLUE", BLUE_BAR_X, BLUE_BAR_Y, HEALTH_BAR_WIDTH, (150,180,255), (0,0), surf)
+    draw_centered_label("RED",  RED_BAR_X,  RED_BAR_Y,  HEALTH_BAR_WIDTH, (255,160,160), (0,0), surf)
+
+arena_chrome = StaticLayer(build_arena_chrome)
 
 def fast_blur(surf, scale=0.22, passes=2):
     if passes < 1: return surf.copy()
@@ -309,37 +384,90 @@ def fast_blur(surf, scale=0.22, passes=2):
         work = pygame.transform.smoothscale(work, (w, h))
     return work
 
+class BlurBackdrop:
+    """Blurred, shaded copy of the screen for the game-over overlay.
+
+    Blurs with the same smoothscale round trips as fast_blur, but into
+    buffers allocated on first use, and fills the shade in place. After
+    freeze() the finished backdrop is kept, so the game-over menu neither
+    redraws the arena underneath nor blurs it again.
+    """
+
+    def __init__(self, scale=0.22, passes=2, shade=160):
+        self.scale = scale
+        self.passes = passes
+        self.shade_alpha = shade
+        self.small = self.blurred = self.shade = self.frozen = None
+        self.is_frozen = False
+
+    def _alloc(self, screen):
+        w, h = screen.get_size()
+        size = (max(1, int(w*self.scale)), max(1, int(h*self.scale)))
+        # made from the screen so smoothscale's dest_surface formats match
+        self.small = pygame.transform.smoothscale(screen, size)
+        self.blurred = screen.copy()
+        self.frozen = screen.copy()
+        self.shade = pygame.Surface((w, h), pygame.SRCALPHA)
+
+    def reset(self):
+        self.is_frozen = False
+
+    def blur(self, screen):
+        """Blur the current screen into self.blurred"""
+        if self.blurred is None or self.blurred.get_size() != screen.get_size():
+            self._alloc(screen)
+        work = screen
+        for _ in range(self.passes):
+            pygame.transform.smoothscale(work, self.small.get_size(), self.small)
+            pygame.transform.smoothscale(self.small, self.blurred.get_size(), self.blurred)
+            work = self.blurred
+        return self.blurred
+
+    def draw(self, screen, progress):
+        """Fade the blurred screen and the shade in by `progress` (0..1)"""
+        if self.is_frozen:
+            screen.blit(self.frozen, (0,0))
+            return
+        blurred = self.blur(screen)
+        blurred.set_alpha(int(255 * progress))
+        screen.blit(blurred, (0,0))
+        self.shade.fill((0,0,0, int(self.shade_alpha*progress)))
+        screen.blit(self.shade, (0,0))
+
+    def freeze(self, screen):
+        """Keep what draw() just produced as the backdrop from now on"""
+        if not self.is_frozen and self.frozen is not None:
+            self.frozen.blit(screen, (0,0))
+            self.is_frozen = True
+
+gameover_backdrop = BlurBackdrop()
+
 def draw_pause_menu(screen, blurred_bg, items, idx):
     screen.blit(blurred_bg, (0,0))
     overlay = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
     overlay.fill((0,0,0,140)); screen.blit(overlay, (0,0))
     sw, sh = screen.get_size()
-    t = font_title.render("Paused", True, (255,255,255))
+    t = render_text(font_title, "Paused", (255,255,255))
     tw, th = t.get_size(); screen.blit(t, (sw//2 - tw//2, sh//2 - 160))
     start_y = sh//2 - 40; gap = 54
     for i, txt in enumerate(items):
         sel = (i == idx); col = (255,255,255) if sel else (200,200,200)
-        it = font_item.render(txt, True, col); iw, ih = it.get_size()
+        it = render_text(font_item, txt, col); iw, ih = it.get_size()
         screen.blit(it, (sw//2 - iw//2, start_y + i*gap))
         if sel:
-            ptr = font_item.render(">", True, col); pw,_ = ptr.get_size()
+            ptr = render_text(font_item, ">", col); pw,_ = ptr.get_size()
             screen.blit(ptr, (sw//2 - iw//2 - pw - 12, start_y + i*gap))
 
 def draw_gameover_overlay(screen, progress, show_menu, menu_alpha):
-    # blurred frame underneath
-    frame = screen.copy()
-    blurred = fast_blur(frame, scale=0.22, passes=2)
+    # blurred frame underneath; frozen once fully faded in
+    gameover_backdrop.draw(screen, progress)
+    if progress >= 1.0:
+        gameover_backdrop.freeze(screen)
     alpha = int(255 * progress)
-    blurred.set_alpha(alpha)
-    screen.blit(blurred, (0,0))
-    shade = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
-    shade.fill((0,0,0, int(160*progress)))
-    screen.blit(shade, (0,0))
 
     # Header text ("YOU WON/LOST/DRAW") in player's chosen color
     sw, sh = screen.get_size()
-    head = font_result.render(result_text, True, result_color)
-    head.set_alpha(alpha)
+    head = render_text(font_result, result_text, result_color, alpha)
     hw, hh = head.get_size()
     screen.blit(head, (sw//2 - hw//2, sh//2 - 170))
 
@@ -348,7 +476,7 @@ def draw_gameover_overlay(screen, progress, show_menu, menu_alpha):
     count_to_show = delta_count_value if progress < 1.0 else abs(points_delta)
     delta_txt = f"{sign}{count_to_show}"
     col = delta_color
-    delta_s = font_item.render(delta_txt, True, col)
+    delta_s = render_text(font_item, delta_txt, col)
     dw, dh = delta_s.get_size()
     # place just below header
     screen.blit(delta_s, (sw//2 - dw//2, sh//2 - 110))
@@ -359,13 +487,11 @@ def draw_gameover_overlay(screen, progress, show_menu, menu_alpha):
         for i, txt in enumerate(gameover_menu_items):
             sel = (i == gameover_menu_index)
             base_col = (255,255,255) if sel else (200,200,200)
-            it = font_item.render(txt, True, base_col)
-            it.set_alpha(menu_alpha)
+            it = render_text(font_item, txt, base_col, menu_alpha)
             iw, ih = it.get_size()
             screen.blit(it, (sw//2 - iw//2, start_y + i*gap))
             if sel:
-                ptr = font_item.render(">", True, base_col)
-                ptr.set_alpha(menu_alpha)
+                ptr = render_text(font_item, ">", base_col, menu_alpha)
                 pw,_ = ptr.get_size()
                 screen.blit(ptr, (sw//2 - iw//2 - pw - 12, start_y + i*gap))
 
@@ -380,139 +506,74 @@ def draw_pickup_flashes(screen, offset=(0,0)):
                 # Create surface with alpha
                 ring_surf = pygame.Surface((radius*4, radius*4), pygame.SRCALPHA)
                 pygame.draw.circle(ring_surf, (*color, alpha), (radius*2, radius*2), radius, 3)
-                screen.blit(ring_surf, (x - radius*2 + offset[0], y - radius*2 + offset[1]))
-
-# === Pickups ===
-class Pickup:
-    RADIUS = 14
-    LIFETIME = 6 * 60
+                dirty.add(screen.blit(ring_surf, (x - radius*2 + offset[0], y - radius*2 + offset[1])))
+
+# === Pickup effects ===
+def on_pickup_taken(kind, cx, cy):
+    """Visual/sound feedback for a pickup the match just handed out"""
+    global shake_timer, shake_intensity
+    if kind == "health":
+        flash_color = (34, 197, 94)  # green for health
+        sound_manager.play_pickup("health")
+        particle_system.add_pickup_glow(cx, cy, (34, 197, 94))
+    elif kind == "inv":
+        flash_color = (255, 255, 255)  # white for invincibility
+        sound_manager.play_pickup("invincibility")
+        particle_system.add_pickup_glow(cx, cy, (255, 255, 255))
+    else:
+        flash_color = (255, 255, 0)  # yellow for generic pickups
+        sound_manager.play_pickup("generic")
 
-    def __init__(self, cx, cy):
-        self.cx = cx; self.cy = cy
-        self.age = 0
-        d = self.RADIUS * 2
-        self.rect = pygame.Rect(cx - self.RADIUS, cy - self.RADIUS, d, d)
+    # Create expanding ring effect
+    pickup_flashes.append((cx, cy, 20, flash_color))
 
-    @property
-    def dead(self): return self.age >= self.LIFETIME
-    def update(self): self.age += 1
-    def colliding_fighters(self, f1, f2):
-        hits = []
-        if self.rect.colliderect(f1.get_rect()): hits.append(1)
-        if self.rect.colliderect(f2.get_rect()): hits.append(2)
-        return hits
-    def apply(self, fighter): raise NotImplementedError
-    def draw(self, screen, offset=(0,0)): raise NotImplementedError
-
-class HealthPickup(Pickup):
-    def apply(self, fighter): 
-        fighter.heal(DAMAGE)
-        # Create pickup glow effect
-        particle_system.add_pickup_glow(self.cx, self.cy, (34, 197, 94))
-        
-    def draw(self, screen, offset=(0,0)):
-        x = self.cx + offset[0]; y = self.cy + offset[1]
-        pygame.draw.circle(screen, (34,197,94), (x,y), self.RADIUS)
-        pygame.draw.circle(screen, (20,20,20), (x,y), self.RADIUS, 2)
-        arm = self.RADIUS // 2 + 2; thick = 4
-        pygame.draw.rect(screen, (255,255,255), (x - thick//2, y - arm, thick, 2*arm))
-        pygame.draw.rect(screen, (255,255,255), (x - arm, y - thick//2, 2*arm, thick))
-
-class InvincibilityPickup(Pickup):
-    DURATION_FRAMES = 5 * 60
-    def apply(self, fighter): 
-        fighter.grant_invincibility(self.DURATION_FRAMES)
-        # Create pickup glow effect
-        particle_system.add_pickup_glow(self.cx, self.cy, (255, 255, 255))
-        
-    def draw(self, screen, offset=(0,0)):
-        x = self.cx + offset[0]; y = self.cy + offset[1]
-        palette = [(255,255,255),(255,0,0),(255,165,0),(255,255,0),
-                   (0,255,0),(0,255,255),(0,128,255),(170,0,255),(255,105,180)]
-        idx = (self.age // 3) % len(palette)
-        pygame.draw.circle(screen, palette[idx], (x,y), self.RADIUS)
-        pygame.draw.circle(screen, (20,20,20), (x,y), self.RADIUS, 2)
-
-pickups = []
-pickup_spawn_cooldown = 0
-PICKUP_COOLDOWN_FRAMES = 4 * 60
-MAX_ACTIVE_PICKUPS = 1
-
-def rand_point_in_arena(radius):
-    cx = random.randint(ARENA_X + radius, ARENA_X + ARENA_WIDTH - radius)
-    cy = random.randint(ARENA_Y + radius, ARENA_Y + ARENA_HEIGHT - radius)
-    return cx, cy
-
-def maybe_spawn_pickup():
-    global pickup_spawn_cooldown
-    if pickup_spawn_cooldown > 0:
-        pickup_spawn_cooldown -= 1; return
-    if len(pickups) >= MAX_ACTIVE_PICKUPS: return
-    if random.random() < 0.015:
-        cx, cy = rand_point_in_arena(Pickup.RADIUS)
-        kind = random.choice(["health", "inv"])
-        pickups.append(HealthPickup(cx, cy) if kind=="health" else InvincibilityPickup(cx, cy))
-        pickup_spawn_cooldown = PICKUP_COOLDOWN_FRAMES
-
-def resolve_pickup_collisions():
-    global pickups, pickup_flashes
-    new_list = []
-    for p in pickups:
-        hits = p.colliding_fighters(fighter1, fighter2)
-        if not hits:
-            new_list.append(p); continue
-        if len(hits) == 2:
-            target = fighter1 if random.random() < 0.5 else fighter2
-        elif hits[0] == 1:
-            target = fighter1
-        else:
-            target = fighter2
-        
-        # Add visual feedback for pickup collection
-        if isinstance(p, HealthPickup):
-            flash_color = (34, 197, 94)  # green for health
-            sound_manager.play_pickup("health")
-        elif isinstance(p, InvincibilityPickup):
-            flash_color = (255, 255, 255)  # white for invincibility
-            sound_manager.play_pickup("invincibility")
-        else:
-            flash_color = (255, 255, 0)  # yellow for generic pickups
-            sound_manager.play_pickup("generic")
-            
-        # Create expanding ring effect
-        pickup_flashes.append((p.cx, p.cy, 20, flash_color))
-        
-        # Add small screen shake for feedback
-        global shake_timer, shake_intensity
-        shake_timer = max(shake_timer, 4)
-        shake_intensity = max(shake_intensity, 0.5)
-        
-        p.apply(target)
-    pickups = new_list
+    # Add small screen shake for feedback
+    shake_timer = max(shake_timer, 4)
+    shake_intensity = max(shake_intensity, 0.5)
 
 # === Fighters / match ===
+current_match = None     # headless engine.Match driving the round
+# HITBOX_REPLAY_DIR keeps a replay.py recording of every round played
+REPLAY_DIR = os.environ.get("HITBOX_REPLAY_DIR")
+recorder = None          # replay.MatchRecorder wrapping current_match
 fighter1 = fighter2 = None
-f1_exploded = False; f2_exploded = False
-player_bet = None  # "RED" or "BLUE"
-
-def random_spawn():
-    x = random.randint(ARENA_X, ARENA_X + ARENA_WIDTH - FIGHTER_WIDTH)
-    y = random.randint(ARENA_Y, ARENA_Y + ARENA_HEIGHT - FIGHTER_HEIGHT)
-    return x, y
+player_bet = None  # "RED" or "BLUE"; server.py keeps one per bettor per table
+next_seed = None     # seed of the round being bet on; decides it completely
+next_spawns = None   # its spawns, shown to the odds engine
+odds_future = None   # background odds.estimate_odds for next_spawns
+
+def prepare_next_round():
+    """Pick the next round's seed and start pricing it in the background"""
+    global next_seed, next_spawns, odds_future, odds_pool
+    next_seed = rng_streams.next_seed("rounds")
+    f1, f2 = Match(seed=next_seed).fighters
+    next_spawns = ((f1.x, f1.y), (f2.x, f2.y))
+    odds_future = None
+    if estimate_odds_async is not None:
+        # the game loop shuts its pool down on exit; importers (bench.py)
+        # get one per estimate instead of a pool nobody stops
+        if odds_pool is None and __name__ == "__main__":
+            odds_pool = make_pool()
+        odds_future = estimate_odds_async(spawns=next_spawns, precision=ODDS_PRECISION,
+                                          chunk=1024, seed=next_seed, pool=odds_pool)
+
+def ready_odds():
+    """The next round's OddsEstimate, or None while it is still being computed"""
+    if odds_future is None or not odds_future.done() or odds_future.exception():
+        return None
+    return odds_future.result()
 
 def reset_match():
-    global fighter1, fighter2, particle_system, damage_texts
+    global current_match, recorder, fighter1, fighter2, particle_system, damage_texts
     global shake_timer, shake_intensity, shake_offset, blurred_bg_pause
-    global result_text, result_color, gameover_menu_index, f1_exploded, f2_exploded
-    global go_fade_t, go_menu_alpha, pickups, pickup_spawn_cooldown
+    global result_text, result_color, gameover_menu_index
+    global go_fade_t, go_menu_alpha
     global points_delta, delta_color, delta_count_value
 
-    x1,y1 = random_spawn(); x2,y2 = random_spawn()
-    fighter1 = Fighter(x1,y1, dx,dy, FIGHTER_WIDTH,FIGHTER_HEIGHT, (255,0,0), health,
-                       ARENA_X,ARENA_Y,ARENA_WIDTH,ARENA_HEIGHT)
-    fighter2 = Fighter(x2,y2,-dx,-dy, FIGHTER_WIDTH,FIGHTER_HEIGHT, (0,0,255), health,
-                       ARENA_X,ARENA_Y,ARENA_WIDTH,ARENA_HEIGHT)
-    fighter1.displayed_health = health; fighter2.displayed_health = health
+    current_match = Match(seed=next_seed)
+    current_match.timer = profiler
+    recorder = MatchRecorder(current_match) if REPLAY_DIR else None
+    fighter1, fighter2 = current_match.fighter1, current_match.fighter2
 
     # Setup particle system with arena bounds for physics
     particle_system.clear()
@@ -520,9 +581,9 @@ def reset_match():
     damage_texts = []
     shake_timer = 0; shake_intensity = 1.0; shake_offset = [0,0]
     blurred_bg_pause = None
+    gameover_backdrop.reset()
     result_text = ""; result_color = (255,255,255)
     gameover_menu_index = 0
-    f1_exploded = False; f2_exploded = False
     go_fade_t = 0; go_menu_alpha = 0
 
     # points animation state resets each round
@@ -530,32 +591,20 @@ def reset_match():
     delta_color = (255,255,255)
     delta_count_value = 0
 
-    pickups = []
-    pickup_spawn_cooldown = 2 * 60
-
 def explode_fighter(f, count=55):
     cx = int(f.x + f.width/2); cy = int(f.y + f.height/2)
     # Enhanced explosion with varied particle types
     particle_system.add_explosion(cx, cy, f.base_color, count)
 
-def round_winner():
-    red_dead  = fighter1.health <= 0
-    blue_dead = fighter2.health <= 0
-    if red_dead and blue_dead: return None
-    if red_dead:  return "BLUE"
-    if blue_dead: return "RED"
-    return None
-
 # === Splash screen helpers ===
 def draw_splash():
     screen.fill((0,0,0))
-    title = font_big.render("HitBox", True, (255,255,255))
+    title = render_text(font_big, "HitBox", (255,255,255))
     tw, th = title.get_size()
     screen.blit(title, (SCREEN_WIDTH//2 - tw//2, SCREEN_HEIGHT//2 - th - 20))
     t = pygame.time.get_ticks() / 1000.0
     alpha = int(220 * (0.5 + 0.5 * math.sin(2.3 * t)))
-    press = font_small.render("Press Enter", True, (255,255,255))
-    press.set_alpha(alpha)
+    press = render_text(font_small, "Press Enter", (255,255,255), alpha)
     pw, ph = press.get_size()
     screen.blit(press, (SCREEN_WIDTH//2 - pw//2, SCREEN_HEIGHT//2 + 12))
 
@@ -573,7 +622,7 @@ click_flash_rect = None
 def draw_select():
     global click_flash_frames
     screen.fill((0,0,0))
-    head = font_select_head.render("WHO WILL WIN?", True, (255,255,255))
+    head = render_text(font_select_head, "WHO WILL WIN?", (255,255,255))
     hw, hh = head.get_size()
     screen.blit(head, (SCREEN_WIDTH//2 - hw//2, 40))
     mx, my = pygame.mouse.get_pos()
@@ -593,10 +642,16 @@ def draw_select():
     elif hover_blue:
         hint = "BLUE WILL WIN"; color = (0,0,255)
     if hint:
-        txt = font_select_hint.render(hint, True, color)
+        txt = render_text(font_select_hint, hint, color)
         tw, th = txt.get_size()
         mid = (RED_BOX_RECT.centerx + BLUE_BOX_RECT.centerx) // 2
         screen.blit(txt, (mid - tw//2, start_y + SELECT_BOX_H + 18))
+    odds = ready_odds()
+    for rect, p in ((RED_BOX_RECT, odds and odds.p_red), (BLUE_BOX_RECT, odds and odds.p_blue)):
+        label = f"{p*100:.0f}%" if odds else "..."
+        txt = render_text(font_small, label, (200,200,200))
+        tw, th = txt.get_size()
+        screen.blit(txt, (rect.centerx - tw//2, rect.bottom + 52))
     if click_flash_frames > 0 and click_flash_rect is not None:
         flash = pygame.Surface((click_flash_rect.w, click_flash_rect.h))
         flash.fill((255,255,255))
@@ -610,6 +665,7 @@ def switch_state(new_state):
     global state
     if new_state == STATE_SELECT:
         pygame.mouse.set_visible(True)
+        prepare_next_round()
     elif new_state == STATE_PLAYING:
         pygame.mouse.set_visible(False)
         reset_match()
@@ -619,95 +675,35 @@ def switch_state(new_state):
 reset_match()  # prep assets/state
 state = STATE_SPLASH
 
-# === Main Loop ===
-running = True
-while running:
-    # Events
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-        elif event.type == pygame.KEYDOWN:
-            if state == STATE_SPLASH:
-                if event.key in (pygame.K_RETURN, pygame.K_SPACE):
-                    sound_manager.play_menu_select()
-                    transition.start(24, STATE_SELECT)
-
-            elif state == STATE_SELECT:
-                if event.key in (pygame.K_LEFT, pygame.K_a):
-                    sound_manager.play_menu_navigate()
-                    pygame.mouse.set_pos(RED_BOX_RECT.center)
-                elif event.key in (pygame.K_RIGHT, pygame.K_d):
-                    sound_manager.play_menu_navigate()
-                    pygame.mouse.set_pos(BLUE_BOX_RECT.center)
-                elif event.key in (pygame.K_ESCAPE,):
-                    sound_manager.play_menu_select()
-                    transition.start(24, STATE_SPLASH)
-                elif event.key == pygame.K_RETURN:
-                    mx, my = pygame.mouse.get_pos()
-                    if RED_BOX_RECT.collidepoint(mx, my) or BLUE_BOX_RECT.collidepoint(mx, my):
-                        player_bet = "RED" if RED_BOX_RECT.collidepoint(mx, my) else "BLUE"
-                        click_flash_rect = RED_BOX_RECT.copy() if player_bet=="RED" else BLUE_BOX_RECT.copy()
-                        click_flash_frames = 8
-                        sound_manager.play_game_start()
-                        transition.start(28, STATE_PLAYING)
-
-            elif state == STATE_PLAYING:
-                if event.key in (pygame.K_RETURN, pygame.K_ESCAPE):
-                    state = STATE_PAUSED
-                    snap = screen.copy()
-                    blurred_bg_pause = fast_blur(snap, scale=0.22, passes=2)
-                    pause_menu_index = 0
-
-            elif state == STATE_PAUSED:
-                if event.key == pygame.K_RETURN:
-                    sound_manager.play_menu_select()
-                    choice = ["Resume","Quit"][pause_menu_index]
-                    if choice == "Resume":
-                        state = STATE_PLAYING; blurred_bg_pause = None
-                    else:
-                        running = False
-                elif event.key in (pygame.K_UP, pygame.K_w):
-                    sound_manager.play_menu_navigate()
-                    pause_menu_index = (pause_menu_index - 1) % 2
-                elif event.key in (pygame.K_DOWN, pygame.K_s):
-                    sound_manager.play_menu_navigate()
-                    pause_menu_index = (pause_menu_index + 1) % 2
-                elif event.key == pygame.K_ESCAPE:
-                    sound_manager.play_menu_select()
-                    state = STATE_PLAYING; blurred_bg_pause = None
-
-            elif state == STATE_GAMEOVER:
-                if event.key == pygame.K_RETURN:
-                    choice = gameover_menu_items[gameover_menu_index]
-                    if choice == "Play Again":
-                        transition.start(24, STATE_SELECT)
-                    else:
-                        running = False
-                elif event.key in (pygame.K_UP, pygame.K_w):
-                    gameover_menu_index = (gameover_menu_index - 1) % len(gameover_menu_items)
-                elif event.key in (pygame.K_DOWN, pygame.K_s):
-                    gameover_menu_index = (gameover_menu_index + 1) % len(gameover_menu_items)
-
-        elif event.type == pygame.MOUSEBUTTONDOWN and state == STATE_SELECT:
-            mx, my = pygame.mouse.get_pos()
-            if RED_BOX_RECT.collidepoint(mx, my) or BLUE_BOX_RECT.collidepoint(mx, my):
-                player_bet = "RED" if RED_BOX_RECT.collidepoint(mx, my) else "BLUE"
-                click_flash_rect = RED_BOX_RECT.copy() if player_bet=="RED" else BLUE_BOX_RECT.copy()
-                click_flash_frames = 8
-                transition.start(28, STATE_PLAYING)
-
-    # === UPDATE ===
+# === Timing ===
+# The simulation always runs at TICK_RATE, whatever the render rate; frames
+# in between draw fighters interpolated between their last two positions.
+TICK_RATE = 60
+TICK = 1.0 / TICK_RATE
+RENDER_FPS = int(os.environ.get("HITBOX_FPS", "60"))   # 0 = uncapped
+MAX_CATCHUP_TICKS = 5     # ticks run before a frame is rendered
+MAX_FRAME_SKIP = 3        # renders dropped in a row while catching up
+MAX_BACKLOG = 0.25        # seconds of lag kept; beyond it the game slows down
+accumulator = 0.0
+skipped_frames = 0
+
+def update_tick():
+    """Advance the game by one fixed simulation tick (1 / TICK_RATE s)"""
+    global state, current_score, high_score, player_bet
+    global shake_timer, shake_intensity, shake_offset, damage_texts, pickup_flashes
+    global result_text, result_color, points_delta, delta_color, delta_count_value
+    global go_fade_t, go_menu_alpha
     if state in (STATE_PLAYING, STATE_GAMEOVER_TRANS, STATE_GAMEOVER):
-        fighter1.move(); fighter2.move()
-        fighter1.update_effects(); fighter2.update_effects()
-        update_health_bar_value(fighter1); update_health_bar_value(fighter2)
+        # Movement, pickups, collisions and damage all happen inside the match;
+        # once the round is over it only keeps the fighters drifting.
+        match_events = (recorder or current_match).step()
+        fighter1.update_health_bar_value(); fighter2.update_health_bar_value()
 
         if shake_timer > 0:
             # Dynamic shake based on intensity
             max_shake = int(8 * shake_intensity)
-            shake_offset[0] = random.randint(-max_shake, max_shake)
-            shake_offset[1] = random.randint(-max_shake, max_shake)
+            shake_offset[0] = fx_rng.randint(-max_shake, max_shake)
+            shake_offset[1] = fx_rng.randint(-max_shake, max_shake)
             shake_timer -= 1
             # Intensity decreases over time for natural feel
             shake_intensity *= 0.9
@@ -715,51 +711,43 @@ while running:
             shake_offset = [0, 0]
             shake_intensity = 1.0
 
-        # Pickups
-        if state == STATE_PLAYING:
-            maybe_spawn_pickup()
-            for pk in pickups: pk.update()
-            pickups[:] = [pk for pk in pickups if not pk.dead]
-            resolve_pickup_collisions()
-        else:
-            for pk in pickups: pk.update()
-            pickups[:] = [pk for pk in pickups if not pk.dead]
-
-        # Enhanced Collisions with better visual feedback
-        if state == STATE_PLAYING and fighter1.collides_with(fighter2):
-            fighter1.dx *= -1; fighter1.dy *= -1
-            fighter2.dx *= -1; fighter2.dy *= -1
-
-            dmg1 = fighter1.take_damage(DAMAGE)
-            dmg2 = fighter2.take_damage(DAMAGE)
-
-            if (dmg1 > 0) or (dmg2 > 0):
-                # Dynamic shake intensity based on total damage dealt
-                total_damage = dmg1 + dmg2
-                shake_timer = 8 + min(12, total_damage // 5)  # longer shake for more damage
-                shake_intensity = 1.0 + (total_damage / 20.0)  # stronger shake for more damage
-                
-                # Play collision sound with intensity
-                sound_manager.play_collision(shake_intensity)
-                
-                overlap = fighter1.get_rect().clip(fighter2.get_rect())
-                if overlap.width > 0 and overlap.height > 0:
-                    cx, cy = overlap.center
+        round_over = False
+        for ev in match_events:
+            if ev[0] == "pickup_taken":
+                on_pickup_taken(ev[1], ev[2], ev[3])
+
+            # Enhanced Collisions with better visual feedback
+            elif ev[0] == "collision":
+                _, dmg1, dmg2, (cx, cy) = ev
+                if (dmg1 > 0) or (dmg2 > 0):
+                    # Dynamic shake intensity based on total damage dealt
+                    total_damage = dmg1 + dmg2
+                    shake_timer = 8 + min(12, total_damage // 5)  # longer shake for more damage
+                    shake_intensity = 1.0 + (total_damage / 20.0)  # stronger shake for more damage
+
+                    # Play collision sound with intensity
+                    sound_manager.play_collision(shake_intensity)
+
                     # Enhanced collision effects
                     particle_system.add_collision_sparks(cx, cy, 12)
                     particle_system.add_explosion(cx, cy, (255, 255, 255), 8)
-                    
-                if dmg1 > 0:
-                    damage_texts.append(DamageText(fighter1.x+fighter1.width/2, fighter1.y-6, dmg1, (255,120,120)))
-                    # Add damage sparks around fighter1
-                    particle_system.add_damage_sparks(fighter1.x+fighter1.width/2, fighter1.y+fighter1.height/2, (255,120,120))
-                if dmg2 > 0:
-                    damage_texts.append(DamageText(fighter2.x+fighter2.width/2, fighter2.y-6, dmg2, (120,170,255)))
-                    # Add damage sparks around fighter2
-                    particle_system.add_damage_sparks(fighter2.x+fighter2.width/2, fighter2.y+fighter2.height/2, (120,170,255))
+
+                    if dmg1 > 0:
+                        damage_texts.append(DamageText(fighter1.x+fighter1.width/2, fighter1.y-6, dmg1, (255,120,120)))
+                        # Add damage sparks around fighter1
+                        particle_system.add_damage_sparks(fighter1.x+fighter1.width/2, fighter1.y+fighter1.height/2, (255,120,120))
+                    if dmg2 > 0:
+                        damage_texts.append(DamageText(fighter2.x+fighter2.width/2, fighter2.y-6, dmg2, (120,170,255)))
+                        # Add damage sparks around fighter2
+                        particle_system.add_damage_sparks(fighter2.x+fighter2.width/2, fighter2.y+fighter2.height/2, (120,170,255))
+
+            elif ev[0] == "round_over":
+                round_over = True
 
         # Update particle system and damage texts
+        profiler.lap("effects")
         particle_system.update()
+        profiler.lap("particles")
         for dt in damage_texts: dt.update()
         damage_texts = [dt for dt in damage_texts if not dt.dead]
         
@@ -768,14 +756,15 @@ while running:
 
         # deaths -> transition to GAMEOVER with scoring prep
         if state == STATE_PLAYING:
-            if fighter1.health <= 0 and not f1_exploded:
-                sound_manager.play_explosion()
-                explode_fighter(fighter1); f1_exploded = True
-            if fighter2.health <= 0 and not f2_exploded:
-                sound_manager.play_explosion()
-                explode_fighter(fighter2); f2_exploded = True
-            if (fighter1.health <= 0) or (fighter2.health <= 0):
-                win = round_winner()
+            for ev in match_events:
+                if ev[0] == "ko":
+                    sound_manager.play_explosion()
+                    explode_fighter(fighter1 if ev[1] == 1 else fighter2)
+            if round_over:
+                if recorder is not None and current_match.seed is not None:
+                    os.makedirs(REPLAY_DIR, exist_ok=True)
+                    recorder.save(os.path.join(REPLAY_DIR, f"round-{current_match.seed:016x}.hbr"))
+                win = current_match.winner
                 # compute text relative to player's bet
                 bet_color = (255,0,0) if player_bet == "RED" else (0,0,255)
                 result_color = bet_color
@@ -786,11 +775,11 @@ while running:
                 else:
                     if win == player_bet:
                         result_text = "YOU WON"
-                        points_delta = POINT_WIN
+                        points_delta = bet_delta(player_bet, win, bet_odds)
                         delta_color = (255,255,0)  # yellow for gain
                     else:
                         result_text = "YOU LOST"
-                        points_delta = POINT_LOSS
+                        points_delta = bet_delta(player_bet, win, bet_odds)
                         delta_color = (255,255,255)  # white for loss
                 delta_count_value = 0
                 state = STATE_GAMEOVER_TRANS
@@ -810,7 +799,7 @@ while running:
                     high_score = current_score
                 # If score hits 0, boot back to Start (keep high score, reset score)
                 if current_score <= 0:
-                    current_score = 100  # new run
+                    current_score = START_SCORE  # new run
                     player_bet = None
                     transition.start(24, STATE_SPLASH)
                 else:
@@ -822,70 +811,201 @@ while running:
 
     # transition tick (runs regardless of state)
     transition.update()
+    profiler.lap("effects")
 
-    # === DRAW ===
-    if state == STATE_SPLASH:
-        draw_splash()
-        draw_scoreboard(show_high=False)  # only SCORE on Start
+# === Main Loop ===
+# Runs only as a script, so tools such as bench.py can import the game's
+# functions and state without starting it
+if __name__ == "__main__":
+    running = True
+    clock.tick()
+    while running:
+        # skipped renders must not wait for the frame cap
+        frame_time = clock.tick(0 if skipped_frames else RENDER_FPS) / 1000.0
+        profiler.lap("wait")
+        profiler.count("particles", len(particle_system))
+        profiler.count("net blocks", block_counter.sample()[1])
+        profiler.end_frame()
+        profile_capture.frame(STATE_NAMES[state], len(particle_system))
+
+        # Events
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler_overlay.toggle()
+
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                profile_capture.start()
+
+            elif event.type == pygame.KEYDOWN:
+                if state == STATE_SPLASH:
+                    if event.key in (pygame.K_RETURN, pygame.K_SPACE):
+                        sound_manager.play_menu_select()
+                        transition.start(24, STATE_SELECT)
 
-    elif state == STATE_SELECT:
-        draw_select()
-        draw_scoreboard(show_high=True)
+                elif state == STATE_SELECT:
+                    if event.key in (pygame.K_LEFT, pygame.K_a):
+                        sound_manager.play_menu_navigate()
+                        pygame.mouse.set_pos(RED_BOX_RECT.center)
+                    elif event.key in (pygame.K_RIGHT, pygame.K_d):
+                        sound_manager.play_menu_navigate()
+                        pygame.mouse.set_pos(BLUE_BOX_RECT.center)
+                    elif event.key in (pygame.K_ESCAPE,):
+                        sound_manager.play_menu_select()
+                        transition.start(24, STATE_SPLASH)
+                    elif event.key == pygame.K_RETURN:
+                        mx, my = pygame.mouse.get_pos()
+                        if RED_BOX_RECT.collidepoint(mx, my) or BLUE_BOX_RECT.collidepoint(mx, my):
+                            player_bet = "RED" if RED_BOX_RECT.collidepoint(mx, my) else "BLUE"
+                            bet_odds = ready_odds()
+                            click_flash_rect = RED_BOX_RECT.copy() if player_bet=="RED" else BLUE_BOX_RECT.copy()
+                            click_flash_frames = 8
+                            sound_manager.play_game_start()
+                            transition.start(28, STATE_PLAYING)
+
+                elif state == STATE_PLAYING:
+                    if event.key in (pygame.K_RETURN, pygame.K_ESCAPE):
+                        state = STATE_PAUSED
+                        snap = screen.copy()
+                        blurred_bg_pause = fast_blur(snap, scale=0.22, passes=2)
+                        pause_menu_index = 0
+
+                elif state == STATE_PAUSED:
+                    if event.key == pygame.K_RETURN:
+                        sound_manager.play_menu_select()
+                        choice = ["Resume","Quit"][pause_menu_index]
+                        if choice == "Resume":
+                            state = STATE_PLAYING; blurred_bg_pause = None
+                        else:
+                            running = False
+                    elif event.key in (pygame.K_UP, pygame.K_w):
+                        sound_manager.play_menu_navigate()
+                        pause_menu_index = (pause_menu_index - 1) % 2
+                    elif event.key in (pygame.K_DOWN, pygame.K_s):
+                        sound_manager.play_menu_navigate()
+                        pause_menu_index = (pause_menu_index + 1) % 2
+                    elif event.key == pygame.K_ESCAPE:
+                        sound_manager.play_menu_select()
+                        state = STATE_PLAYING; blurred_bg_pause = None
 
-    else:
-        # gameplay-style frame
-        screen.fill("black")
-        pygame.draw.rect(screen, "white",
-            (ARENA_X-OUTLINE_THICKNESS+shake_offset[0],
-             ARENA_Y-OUTLINE_THICKNESS+shake_offset[1],
-             ARENA_WIDTH+2*OUTLINE_THICKNESS,
-             ARENA_HEIGHT+2*OUTLINE_THICKNESS))
-        pygame.draw.rect(screen, "black",
-            (ARENA_X+shake_offset[0], ARENA_Y+shake_offset[1], ARENA_WIDTH, ARENA_HEIGHT))
-
-        if fighter1 and fighter1.health > 0: fighter1.draw(screen, shake_offset)
-        if fighter2 and fighter2.health > 0: fighter2.draw(screen, shake_offset)
-
-        for pk in pickups: pk.draw(screen, shake_offset)
-        
-        # Draw enhanced particle system
-        particle_system.draw(screen, shake_offset)
-        
-        # Draw pickup collection flashes
-        draw_pickup_flashes(screen, shake_offset)
-        
-        for dt in damage_texts: dt.draw(screen, shake_offset)
-
-        # HUD
-        if fighter1 and fighter2:
-            draw_health_bar(screen, BLUE_BAR_X, BLUE_BAR_Y,
-                fighter2.health, fighter2.displayed_health, 100, (0,0,255), shake_offset, align="left")
-            draw_health_bar(screen, RED_BAR_X, RED_BAR_Y,
-                fighter1.health, fighter1.displayed_health, 100, (255,0,0), shake_offset, align="right")
-            draw_centered_label("BLUE", BLUE_BAR_X, BLUE_BAR_Y, HEALTH_BAR_WIDTH, (150,180,255), shake_offset)
-            draw_centered_label("RED",  RED_BAR_X,  RED_BAR_Y,  HEALTH_BAR_WIDTH, (255,160,160), shake_offset)
-
-        # Overlays
-        if state == STATE_PAUSED:
-            if blurred_bg_pause is None:
-                snap = screen.copy()
-                blurred_bg_pause = fast_blur(snap, scale=0.22, passes=2)
-            draw_pause_menu(screen, blurred_bg_pause, pause_menu_items, pause_menu_index)
+                elif state == STATE_GAMEOVER:
+                    if event.key == pygame.K_RETURN:
+                        choice = gameover_menu_items[gameover_menu_index]
+                        if choice == "Play Again":
+                            transition.start(24, STATE_SELECT)
+                        else:
+                            running = False
+                    elif event.key in (pygame.K_UP, pygame.K_w):
+                        gameover_menu_index = (gameover_menu_index - 1) % len(gameover_menu_items)
+                    elif event.key in (pygame.K_DOWN, pygame.K_s):
+                        gameover_menu_index = (gameover_menu_index + 1) % len(gameover_menu_items)
+
+            elif event.type == pygame.MOUSEBUTTONDOWN and state == STATE_SELECT:
+                mx, my = pygame.mouse.get_pos()
+                if RED_BOX_RECT.collidepoint(mx, my) or BLUE_BOX_RECT.collidepoint(mx, my):
+                    player_bet = "RED" if RED_BOX_RECT.collidepoint(mx, my) else "BLUE"
+                    bet_odds = ready_odds()
+                    click_flash_rect = RED_BOX_RECT.copy() if player_bet=="RED" else BLUE_BOX_RECT.copy()
+                    click_flash_frames = 8
+                    transition.start(28, STATE_PLAYING)
+        profiler.lap("events")
+
+        # === UPDATE ===
+        # Fixed-rate ticks: up to MAX_CATCHUP_TICKS per rendered frame; if the
+        # host still lags, skip up to MAX_FRAME_SKIP renders to catch up before
+        # the backlog cap finally lets the game slow down
+        accumulator = min(accumulator + frame_time, MAX_BACKLOG)
+        ticks = 0
+        while accumulator >= TICK and ticks < MAX_CATCHUP_TICKS:
+            update_tick()
+            accumulator -= TICK
+            ticks += 1
+        if accumulator >= TICK and skipped_frames < MAX_FRAME_SKIP:
+            skipped_frames += 1
+            continue
+        skipped_frames = 0
+        alpha = accumulator / TICK   # how far between the last two ticks we are
+
+        # === DRAW ===
+        if state == STATE_SPLASH:
+            draw_splash()
+            draw_scoreboard(show_high=False)  # only SCORE on Start
+
+        elif state == STATE_SELECT:
+            draw_select()
             draw_scoreboard(show_high=True)
 
-        elif state in (STATE_GAMEOVER_TRANS, STATE_GAMEOVER):
-            progress = 1.0 if state == STATE_GAMEOVER else (go_fade_t / GO_FADE_FRAMES)
-            draw_gameover_overlay(screen, progress, show_menu=(state == STATE_GAMEOVER), menu_alpha=go_menu_alpha)
+        elif state == STATE_GAMEOVER and gameover_backdrop.is_frozen:
+            # the arena is hidden behind the frozen backdrop; skip drawing it
+            draw_gameover_overlay(screen, 1.0, show_menu=True, menu_alpha=go_menu_alpha)
             draw_scoreboard(show_high=True)
 
         else:
-            # STATE_PLAYING
-            draw_scoreboard(show_high=True)
-
-    # draw transition overlay last
-    transition.draw_overlay(screen)
+            # gameplay-style frame: background, arena and HUD chrome in one blit
+            arena_chrome.draw(screen, shake_offset)
+            profiler.lap("d.arena")
+
+            for f in (fighter1, fighter2):
+                if f and f.health > 0:
+                    offset = f.interp_offset(shake_offset, alpha)
+                    f.draw(screen, offset)
+                    dirty.add(f.dirty_rect(offset))
+            profiler.lap("d.fighters")
+
+            for pk in current_match.pickups:
+                pk.draw(screen, shake_offset)
+                dirty.add(pk.rect.inflate(2, 2).move(shake_offset))
+            profiler.lap("d.pickups")
+        
+            # Draw enhanced particle system
+            particle_system.draw(screen, shake_offset)
+            dirty.add(particle_system.bounds(shake_offset))
+            profiler.lap("d.particles")
+        
+            # Draw pickup collection flashes
+            draw_pickup_flashes(screen, shake_offset)
+        
+            for dt in damage_texts: dirty.add(dt.draw(screen, shake_offset))
+
+            # HUD
+            if fighter1 and fighter2:
+                dirty.add(draw_health_bar(screen, BLUE_BAR_X, BLUE_BAR_Y,
+                    fighter2.health, fighter2.displayed_health, 100, (0,0,255), shake_offset, align="left"))
+                dirty.add(draw_health_bar(screen, RED_BAR_X, RED_BAR_Y,
+                    fighter1.health, fighter1.displayed_health, 100, (255,0,0), shake_offset, align="right"))
+            profiler.lap("d.hud")
+
+            # Overlays
+            if state == STATE_PAUSED:
+                if blurred_bg_pause is None:
+                    snap = screen.copy()
+                    blurred_bg_pause = fast_blur(snap, scale=0.22, passes=2)
+                draw_pause_menu(screen, blurred_bg_pause, pause_menu_items, pause_menu_index)
+                draw_scoreboard(show_high=True)
 
-    pygame.display.flip()
-    clock.tick(60)
+            elif state in (STATE_GAMEOVER_TRANS, STATE_GAMEOVER):
+                progress = 1.0 if state == STATE_GAMEOVER else (go_fade_t / GO_FADE_FRAMES)
+                draw_gameover_overlay(screen, progress, show_menu=(state == STATE_GAMEOVER), menu_alpha=go_menu_alpha)
+                draw_scoreboard(show_high=True)
 
-pygame.quit()
\ No newline at end of file
+            else:
+                # STATE_PLAYING
+                draw_scoreboard(show_high=True)
+
+        # draw transition overlay last
+        transition.draw_overlay(screen)
+        profiler.lap("d.overlay")
+        dirty.add(profiler_overlay.draw(screen))
+        profiler.lap("d.profiler")
+
+        # Only a still gameplay frame can go out as dirty rects; shake moves
+        # everything, and menus/transitions repaint the whole screen anyway
+        dirty.present(full=(state != STATE_PLAYING or transition.active or shake_offset != [0, 0]))
+        profiler.lap("present")
+
+    profile_capture.close()
+    if odds_pool is not None:
+        odds_pool.shutdown(wait=False, cancel_futures=True)
+    pygame.quit()
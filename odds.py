@@ -0,0 +1,162 @@
+import math
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
+from statistics import NormalDist
+
+import numpy as np
+from batch_engine import BatchMatch
+from engine import MatchConfig
+
+OUTCOMES = ("RED", "BLUE", "DRAW")
+
+DEFAULT_PRECISION = 0.01      # target half-width of every confidence interval
+DEFAULT_CHUNK = 4096          # rounds per work unit
+DEFAULT_MAX_ROUNDS = 400_000
+
+
+class OddsEstimate:
+    """Monte Carlo estimate of P(RED), P(BLUE) and P(DRAW) for one setup"""
+
+    def __init__(self, counts, confidence):
+        self.counts = dict(counts)
+        self.rounds = sum(self.counts.values())
+        self.confidence = confidence
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        self.probs = {k: v / self.rounds for k, v in self.counts.items()}
+        self.intervals = {k: wilson_interval(v, self.rounds, z) for k, v in self.counts.items()}
+
+    @property
+    def p_red(self): return self.probs["RED"]
+    @property
+    def p_blue(self): return self.probs["BLUE"]
+    @property
+    def p_draw(self): return self.probs["DRAW"]
+
+    @property
+    def precision(self):
+        """Largest half-width among the three intervals"""
+        return max((hi - lo) / 2 for lo, hi in self.intervals.values())
+
+    def __repr__(self):
+        return (f"OddsEstimate(RED={self.p_red:.4f}, BLUE={self.p_blue:.4f}, "
+                f"DRAW={self.p_draw:.4f}, rounds={self.rounds}, ±{self.precision:.4f})")
+
+
+def wilson_interval(k, n, z):
+    """Wilson score interval for k successes out of n"""
+    if n == 0:
+        return (0.0, 1.0)
+    p = k / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return (max(0.0, centre - half), min(1.0, centre + half))
+
+
+def _simulate_chunk(config, spawns, n, seed_seq):
+    """Worker entry point: play n rounds on one independent RNG stream"""
+    rng = np.random.default_rng(seed_seq)
+    counts = BatchMatch(n, config, rng=rng, spawns=spawns).run().counts()
+    return counts
+
+
+def make_pool(workers=None):
+    """A process pool to keep for the whole session and hand to estimate_odds.
+
+    The default leaves one CPU for the caller (the game loop).
+    """
+    if workers is None:
+        workers = max(1, (os.cpu_count() or 2) - 1)
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def estimate_odds(config=None, spawns=None, precision=DEFAULT_PRECISION, confidence=0.95,
+                  workers=None, chunk=DEFAULT_CHUNK, max_rounds=DEFAULT_MAX_ROUNDS, seed=None,
+                  pool=None):
+    """Estimate win/draw probabilities for a round setup.
+
+    config   -- engine.MatchConfig (damage, dx/dy, health, pickup rates...)
+    spawns   -- ((x1, y1), (x2, y2)) as produced by random_spawn, or None to
+                draw fresh spawns for every simulated round
+    precision/confidence -- stop once every interval's half-width is at most
+                `precision` (or after max_rounds)
+    workers  -- processes to use; None = one per CPU (or the pool's size),
+                0 = run in this process
+    pool     -- an existing executor (make_pool) to run on instead of starting
+                and stopping one per call; it is left running
+
+    Every chunk gets its own SeedSequence child and chunk results are folded
+    in submission order, so a given seed always gives the same estimate no
+    matter how many workers run it.
+    """
+    config = config or MatchConfig()
+    root = np.random.SeedSequence(seed)
+    totals = dict.fromkeys(OUTCOMES, 0)
+
+    def add(counts):
+        for k in OUTCOMES: totals[k] += counts[k]
+        return OddsEstimate(totals, confidence)
+
+    estimate = None
+    if workers == 0:
+        done = 0
+        while done < max_rounds:
+            n = min(chunk, max_rounds - done)
+            estimate = add(_simulate_chunk(config, spawns, n, root.spawn(1)[0]))
+            done += n
+            if estimate.precision <= precision:
+                break
+        return estimate
+
+    if pool is not None:
+        # in-flight work follows the pool, so chunks past the target
+        # precision are still queued (and cancelled), not running
+        workers = workers or pool._max_workers
+    workers = workers or os.cpu_count() or 1
+    own_pool = pool is None
+    if own_pool:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        submitted = 0
+        while True:
+            # keep two chunks per worker in flight
+            while len(pending) < 2 * workers and submitted < max_rounds:
+                n = min(chunk, max_rounds - submitted)
+                pending.append(pool.submit(_simulate_chunk, config, spawns, n, root.spawn(1)[0]))
+                submitted += n
+            if not pending:
+                break
+            estimate = add(pending.popleft().result())
+            if estimate.precision <= precision:
+                break
+    finally:
+        if own_pool:
+            pool.shutdown(wait=True, cancel_futures=True)
+        else:
+            for f in pending:   # chunks past the target precision
+                f.cancel()
+    return estimate
+
+
+def estimate_odds_async(*args, **kwargs):
+    """Run estimate_odds on a background thread and return a Future.
+
+    Meant for UIs: poll future.done() each frame instead of blocking. The
+    thread only hands out chunks and folds results; pass pool= so the
+    simulation itself runs in worker processes, off the caller's GIL.
+    """
+    future = Future()
+
+    def work():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(estimate_odds(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+    threading.Thread(target=work, daemon=True).start()
+    return future
@@ -0,0 +1,274 @@
+import time
+import numpy as np
+import pygame
+from particles import ParticleRenderer
+
+# Particle types, stored as small ints
+NORMAL = 0
+SPARK = 1
+EXPLOSION = 2
+TRAIL = 3
+TYPE_IDS = {"normal": NORMAL, "spark": SPARK, "explosion": EXPLOSION, "trail": TRAIL}
+TYPE_NAMES = {i: name for name, i in TYPE_IDS.items()}
+
+AIR_RESISTANCE = 0.98
+
+_FIELDS = ("x", "y", "dx", "dy", "age", "lifetime", "ptype", "color", "base_color",
+           "width", "height", "bounce", "gravity", "bounced")
+
+
+class ArrayParticleSystem:
+    """ParticleSystem backend that keeps particles in contiguous NumPy arrays.
+
+    Same interface and physics as particles.ParticleSystem, but instead of a
+    list of Particle objects every attribute lives in one array, so gravity,
+    wind, wall bounces, air resistance, ageing and colour fades are whole-array
+    operations, and dead particles are dropped by masked compaction.
+    Takes the same optional ParticleGovernor.
+    """
+
+    def __init__(self, arena_bounds=None, capacity=1024, seed=None, renderer=None, governor=None):
+        self.arena_bounds = arena_bounds
+        self.renderer = renderer or ParticleRenderer()
+        self.wind_force = (0, 0)  # global wind effect
+        self.wind_timer = 0
+        self.rng = np.random.default_rng(seed)
+        self.governor = governor
+        self.n = 0
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.dx = np.zeros(capacity)
+        self.dy = np.zeros(capacity)
+        self.age = np.zeros(capacity)
+        self.lifetime = np.zeros(capacity)
+        self.ptype = np.zeros(capacity, dtype=np.int8)
+        self.color = np.zeros((capacity, 3), dtype=np.int16)
+        self.base_color = np.zeros((capacity, 3), dtype=np.int16)
+        self.width = np.zeros(capacity)
+        self.height = np.zeros(capacity)
+        self.bounce = np.zeros(capacity)
+        self.gravity = np.zeros(capacity)
+        self.bounced = np.zeros(capacity, dtype=bool)
+
+    def _grow(self, needed):
+        capacity = max(1, len(self.x))   # doubling from 0 would never get there
+        while capacity < needed:
+            capacity *= 2
+        old = {name: getattr(self, name) for name in _FIELDS}
+        self._alloc(capacity)
+        for name, arr in old.items():
+            getattr(self, name)[:self.n] = arr[:self.n]
+
+    def __len__(self):
+        return self.n
+
+    def set_arena_bounds(self, x, y, width, height):
+        """Set arena boundaries for particle collision"""
+        self.arena_bounds = (x, y, width, height)
+
+    def clear(self):
+        """Clear all particles"""
+        self.n = 0
+
+    # --- emission ---
+    def _emit(self, x, y, color, width, height, lifetime, particle_type, count):
+        """Append `count` particles initialised like particles.Particle"""
+        if self.governor is not None:
+            count, lifetime = self.governor.shape(particle_type, count, lifetime)
+        if count <= 0:
+            return
+        start, end = self.n, self.n + count
+        if end > len(self.x):
+            self._grow(end)
+        s = slice(start, end)
+        rng = self.rng
+        t = TYPE_IDS[particle_type]
+
+        self.x[s] = x; self.y[s] = y
+        self.age[s] = 0
+        self.ptype[s] = t
+        self.color[s] = color; self.base_color[s] = color
+        self.width[s] = width; self.height[s] = height
+        self.bounced[s] = False
+        if t == SPARK:
+            self.dx[s] = rng.uniform(-5.0, 5.0, count)
+            self.dy[s] = rng.uniform(-5.0, 5.0, count)
+            self.lifetime[s] = max(12, lifetime // 2)
+            self.bounce[s] = 0.8; self.gravity[s] = 0.05
+        elif t == EXPLOSION:
+            speed = rng.uniform(2.0, 6.0, count)
+            sign = np.where(rng.random((2, count)) > 0.5, 1.0, -1.0)
+            self.dx[s] = speed * rng.uniform(0.8, 1.2, count) * sign[0]
+            self.dy[s] = speed * rng.uniform(0.8, 1.2, count) * sign[1]
+            self.lifetime[s] = lifetime
+            self.bounce[s] = 0.4; self.gravity[s] = 0.15
+        else:
+            scale = 0.3 if t == TRAIL else 1.0
+            self.dx[s] = rng.uniform(-3.5, 3.5, count) * scale
+            self.dy[s] = rng.uniform(-3.5, 3.5, count) * scale
+            self.lifetime[s] = lifetime
+            self.bounce[s] = 0.2 if t == TRAIL else 0.6
+            self.gravity[s] = 0.02 if t == TRAIL else 0.0
+        self.n = end
+
+    def add_explosion(self, x, y, color, count=20):
+        """Add explosion particles at the given position"""
+        self._emit(x, y, color, 12, 12, 28, "explosion", count)
+        # Add some sparks for extra effect
+        self._emit(x, y, (255, 255, 255), 8, 8, 20, "spark", count // 3)
+
+    def add_collision_sparks(self, x, y, count=8):
+        """Add bright sparks for collision feedback"""
+        self._emit(x, y, (255, 255, 255), 6, 6, 15, "spark", count)
+
+    def add_damage_sparks(self, x, y, color, count=6):
+        """Add colored sparks when fighter takes damage"""
+        self._emit(x, y, color, 8, 8, 18, "spark", count)
+
+    def add_pickup_glow(self, x, y, color, count=8):
+        """Add glowing effect when pickup is collected"""
+        self._emit(x, y, color, 10, 10, 25, "trail", count)
+
+    def add_wall_sparks(self, x, y, count=4):
+        """Add sparks when particles hit walls"""
+        self._emit(x, y, (255, 200, 100), 4, 4, 12, "spark", count)
+
+    # --- simulation ---
+    def update(self):
+        """Update all particles with physics and remove dead ones"""
+        if self.governor is not None:
+            start = time.perf_counter()
+            self._update()
+            self.governor.add(time.perf_counter() - start)
+        else:
+            self._update()
+
+    def _update(self):
+        # Update wind effect (subtle, random changes)
+        self.wind_timer += 1
+        if self.wind_timer % 60 == 0:  # change wind every second
+            self.wind_force = (
+                self.rng.uniform(-0.02, 0.02),  # very subtle horizontal wind
+                self.rng.uniform(-0.01, 0.01)   # very subtle vertical wind
+            )
+        n = self.n
+        if n == 0:
+            return
+        x, y, dx, dy = self.x[:n], self.y[:n], self.dx[:n], self.dy[:n]
+        bounce, bounced = self.bounce[:n], self.bounced[:n]
+
+        dy += self.gravity[:n]
+        dx += self.wind_force[0]
+        dy += self.wind_force[1]
+        x += dx
+        y += dy
+
+        if self.arena_bounds:
+            ax, ay, aw, ah = self.arena_bounds
+            # Left/right walls, then top/bottom, in the same order as Particle.update
+            hit = np.flatnonzero((x <= ax) | (x >= ax + aw))
+            if len(hit):
+                dx[hit] *= -bounce[hit]
+                x[hit] = np.clip(x[hit], ax, ax + aw)
+                bounced[hit] = True
+                dy[hit] += self.rng.uniform(-0.5, 0.5, len(hit))
+            hit = np.flatnonzero((y <= ay) | (y >= ay + ah))
+            if len(hit):
+                dy[hit] *= -bounce[hit]
+                y[hit] = np.clip(y[hit], ay, ay + ah)
+                bounced[hit] = True
+                dx[hit] += self.rng.uniform(-0.5, 0.5, len(hit))
+
+        dx *= AIR_RESISTANCE
+        dy *= AIR_RESISTANCE
+        age = self.age[:n]
+        age += np.where(bounced, 1.2, 1.0)
+
+        # Sparks fade from white/yellow to red/orange over the last two thirds
+        lifetime = self.lifetime[:n]
+        ptype = self.ptype[:n]
+        third = lifetime // 3
+        fade = np.flatnonzero((ptype == SPARK) & (age > third))
+        if len(fade):
+            progress = (age[fade] - third[fade]) / (lifetime[fade] * 2 // 3)
+            col = self.color[:n]
+            col[fade, 0] = 255
+            col[fade, 1] = np.maximum(0, np.trunc(255 * (1 - progress)))
+            col[fade, 2] = np.maximum(0, np.trunc(self.base_color[fade, 2] * (1 - progress)))
+        # Explosion particles get darker when they bounce
+        dark = np.flatnonzero((ptype == EXPLOSION) & bounced)
+        if len(dark):
+            self.color[dark] = (self.color[dark] * 0.9).astype(np.int16)
+
+        # Masked compaction of the survivors
+        alive = age < lifetime
+        if not alive.all():
+            keep = np.flatnonzero(alive)
+            k = len(keep)
+            for name in _FIELDS:
+                arr = getattr(self, name)
+                arr[:k] = arr[keep]
+            self.n = k
+
+    def bounds(self, offset=(0, 0)):
+        """Rect covering every live particle, or None when there are none"""
+        n = self.n
+        if n == 0:
+            return None
+        pad = int(max(self.width[:n].max(), self.height[:n].max())) // 2 + 1
+        x, y = self.x[:n], self.y[:n]
+        left = int(x.min()) + offset[0] - pad; top = int(y.min()) + offset[1] - pad
+        return pygame.Rect(left, top, int(x.max()) + offset[0] + pad - left + 1,
+                           int(y.max()) + offset[1] + pad - top + 1)
+
+    def draw(self, screen, offset=(0, 0)):
+        """Draw all particles"""
+        governor = self.governor
+        if governor is None:
+            self._draw(screen, offset)
+            return
+        start = time.perf_counter()
+        self._draw(screen, offset)
+        governor.add(time.perf_counter() - start)
+        governor.end_frame()
+
+    def _draw(self, screen, offset):
+        n = self.n
+        if n == 0:
+            return
+        lifetime = self.lifetime[:n]
+        scale = np.maximum(lifetime - self.age[:n], 0) / lifetime
+        ptype = self.ptype[:n]
+        # sparks shrink to 70%, explosion debris shrinks with scale squared
+        size_scale = np.where(ptype == SPARK, scale * 0.7,
+                              np.where(ptype == EXPLOSION, scale * scale, scale))
+        w = np.maximum((self.width[:n] * size_scale).astype(np.int64), 1)
+        h = np.maximum((self.height[:n] * size_scale).astype(np.int64), 1)
+        left = self.x[:n].astype(np.int64) + offset[0] - w // 2
+        top = self.y[:n].astype(np.int64) + offset[1] - h // 2
+        # Resolve one sprite per distinct (type, w, h, colour) instead of per particle
+        col = self.color[:n].astype(np.int64)
+        keys = ((((ptype.astype(np.int64) << 12 | w) << 12 | h) << 8 | col[:, 0]) << 8
+                | col[:, 1]) << 8 | col[:, 2]
+        uniq, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        sprite = self.renderer.sprite
+        ws, hs, cols = w[first].tolist(), h[first].tolist(), self.color[first].tolist()
+        types = [TYPE_NAMES[t] for t in ptype[first].tolist()]
+        sprites = np.empty(len(uniq), dtype=object)
+        sprites[:] = [sprite(sw, sh, tuple(c), t) for sw, sh, c, t in zip(ws, hs, cols, types)]
+        sprites = sprites[inverse.ravel()]
+
+        additive = self.renderer.additive_types
+        if not additive:
+            self._blit(screen, sprites, left, top)
+            return
+        glow = np.isin(ptype, [TYPE_IDS[t] for t in additive])
+        self._blit(screen, sprites[~glow], left[~glow], top[~glow])
+        self._blit(screen, sprites[glow], left[glow], top[glow], additive=True)
+
+    def _blit(self, screen, sprites, left, top, additive=False):
+        batch = list(zip(sprites.tolist(), zip(left.tolist(), top.tolist())))
+        self.renderer.blit_batch(screen, batch, additive)
@@ -1,12 +1,25 @@
 import pygame
 import random
+import time
+from collections import OrderedDict
 
 class Particle:
-    def __init__(self, x, y, color, width, height, lifetime=18, particle_type="normal", arena_bounds=None):
+    # Slotted so burst-heavy frames don't allocate a __dict__ per particle
+    __slots__ = ("x", "y", "dx", "dy", "color", "base_color", "width", "height",
+                 "age", "lifetime", "particle_type", "bounce_factor", "gravity",
+                 "air_resistance", "arena_bounds", "bounced")
+
+    def __init__(self, x, y, color, width, height, lifetime=18, particle_type="normal", arena_bounds=None,
+                 rng=random):
+        self.reset(x, y, color, width, height, lifetime, particle_type, arena_bounds, rng)
+
+    def reset(self, x, y, color, width, height, lifetime=18, particle_type="normal", arena_bounds=None,
+              rng=random):
+        """(Re)initialise the particle; pooled particles are recycled through here"""
         self.x = float(x)
         self.y = float(y)
-        self.dx = random.uniform(-3.5, 3.5)
-        self.dy = random.uniform(-3.5, 3.5)
+        self.dx = rng.uniform(-3.5, 3.5)
+        self.dy = rng.uniform(-3.5, 3.5)
         self.color = color
         self.base_color = color  # store original color
         self.width = width
@@ -24,16 +37,16 @@ class Particle:
         
         # Type-specific properties
         if particle_type == "spark":
-            self.dx = random.uniform(-5.0, 5.0)
-            self.dy = random.uniform(-5.0, 5.0) 
+            self.dx = rng.uniform(-5.0, 5.0)
+            self.dy = rng.uniform(-5.0, 5.0) 
             self.lifetime = max(12, lifetime // 2)
             self.bounce_factor = 0.8  # sparks bounce more
             self.gravity = 0.05  # light gravity
         elif particle_type == "explosion":
-            speed = random.uniform(2.0, 6.0)
-            angle = random.uniform(0, 6.28318)  # 2π radians
-            self.dx = speed * random.uniform(0.8, 1.2) * (1 if random.random() > 0.5 else -1)
-            self.dy = speed * random.uniform(0.8, 1.2) * (1 if random.random() > 0.5 else -1)
+            speed = rng.uniform(2.0, 6.0)
+            angle = rng.uniform(0, 6.28318)  # 2π radians
+            self.dx = speed * rng.uniform(0.8, 1.2) * (1 if rng.random() > 0.5 else -1)
+            self.dy = speed * rng.uniform(0.8, 1.2) * (1 if rng.random() > 0.5 else -1)
             self.bounce_factor = 0.4  # explosion debris bounces less
             self.gravity = 0.15  # heavier gravity
         elif particle_type == "trail":
@@ -46,7 +59,7 @@ class Particle:
     def dead(self):
         return self.age >= self.lifetime
 
-    def update(self, wind_force=(0, 0)):
+    def update(self, wind_force=(0, 0), rng=random):
         # Apply gravity
         self.dy += self.gravity
         
@@ -69,7 +82,7 @@ class Particle:
                 self.bounced = True
                 
                 # Add some randomness to bounce direction
-                self.dy += random.uniform(-0.5, 0.5)
+                self.dy += rng.uniform(-0.5, 0.5)
                 
             # Top/bottom wall collision  
             if self.y <= arena_y or self.y >= arena_y + arena_h:
@@ -78,7 +91,7 @@ class Particle:
                 self.bounced = True
                 
                 # Add some randomness to bounce direction
-                self.dx += random.uniform(-0.5, 0.5)
+                self.dx += rng.uniform(-0.5, 0.5)
         
         # Apply air resistance
         self.dx *= self.air_resistance
@@ -103,108 +116,306 @@ class Particle:
             fade_factor = 0.9
             self.color = tuple(int(c * fade_factor) for c in self.color)
 
-    def draw(self, screen, offset=(0, 0)):
-        # Calculate scale and alpha based on age
+    def size(self):
+        """On-screen (w, h) of the particle at its current age"""
         life_left = max(self.lifetime - self.age, 0)
         scale = max(life_left / self.lifetime, 0)
-        
-        # Type-specific drawing
         if self.particle_type == "spark":
             # Sparks are small bright rectangles that fade quickly
-            w = max(int(self.width * scale * 0.7), 1)
-            h = max(int(self.height * scale * 0.7), 1)
-            pygame.draw.rect(
-                screen,
-                self.color,
-                (int(self.x) + offset[0] - w // 2, int(self.y) + offset[1] - h // 2, w, h)
-            )
-        elif self.particle_type == "explosion":
+            return (max(int(self.width * scale * 0.7), 1),
+                    max(int(self.height * scale * 0.7), 1))
+        if self.particle_type == "explosion":
             # Explosion particles are larger and shrink more dramatically
-            w = max(int(self.width * scale * scale), 1)  # double scale effect
-            h = max(int(self.height * scale * scale), 1)
-            pygame.draw.rect(
-                screen,
-                self.color,
-                (int(self.x) + offset[0] - w // 2, int(self.y) + offset[1] - h // 2, w, h)
-            )
+            return (max(int(self.width * scale * scale), 1),  # double scale effect
+                    max(int(self.height * scale * scale), 1))
+        # Normal particles - original behavior
+        return max(int(self.width * scale), 1), max(int(self.height * scale), 1)
+
+    def draw(self, screen, offset=(0, 0)):
+        w, h = self.size()
+        pygame.draw.rect(
+            screen,
+            self.color,
+            (int(self.x) + offset[0] - w // 2, int(self.y) + offset[1] - h // 2, w, h)
+        )
+
+
+def quantize_size(v):
+    """Sprite size for a particle dimension: exact up to 4px, even above"""
+    return v if v <= 4 else v & ~1
+
+
+def quantize_color(color):
+    """Snap each channel to 16 levels (0, 16, ... 240, 255) for sprite keys"""
+    return tuple(min(255, (c + 8) & ~15) for c in color)
+
+
+class ParticleRenderer:
+    """Draws particles as cached sprites submitted in one blit batch.
+
+    Particles are plain filled rectangles, so a sprite is described by its
+    type, size and colour. Sizes and colours are quantized first, so a spark
+    fading a little every frame keeps hitting the same few sprites; the
+    cache is an LRU, so a burst of new keys only evicts the coldest ones.
+    Types listed in `additive_types` go to a second batch blended with
+    BLEND_ADD, which makes overlapping sparks glow.
+    """
+
+    def __init__(self, max_sprites=2048, additive_types=()):
+        self._sprites = OrderedDict()
+        self.max_sprites = max_sprites
+        self.additive_types = frozenset(additive_types)
+
+    def sprite(self, w, h, color, particle_type="normal"):
+        key = (particle_type, quantize_size(w), quantize_size(h), quantize_color(color))
+        surf = self._sprites.get(key)
+        if surf is None:
+            surf = pygame.Surface(key[1:3])
+            surf.fill(key[3])
+            if pygame.display.get_surface() is not None:
+                surf = surf.convert()
+            self._sprites[key] = surf
+            if len(self._sprites) > self.max_sprites:
+                self._sprites.popitem(last=False)
         else:
-            # Normal particles - original behavior
-            w = max(int(self.width * scale), 1)
-            h = max(int(self.height * scale), 1)
-            pygame.draw.rect(
-                screen,
-                self.color,
-                (int(self.x) + offset[0] - w // 2, int(self.y) + offset[1] - h // 2, w, h)
-            )
+            self._sprites.move_to_end(key)
+        return surf
+
+    def blit_batch(self, screen, batch, additive=False):
+        """Submit a list of (sprite, (left, top)) pairs"""
+        if not batch:
+            return
+        flags = pygame.BLEND_ADD if additive else 0
+        fblits = getattr(screen, "fblits", None)  # pygame-ce fast path
+        if fblits is not None:
+            fblits(batch, flags)
+        elif flags:
+            screen.blits([(surf, pos, None, flags) for surf, pos in batch], doreturn=False)
+        else:
+            screen.blits(batch, doreturn=False)
+
+    def draw(self, screen, particles, offset=(0, 0)):
+        """Draw Particle objects"""
+        ox, oy = offset
+        solid = []; glow = []
+        additive = self.additive_types
+        sprite = self.sprite
+        for p in particles:
+            w, h = p.size()
+            pos = (int(p.x) + ox - w // 2, int(p.y) + oy - h // 2)
+            (glow if p.particle_type in additive else solid).append(
+                (sprite(w, h, p.color, p.particle_type), pos))
+        self.blit_batch(screen, solid)
+        self.blit_batch(screen, glow, additive=True)
+
+
+class ParticleGovernor:
+    """Scales particle emission to fit a per-frame time budget.
 
+    The particle system reports how long its update() and draw() calls take;
+    each drawn frame closes one sample. While the smoothed cost is above
+    `budget_ms` the quality level drops, and it climbs back slowly once the
+    cost falls under `headroom` of the budget.
+
+    Quality is spent in two tiers. From 1.0 down to 0.5 only cosmetic types
+    (trail/glow) thin out, reaching zero at 0.5; below that the remaining
+    types emit fewer particles, down to `min_scale` of their count, and
+    live shorter, down to half their lifetime.
+    """
+
+    def __init__(self, budget_ms=4.0, headroom=0.7, smoothing=0.2, drop=0.04, recover=0.01,
+                 min_scale=0.2, cosmetic_types=("trail",)):
+        self.budget = budget_ms / 1000.0
+        self.headroom = headroom
+        self.smoothing = smoothing
+        self.drop = drop
+        self.recover = recover
+        self.min_scale = min_scale
+        self.cosmetic_types = frozenset(cosmetic_types)
+        self.quality = 1.0
+        self.cost = 0.0      # smoothed seconds per frame
+        self._pending = 0.0  # seconds spent since the last closed frame
+
+    def add(self, seconds):
+        self._pending += seconds
+
+    def end_frame(self):
+        """Close the frame's sample and adjust quality"""
+        self.cost += (self._pending - self.cost) * self.smoothing
+        self._pending = 0.0
+        if self.cost > self.budget:
+            # step harder the further over budget we are
+            over = min(self.cost / self.budget - 1.0, 1.0)
+            self.quality = max(0.0, self.quality - self.drop * (1.0 + over))
+        elif self.cost < self.budget * self.headroom:
+            self.quality = min(1.0, self.quality + self.recover)
+
+    def reset(self):
+        self.quality = 1.0
+        self.cost = 0.0
+        self._pending = 0.0
+
+    def scale(self, particle_type):
+        """Share of a burst of `particle_type` to emit at the current quality"""
+        q = self.quality
+        if particle_type in self.cosmetic_types:
+            return max(0.0, 2.0 * q - 1.0)
+        return max(self.min_scale, min(1.0, 2.0 * q))
+
+    def shape(self, particle_type, count, lifetime):
+        """(count, lifetime) for a burst after applying the budget"""
+        if self.quality >= 1.0:
+            return count, lifetime
+        s = self.scale(particle_type)
+        count = int(count * s + 0.5)
+        if particle_type not in self.cosmetic_types:
+            lifetime = max(1, int(lifetime * (0.5 + 0.5 * s)))
+        return count, lifetime
+
+
+# Pool defaults: hard cap on live particles and what to do when it is reached
+MAX_PARTICLES = 4096
+OVERFLOW_DROP_OLDEST = "drop_oldest"   # recycle the oldest live particles
+OVERFLOW_REFUSE = "refuse"             # skip the new particles instead
 
 class ParticleSystem:
-    """Enhanced particle system with physics and environmental effects"""
+    """Enhanced particle system with physics and environmental effects.
+
+    Particles come from a fixed-capacity pool: dead ones go on a free list and
+    are reset for the next emitter instead of being garbage, so collision
+    bursts neither grow memory past `capacity` nor churn the allocator/GC.
+
+    With a ParticleGovernor attached, update() and draw() are timed and
+    every burst is shaped to the governor's current quality.
+    """
     
-    def __init__(self, arena_bounds=None):
-        self.particles = []
+    def __init__(self, arena_bounds=None, capacity=MAX_PARTICLES, overflow=OVERFLOW_DROP_OLDEST,
+                 renderer=None, rng=None, governor=None):
+        if overflow not in (OVERFLOW_DROP_OLDEST, OVERFLOW_REFUSE):
+            raise ValueError(f"unknown overflow policy: {overflow!r}")
+        self.particles = []   # live particles, oldest first
+        self._free = []       # dead particles waiting to be reused
+        self.capacity = capacity
+        self.overflow = overflow
         self.arena_bounds = arena_bounds
         self.wind_force = (0, 0)  # global wind effect
         self.wind_timer = 0
+        self.renderer = renderer or ParticleRenderer()
+        # own generator, so cosmetic particles never disturb gameplay randomness
+        self.rng = rng if rng is not None else random.Random()
+        self.governor = governor
     
+    def __len__(self):
+        return len(self.particles)
+
     def set_arena_bounds(self, x, y, width, height):
         """Set arena boundaries for particle collision"""
         self.arena_bounds = (x, y, width, height)
     
     def clear(self):
         """Clear all particles"""
-        self.particles = []
+        self._free.extend(self.particles)
+        self.particles.clear()
     
     def update(self):
-        """Update all particles with physics and remove dead ones"""
+        """Update all particles with physics and recycle dead ones"""
+        if self.governor is not None:
+            start = time.perf_counter()
+            self._update()
+            self.governor.add(time.perf_counter() - start)
+        else:
+            self._update()
+
+    def _update(self):
         # Update wind effect (subtle, random changes)
         self.wind_timer += 1
         if self.wind_timer % 60 == 0:  # change wind every second
             self.wind_force = (
-                random.uniform(-0.02, 0.02),  # very subtle horizontal wind
-                random.uniform(-0.01, 0.01)   # very subtle vertical wind
+                self.rng.uniform(-0.02, 0.02),  # very subtle horizontal wind
+                self.rng.uniform(-0.01, 0.01)   # very subtle vertical wind
             )
         
-        # Update all particles
-        for particle in self.particles:
-            particle.update(self.wind_force)
-        self.particles = [p for p in self.particles if not p.dead]
+        # Update all particles, compacting survivors in place
+        particles = self.particles
+        free = self._free
+        wind = self.wind_force
+        rng = self.rng
+        alive = 0
+        for particle in particles:
+            particle.update(wind, rng)
+            if particle.age >= particle.lifetime:
+                free.append(particle)
+            else:
+                particles[alive] = particle
+                alive += 1
+        del particles[alive:]
     
+    def bounds(self, offset=(0, 0)):
+        """Rect covering every live particle, or None when there are none"""
+        particles = self.particles
+        if not particles:
+            return None
+        xs = [p.x for p in particles]; ys = [p.y for p in particles]
+        pad = max(max(p.width, p.height) for p in particles) // 2 + 1
+        left = int(min(xs)) + offset[0] - pad; top = int(min(ys)) + offset[1] - pad
+        return pygame.Rect(left, top, int(max(xs)) + offset[0] + pad - left + 1,
+                           int(max(ys)) + offset[1] + pad - top + 1)
+
     def draw(self, screen, offset=(0, 0)):
-        """Draw all particles"""
-        for particle in self.particles:
-            particle.draw(screen, offset)
+        """Draw all particles in one sprite batch"""
+        governor = self.governor
+        if governor is None:
+            self.renderer.draw(screen, self.particles, offset)
+            return
+        start = time.perf_counter()
+        self.renderer.draw(screen, self.particles, offset)
+        governor.add(time.perf_counter() - start)
+        governor.end_frame()
+
+    def _spawn(self, count, x, y, color, width, height, lifetime, particle_type):
+        """Emit `count` particles from the pool, applying the governor and
+        the overflow policy"""
+        if self.governor is not None:
+            count, lifetime = self.governor.shape(particle_type, count, lifetime)
+        particles = self.particles
+        room = self.capacity - len(particles)
+        if count > room:
+            if self.overflow == OVERFLOW_REFUSE:
+                count = max(0, room)
+            else:
+                count = min(count, self.capacity)
+                evict = count - room
+                self._free.extend(particles[:evict])
+                del particles[:evict]
+        free = self._free
+        bounds = self.arena_bounds
+        rng = self.rng
+        for _ in range(count):
+            if free:
+                p = free.pop()
+                p.reset(x, y, color, width, height, lifetime, particle_type, bounds, rng)
+            else:
+                p = Particle(x, y, color, width, height, lifetime, particle_type, bounds, rng)
+            particles.append(p)
     
     def add_explosion(self, x, y, color, count=20):
         """Add explosion particles at the given position"""
-        for _ in range(count):
-            self.particles.append(Particle(x, y, color, 12, 12, lifetime=28, 
-                                         particle_type="explosion", arena_bounds=self.arena_bounds))
+        self._spawn(count, x, y, color, 12, 12, 28, "explosion")
         # Add some sparks for extra effect
-        for _ in range(count // 3):
-            self.particles.append(Particle(x, y, (255, 255, 255), 8, 8, lifetime=20, 
-                                         particle_type="spark", arena_bounds=self.arena_bounds))
+        self._spawn(count // 3, x, y, (255, 255, 255), 8, 8, 20, "spark")
     
     def add_collision_sparks(self, x, y, count=8):
         """Add bright sparks for collision feedback"""
-        for _ in range(count):
-            self.particles.append(Particle(x, y, (255, 255, 255), 6, 6, lifetime=15, 
-                                         particle_type="spark", arena_bounds=self.arena_bounds))
+        self._spawn(count, x, y, (255, 255, 255), 6, 6, 15, "spark")
     
     def add_damage_sparks(self, x, y, color, count=6):
         """Add colored sparks when fighter takes damage"""
-        for _ in range(count):
-            self.particles.append(Particle(x, y, color, 8, 8, lifetime=18, 
-                                         particle_type="spark", arena_bounds=self.arena_bounds))
+        self._spawn(count, x, y, color, 8, 8, 18, "spark")
     
     def add_pickup_glow(self, x, y, color, count=8):
         """Add glowing effect when pickup is collected"""
-        for _ in range(count):
-            self.particles.append(Particle(x, y, color, 10, 10, lifetime=25, 
-                                         particle_type="trail", arena_bounds=self.arena_bounds))
+        self._spawn(count, x, y, color, 10, 10, 25, "trail")
     
     def add_wall_sparks(self, x, y, count=4):
         """Add sparks when particles hit walls"""
-        for _ in range(count):
-            self.particles.append(Particle(x, y, (255, 200, 100), 4, 4, lifetime=12, 
-                                         particle_type="spark", arena_bounds=self.arena_bounds))
+        self._spawn(count, x, y, (255, 200, 100), 4, 4, 12, "spark")
@@ -0,0 +1,161 @@
+import sys
+import time
+from array import array
+
+import pygame
+
+HISTORY = 240        # frames kept per phase (4 s at 60 fps)
+REFRESH_FRAMES = 15  # overlay text is re-rendered this often
+
+
+class RingBuffer:
+    """Fixed-size float history; pushing never allocates"""
+
+    __slots__ = ("values", "index", "count")
+
+    def __init__(self, size=HISTORY):
+        self.values = array("d", bytes(8 * size))
+        self.index = 0
+        self.count = 0
+
+    def push(self, value):
+        values = self.values
+        values[self.index] = value
+        self.index = (self.index + 1) % len(values)
+        if self.count < len(values):
+            self.count += 1
+
+    def last(self):
+        return self.values[self.index - 1] if self.count else 0.0
+
+    def stats(self):
+        """(mean, p95, p99, max) over the buffered samples"""
+        if not self.count:
+            return 0.0, 0.0, 0.0, 0.0
+        samples = sorted(self.values[:self.count])
+        n = len(samples)
+        return (sum(samples) / n, samples[min(n - 1, int(n * 0.95))],
+                samples[min(n - 1, int(n * 0.99))], samples[-1])
+
+
+class FrameProfiler:
+    """Per-phase frame timings kept in ring buffers.
+
+    The loop calls lap(name) at the end of each phase, which charges the time
+    since the previous lap to `name` (a phase may be charged several times a
+    frame, e.g. once per simulation tick), and end_frame() once per frame to
+    push the totals. A frame costs one perf_counter call per lap and no
+    allocation beyond the float it times.
+    """
+
+    def __init__(self, phases=(), history=HISTORY, clock=time.perf_counter):
+        self.clock = clock
+        self.history = history
+        self.phases = list(phases)
+        self.rings = {name: RingBuffer(history) for name in self.phases}
+        self.frame = RingBuffer(history)
+        self.counters = {}
+        self._current = dict.fromkeys(self.phases, 0.0)
+        self._last = self._frame_start = clock()
+
+    def lap(self, name):
+        now = self.clock()
+        current = self._current
+        if name not in current:
+            # first sighting of a phase; later frames reuse its slot
+            self.phases.append(name)
+            self.rings[name] = RingBuffer(self.history)
+            current[name] = 0.0
+        current[name] += now - self._last
+        self._last = now
+
+    def count(self, name, value):
+        """Record a per-frame counter (particles, net blocks, ...)"""
+        ring = self.counters.get(name)
+        if ring is None:
+            ring = self.counters[name] = RingBuffer(self.history)
+        ring.push(value)
+
+    def end_frame(self):
+        now = self.clock()
+        current = self._current
+        rings = self.rings
+        for name in self.phases:
+            rings[name].push(current[name])
+            current[name] = 0.0
+        self.frame.push(now - self._frame_start)
+        self._frame_start = now
+
+
+class NetBlockCounter:
+    """Change in live interpreter memory blocks per frame.
+
+    This is a net figure (sys.getallocatedblocks), not an allocation count:
+    a frame that allocates and frees 10k objects shows 0. A steady non-zero
+    value means something is growing or churning the GC.
+    """
+
+    def __init__(self):
+        self._last = sys.getallocatedblocks()
+
+    def sample(self):
+        """(live blocks, change since the previous sample)"""
+        live = sys.getallocatedblocks()
+        delta = live - self._last
+        self._last = live
+        return live, delta
+
+
+class ProfilerOverlay:
+    """Toggleable panel with mean/p95/p99/max per phase in milliseconds.
+
+    The panel is rendered into its own surface every REFRESH_FRAMES frames
+    and blitted as-is in between, so showing it costs one blit most frames.
+    """
+
+    def __init__(self, profiler, font, visible=False, refresh=REFRESH_FRAMES):
+        self.profiler = profiler
+        self.font = font
+        self.visible = visible
+        self.refresh = refresh
+        self._panel = None
+        self._age = 0
+
+    def toggle(self):
+        self.visible = not self.visible
+        self._panel = None
+
+    def _lines(self):
+        p = self.profiler
+        lines = [f"{'phase':<11}{'mean':>6}{'p95':>6}{'p99':>6}{'max':>6}"]
+        rows = [(name, p.rings[name]) for name in p.phases] + [("frame", p.frame)]
+        for name, ring in rows:
+            mean, p95, p99, peak = (v * 1000.0 for v in ring.stats())
+            lines.append(f"{name[:11]:<11}{mean:6.2f}{p95:6.2f}{p99:6.2f}{peak:6.1f}")
+        for name, ring in p.counters.items():
+            mean, _, _, peak = ring.stats()
+            lines.append(f"{name[:11]:<11} now {ring.last():.0f}  avg {mean:.0f}  max {peak:.0f}")
+        return lines
+
+    def _render(self):
+        lines = self._lines()
+        surfs = [self.font.render(line, False, (230, 230, 230)) for line in lines]
+        pad = 4
+        line_h = self.font.get_linesize() + 2
+        w = max(s.get_width() for s in surfs) + 2 * pad
+        h = line_h * len(surfs) + 2 * pad
+        panel = pygame.Surface((w, h), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 190))
+        for k, surf in enumerate(surfs):
+            panel.blit(surf, (pad, pad + k * line_h))
+        return panel
+
+    def draw(self, screen, pos=(4, 4)):
+        """Blit the panel; returns its rect, or None while hidden"""
+        if not self.visible:
+            return None
+        self._age -= 1
+        if self._panel is None or self._age <= 0:
+            self._panel = self._render()
+            self._age = self.refresh
+        return screen.blit(self._panel, pos)
@@ -0,0 +1,114 @@
+import cProfile
+import io
+import os
+import pstats
+import time
+from collections import Counter
+
+DEFAULT_FRAMES = 300        # five seconds at 60 fps
+DEFAULT_DIR = "profiles"
+TOP_FUNCTIONS = 40          # rows in the text summary
+
+
+class ProfileCapture:
+    """Records a window of frames under cProfile and writes it to disk.
+
+    The main loop calls frame(label, particles) once per frame. A capture
+    runs for `frames` frames once started, either by start() (the hotkey)
+    or, when `at` names a label, on the first frame carrying that label --
+    e.g. at="STATE_GAMEOVER_TRANS" grabs the game-over blur. Each capture
+    leaves <name>.pstats (load with pstats or snakeviz) and <name>.txt, a
+    summary with the labels and particle counts seen in the window.
+    """
+
+    def __init__(self, frames=DEFAULT_FRAMES, out_dir=DEFAULT_DIR, at=None):
+        self.frames = frames
+        self.out_dir = out_dir
+        self.at = at               # label that arms a one-off capture
+        self.profile = None
+        self._pending = False
+        self._left = 0
+        self._labels = Counter()
+        self._particles = []
+        self._started = 0.0
+        self.last_path = None
+
+    @property
+    def active(self):
+        return self.profile is not None
+
+    def start(self):
+        """Begin a capture on the next frame (ignored while one is running)"""
+        if not self.active:
+            self._pending = True
+
+    def frame(self, label, particles=0):
+        """Per-frame hook: start, count and finish captures"""
+        if not self.active:
+            if self.at is not None and label == self.at:
+                self.at = None
+                self._pending = True
+            if not self._pending:
+                return
+            self._begin()
+        self._labels[label] += 1
+        self._particles.append(particles)
+        self._left -= 1
+        if self._left <= 0:
+            self._finish()
+
+    def close(self):
+        """Write out a capture cut short, e.g. by quitting"""
+        if self.active:
+            self._finish()
+
+    def _begin(self):
+        self._pending = False
+        self._left = self.frames
+        self._labels.clear()
+        self._particles = []
+        self._started = time.perf_counter()
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def _finish(self):
+        profile = self.profile
+        profile.disable()
+        self.profile = None
+        elapsed = time.perf_counter() - self._started
+
+        first = next(iter(self._labels))
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        name = f"profile-{stamp}-{first.lower()}-p{max(self._particles)}"
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, name)
+        profile.dump_stats(base + ".pstats")
+
+        frames = len(self._particles)
+        out = io.StringIO()
+        out.write(f"frames     {frames} in {elapsed:.2f} s ({1000 * elapsed / frames:.2f} ms/frame)\n")
+        out.write("states     " + ", ".join(f"{k} x{n}" for k, n in self._labels.items()) + "\n")
+        out.write(f"particles  min {min(self._particles)}  mean {sum(self._particles) / frames:.0f}"
+                  f"  max {max(self._particles)}\n\n")
+        stats = pstats.Stats(profile, stream=out)
+        stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        with open(base + ".txt", "w") as f:
+            f.write(out.getvalue())
+        self.last_path = base + ".pstats"
+        return self.last_path
+
+
+def capture_from_env(environ=os.environ):
+    """ProfileCapture configured from HITBOX_PROFILE_FRAMES / _DIR / _AT.
+
+    HITBOX_PROFILE_AT=start captures from the first frame; a state name
+    (STATE_PLAYING, STATE_GAMEOVER_TRANS, ...) waits for that state.
+    """
+    capture = ProfileCapture(int(environ.get("HITBOX_PROFILE_FRAMES", DEFAULT_FRAMES)),
+                             environ.get("HITBOX_PROFILE_DIR", DEFAULT_DIR))
+    at = environ.get("HITBOX_PROFILE_AT")
+    if at == "start":
+        capture.start()
+    elif at:
+        capture.at = at
+    return capture
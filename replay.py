@@ -0,0 +1,400 @@
+import struct
+import sys
+
+from engine import Match, MatchConfig, HealthPickup, InvincibilityPickup, SIDES
+
+# === File layout ===
+# header   MAGIC, version, seed, MatchConfig fields, keyframe interval
+# records  TAG_EVENTS: frame delta (varint), event count, packed events
+#          TAG_KEYFRAME: full round state, every `interval` frames from 0
+#          TAG_END: final frame (varint)
+MAGIC = b"HBRP"
+VERSION = 1
+DEFAULT_KEYFRAME_INTERVAL = 120   # two seconds of play
+
+TAG_EVENTS = 1
+TAG_KEYFRAME = 2
+TAG_END = 3
+
+_HEADER = struct.Struct("<4sBBQ")           # magic, version, has_seed, seed
+_CONFIG = struct.Struct("<6i4idiiiiiiH")      # MatchConfig + keyframe interval
+_STATE = struct.Struct("<iiBBii6i")          # frame, cooldown, flags, winner, stats
+_FIGHTER = struct.Struct("<6iB")             # x, y, dx, dy, health, inv timer, hurt timer
+_PICKUP = struct.Struct("<Bhhii")            # kind, cx, cy, age, lifetime
+
+KINDS = ("health", "inv", "generic")
+WINNERS = (None, "RED", "BLUE")
+
+# event name -> (code, payload layout); kinds and winners are stored as indexes
+EVENTS = {
+    "pickup_spawn":   (1, struct.Struct("<Bhh")),
+    "pickup_expired": (2, struct.Struct("<Bhh")),
+    "pickup_taken":   (3, struct.Struct("<BhhB")),
+    "collision":      (4, struct.Struct("<hhhh")),
+    "ko":             (5, struct.Struct("<B")),
+    "round_over":     (6, struct.Struct("<B")),
+}
+_EVENT_NAMES = {code: (name, layout) for name, (code, layout) in EVENTS.items()}
+
+
+def write_varint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+def read_varint(data, pos):
+    n = shift = 0
+    while True:
+        b = data[pos]; pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+
+def pack_event(ev):
+    name = ev[0]
+    code, layout = EVENTS[name]
+    if name in ("pickup_spawn", "pickup_expired"):
+        fields = (KINDS.index(ev[1]), ev[2], ev[3])
+    elif name == "pickup_taken":
+        fields = (KINDS.index(ev[1]), ev[2], ev[3], ev[4])
+    elif name == "collision":
+        fields = (ev[1], ev[2], *ev[3])
+    elif name == "ko":
+        fields = (ev[1],)
+    else:
+        fields = (WINNERS.index(ev[1]),)
+    return bytes((code,)) + layout.pack(*fields)
+
+def unpack_event(data, pos):
+    name, layout = _EVENT_NAMES[data[pos]]
+    f = layout.unpack_from(data, pos + 1)
+    pos += 1 + layout.size
+    if name in ("pickup_spawn", "pickup_expired"):
+        return (name, KINDS[f[0]], f[1], f[2]), pos
+    if name == "pickup_taken":
+        return (name, KINDS[f[0]], f[1], f[2], f[3]), pos
+    if name == "collision":
+        return (name, f[0], f[1], (f[2], f[3])), pos
+    if name == "ko":
+        return (name, f[0]), pos
+    return (name, WINNERS[f[0]]), pos
+
+
+# === Round state snapshots ===
+def pack_state(match):
+    """Everything step() needs to carry on from this frame, as bytes"""
+    st = match.stats
+    flags = match.over | (match.timed_out << 1)
+    out = [_STATE.pack(match.frame, match.pickup_cooldown, flags, WINNERS.index(match.winner),
+                       st["collisions"], st["pickups_spawned"],
+                       *(st[s][k] for s in SIDES for k in ("damage_taken", "healed", "pickups")))]
+    for f in match.fighters:
+        out.append(_FIGHTER.pack(f.x, f.y, f.dx, f.dy, f.health, f.invincible_timer,
+                                 f.hurt_timer | (f.invincible << 7)))
+    out.append(bytes((len(match.pickups),)))
+    for pk in match.pickups:
+        out.append(_PICKUP.pack(KINDS.index(pk.KIND), pk.cx, pk.cy, pk.age, pk.lifetime))
+    return b"".join(out)
+
+def restore_state(match, data, pos=0):
+    """Load a pack_state snapshot into match; returns the offset after it"""
+    c = match.config
+    (match.frame, match.pickup_cooldown, flags, winner, collisions, spawned,
+     *sides) = _STATE.unpack_from(data, pos)
+    pos += _STATE.size
+    match.over = bool(flags & 1); match.timed_out = bool(flags & 2)
+    match.winner = WINNERS[winner]
+    match.stats = {"collisions": collisions, "pickups_spawned": spawned}
+    for i, side in enumerate(SIDES):
+        match.stats[side] = dict(zip(("damage_taken", "healed", "pickups"), sides[3*i:3*i + 3]))
+    for f in match.fighters:
+        f.x, f.y, f.dx, f.dy, f.health, f.invincible_timer, hurt = _FIGHTER.unpack_from(data, pos)
+        pos += _FIGHTER.size
+        f.hurt_timer = hurt & 0x7F; f.invincible = bool(hurt & 0x80)
+        f.prev_x, f.prev_y = f.x, f.y
+        f.displayed_health = f.health
+    match.pickups = []
+    n = data[pos]; pos += 1
+    for _ in range(n):
+        kind, cx, cy, age, lifetime = _PICKUP.unpack_from(data, pos)
+        pos += _PICKUP.size
+        if KINDS[kind] == "health":
+            pk = HealthPickup(cx, cy, lifetime, amount=c.damage)
+        else:
+            pk = InvincibilityPickup(cx, cy, lifetime, frames=c.invincibility_frames)
+        pk.age = age
+        match.pickups.append(pk)
+    return pos
+
+
+def _skip_state(data, pos):
+    pos += _STATE.size + 2 * _FIGHTER.size
+    return pos + 1 + data[pos] * _PICKUP.size
+
+
+def _pack_config(c, interval):
+    return _CONFIG.pack(c.damage, c.dx, c.dy, c.health, c.fighter_width, c.fighter_height,
+                        *c.arena, c.pickup_chance, c.pickup_cooldown, c.pickup_start_cooldown,
+                        c.max_pickups, c.pickup_lifetime, c.invincibility_frames, c.max_frames,
+                        interval)
+
+def _unpack_config(data, pos):
+    v = _CONFIG.unpack_from(data, pos)
+    config = MatchConfig(damage=v[0], dx=v[1], dy=v[2], health=v[3], fighter_width=v[4],
+                         fighter_height=v[5], arena=v[6:10], pickup_chance=v[10],
+                         pickup_cooldown=v[11], pickup_start_cooldown=v[12], max_pickups=v[13],
+                         pickup_lifetime=v[14], invincibility_frames=v[15], max_frames=v[16])
+    return config, v[17], pos + _CONFIG.size
+
+
+# === Recording ===
+class MatchRecorder:
+    """Records a Match as it is stepped.
+
+    Use recorder.step() in place of match.step(). Frames with events are
+    stored as deltas, and a full-state keyframe goes out every `interval`
+    frames. Recording stops at round_over; the drifting afterwards is
+    cosmetic.
+    """
+
+    def __init__(self, match, interval=DEFAULT_KEYFRAME_INTERVAL):
+        c = match.config
+        if match.frame != 0:
+            raise ValueError("start recording before the round's first step")
+        if any(int(v) != v for v in (c.dx, c.dy, c.fighter_width, c.fighter_height, *c.arena)):
+            raise ValueError("replays need integer speeds and arena geometry")
+        self.match = match
+        self.interval = interval
+        seed = match.seed if match.seed is not None else 0
+        self.buf = bytearray(_HEADER.pack(MAGIC, VERSION, match.seed is not None, seed))
+        self.buf += _pack_config(c, interval)
+        self.last_frame = match.frame
+        self.done = False
+        self._keyframe()
+
+    def _keyframe(self):
+        self.buf.append(TAG_KEYFRAME)
+        self.buf += pack_state(self.match)
+
+    def step(self):
+        """match.step(), recording what it did; returns its events"""
+        events = self.match.step()
+        if self.done:
+            return events
+        frame = self.match.frame
+        if events:
+            self.buf.append(TAG_EVENTS)
+            write_varint(self.buf, frame - self.last_frame)
+            self.buf.append(len(events))
+            for ev in events:
+                self.buf += pack_event(ev)
+            self.last_frame = frame
+        if self.match.over:
+            self.buf.append(TAG_END)
+            write_varint(self.buf, frame)
+            self.done = True
+        elif frame % self.interval == 0:
+            self._keyframe()
+        return events
+
+    def run(self):
+        """Record the rest of the round and return its MatchResult"""
+        while not self.done:
+            self.step()
+        return self.match.result()
+
+    def to_bytes(self):
+        return bytes(self.buf)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.buf)
+
+
+def record(config=None, seed=None, interval=DEFAULT_KEYFRAME_INTERVAL):
+    """Play one round headless and return its replay bytes"""
+    recorder = MatchRecorder(Match(config, seed=seed), interval)
+    recorder.run()
+    return recorder.to_bytes()
+
+
+# === Playback ===
+class Replay:
+    """A parsed replay: header, keyframes and the events of every frame"""
+
+    def __init__(self, data):
+        magic, version, has_seed, seed = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError("not a HitBox replay")
+        if version != VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+        self.seed = seed if has_seed else None
+        self.config, self.interval, pos = _unpack_config(data, _HEADER.size)
+        self.data = data
+        self.keyframes = []    # offset of keyframe k, which is at frame k * interval
+        self.events = {}       # frame -> tuple of events
+        self.frames = None     # frame the round was decided on
+        frame = 0
+        while pos < len(data):
+            tag = data[pos]; pos += 1
+            if tag == TAG_KEYFRAME:
+                self.keyframes.append(pos)
+                pos = _skip_state(data, pos)
+            elif tag == TAG_EVENTS:
+                delta, pos = read_varint(data, pos)
+                frame += delta
+                events = []
+                n = data[pos]; pos += 1
+                for _ in range(n):
+                    ev, pos = unpack_event(data, pos)
+                    events.append(ev)
+                self.events[frame] = tuple(events)
+            elif tag == TAG_END:
+                self.frames, pos = read_varint(data, pos)
+            else:
+                raise ValueError(f"corrupt replay: unknown record {tag}")
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    @property
+    def winner(self):
+        for ev in self.events.get(self.frames, ()):
+            if ev[0] == "round_over":
+                return ev[1]
+        return None
+
+    def match_at(self, frame):
+        """A ReplayMatch positioned at `frame`: nearest keyframe, then re-simulate"""
+        last = self.frames if self.frames is not None else frame
+        frame = max(0, min(frame, last))
+        k = min(frame // self.interval, len(self.keyframes) - 1)
+        match = ReplayMatch(self)
+        restore_state(match, self.data, self.keyframes[k])
+        while match.frame < frame:
+            match.step()
+        return match
+
+
+class ReplayMatch(Match):
+    """Match whose random decisions come from a replay instead of an RNG"""
+
+    def __init__(self, replay):
+        self.replay = replay
+        super().__init__(replay.config, seed=replay.seed, spawns=((0, 0), (0, 0)))
+
+    def _spawn_roll(self):
+        for ev in self.replay.events.get(self.frame, ()):
+            if ev[0] == "pickup_spawn":
+                return ev[1], ev[2], ev[3]
+        return None
+
+    def _tie_break(self, pickup):
+        for ev in self.replay.events.get(self.frame, ()):
+            if ev[0] == "pickup_taken" and (ev[2], ev[3]) == (pickup.cx, pickup.cy):
+                return ev[4]
+        raise ValueError(f"replay has no pickup_taken at frame {self.frame}")
+
+
+class ReplayPlayer:
+    """Plays a Replay forward at any speed, with seeking.
+
+    speed is in game frames per advance() call at rate 1.0; fractional
+    speeds accumulate, so 0.25 shows every frame four times.
+    """
+
+    def __init__(self, replay, speed=1.0):
+        self.replay = replay
+        self.speed = speed
+        self.match = replay.match_at(0)
+        self._carry = 0.0
+
+    @property
+    def frame(self):
+        return self.match.frame
+
+    @property
+    def finished(self):
+        return self.match.over
+
+    def seek(self, frame):
+        self.match = self.replay.match_at(frame)
+        self._carry = 0.0
+
+    def advance(self):
+        """Step as many frames as the speed calls for; returns their events"""
+        self._carry += self.speed
+        events = []
+        while self._carry >= 1 and not self.match.over:
+            events.extend(self.match.step())
+            self._carry -= 1
+        return events
+
+    def fast_forward(self):
+        """Re-simulate headless to the end and return the MatchResult"""
+        while not self.match.over:
+            self.match.step()
+        return self.match.result()
+
+
+def view(replay, speed=1.0, start=0):
+    """Watch a replay in a window: space pauses, left/right seek 5 s, +/- speed"""
+    import pygame
+    from engine import ARENA_X, ARENA_Y, ARENA_WIDTH, ARENA_HEIGHT
+    pygame.init()
+    screen = pygame.display.set_mode((600, 400))
+    pygame.display.set_caption("HitBox replay")
+    clock = pygame.time.Clock()
+    player = ReplayPlayer(replay, speed)
+    player.seek(start)
+    paused = False
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE: running = False
+                elif event.key == pygame.K_SPACE: paused = not paused
+                elif event.key == pygame.K_LEFT: player.seek(player.frame - 300)
+                elif event.key == pygame.K_RIGHT: player.seek(player.frame + 300)
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS): player.speed *= 2
+                elif event.key == pygame.K_MINUS: player.speed /= 2
+        if not paused:
+            player.advance()
+        screen.fill("black")
+        pygame.draw.rect(screen, "white", (ARENA_X-5, ARENA_Y-5, ARENA_WIDTH+10, ARENA_HEIGHT+10))
+        pygame.draw.rect(screen, "black", (ARENA_X, ARENA_Y, ARENA_WIDTH, ARENA_HEIGHT))
+        for f in player.match.fighters:
+            if f.health > 0: f.draw(screen)
+        for pk in player.match.pickups: pk.draw(screen)
+        pygame.display.set_caption(f"HitBox replay  frame {player.frame}/{replay.frames}  x{player.speed:g}")
+        pygame.display.flip()
+        clock.tick(60)
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Play back or check a HitBox replay")
+    parser.add_argument("path")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--seek", type=int, default=0, help="start frame")
+    parser.add_argument("--headless", action="store_true",
+                        help="re-simulate to the end and check it against the recording")
+    args = parser.parse_args()
+    replay = Replay.load(args.path)
+    if args.headless:
+        player = ReplayPlayer(replay)
+        player.seek(args.seek)
+        result = player.fast_forward()
+        ok = result.winner == replay.winner and result.frames == replay.frames
+        print(f"seed={replay.seed} winner={result.winner} frames={result.frames} "
+              f"{'OK' if ok else 'MISMATCH'}")
+        sys.exit(0 if ok else 1)
+    view(replay, args.speed, args.seek)
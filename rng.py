@@ -0,0 +1,48 @@
+import hashlib
+import random
+
+
+def derive_seed(seed, name):
+    """Stable 64-bit seed for stream `name` of a root seed.
+
+    Hash-based rather than drawn from a shared generator, so adding a stream
+    or using one more or less never shifts any other stream.
+    """
+    digest = hashlib.blake2b(f"{seed}/{name}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class RngStreams:
+    """One independent random.Random per subsystem, all from a single seed.
+
+    Gameplay, particles and screen effects each draw from their own stream,
+    so cosmetic randomness can never change what the match sees:
+
+        streams = RngStreams(1234)
+        match = Match(seed=streams.next_seed("rounds"))
+        particles = ParticleSystem(rng=streams.stream("particles"))
+
+    With seed=None a random root seed is picked (and kept in .seed, so the
+    session can still be reproduced).
+    """
+
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        self.seed = seed
+        self._streams = {}
+
+    def stream(self, name):
+        """The random.Random for subsystem `name`, created on first use"""
+        rng = self._streams.get(name)
+        if rng is None:
+            rng = self._streams[name] = random.Random(derive_seed(self.seed, name))
+        return rng
+
+    def seed_for(self, name):
+        """Seed for a subsystem that brings its own generator (e.g. NumPy)"""
+        return derive_seed(self.seed, name)
+
+    def next_seed(self, name):
+        """Draw the next 64-bit seed from stream `name`, e.g. one per round"""
+        return self.stream(name).getrandbits(64)
@@ -0,0 +1,35 @@
+# === Betting rules ===
+# Shared by the game (main.py) and the match host (server.py), so a bet on
+# either pays the same.
+START_SCORE = 100      # every run starts here, and restarts here at 0
+POINT_WIN = 25         # stake: a win at even odds, also what a loss costs
+POINT_LOSS = -25
+MIN_P_WIN = 0.02       # long shots are priced as 50:1 at most
+
+
+def fair_payout(stake, p_win, p_draw=0.0):
+    """Points a winning bet of `stake` should pay for the bet to be fair.
+
+    Draws refund the stake, so only the losing probability is priced in.
+    With even odds this is just `stake`. A side that never won in the
+    simulation still pays out, as a MIN_P_WIN long shot.
+    """
+    p_win = max(p_win, MIN_P_WIN)
+    p_lose = max(0.0, 1.0 - p_win - p_draw)
+    return max(1, round(stake * p_lose / p_win))
+
+
+def bet_delta(side, winner, odds=None):
+    """Points a settled bet on `side` scores when `winner` won the round.
+
+    odds is the odds.OddsEstimate locked in when the bet was placed; without
+    one a win pays even odds. Losses cost POINT_LOSS and draws are refunded.
+    """
+    if winner is None:
+        return 0
+    if side != winner:
+        return POINT_LOSS
+    if odds is None:
+        return POINT_WIN
+    p = odds.p_red if side == "RED" else odds.p_blue
+    return fair_payout(POINT_WIN, p, odds.p_draw)
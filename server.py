@@ -0,0 +1,343 @@
+import asyncio
+import contextlib
+import json
+import time
+
+from engine import Match
+from rng import RngStreams
+from scoring import START_SCORE, bet_delta
+
+TICK_RATE = 60
+MAX_CATCHUP_TICKS = 5       # ticks run back to back before the host resyncs
+BETTING_SECONDS = 5.0       # window for bets before each round starts
+RESULT_SECONDS = 3.0        # pause after a round before betting reopens
+MAX_LINE = 4096             # longest client message accepted
+MAX_BUFFER = 256 * 1024     # unsent bytes before a slow client is dropped
+ODDS_PRECISION = 0.03       # same coarse pricing as the game's select screen
+
+SIDES = ("RED", "BLUE")
+
+# Table phases
+BETTING = "betting"
+PLAYING = "playing"
+RESULT = "result"
+
+
+class Bettor:
+    """One connected client: its score and the tables it follows"""
+
+    def __init__(self, cid, writer):
+        self.id = cid
+        self.name = f"bettor-{cid}"
+        self.score = START_SCORE
+        self.writer = writer
+        self.watching = set()
+        self.closed = False
+
+    def send(self, msg):
+        """Queue one JSON line; drops the client if it stops reading"""
+        if self.closed:
+            return
+        transport = self.writer.transport
+        if transport.is_closing() or transport.get_write_buffer_size() > MAX_BUFFER:
+            self.close()
+            return
+        self.writer.write(json.dumps(msg, separators=(",", ":")).encode() + b"\n")
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.writer.close()
+
+
+class Table:
+    """One headless match that loops betting -> playing -> result forever"""
+
+    def __init__(self, tid, streams, betting_ticks, result_ticks, pricer=None):
+        self.id = tid
+        self.streams = streams
+        self.betting_ticks = betting_ticks
+        self.result_ticks = result_ticks
+        self.pricer = pricer     # (spawns, seed) -> Future of an OddsEstimate
+        self.round = 0
+        self.match = None
+        self.odds = None         # this round's OddsEstimate, once priced
+        self.odds_future = None
+        self.bets = {}           # Bettor -> (side, odds when the bet was placed)
+        self.watchers = set()
+        self._open_betting()
+
+    def _open_betting(self):
+        self.round += 1
+        self.phase = BETTING
+        self.countdown = self.betting_ticks
+        self.bets = {}
+        seed = self.streams.next_seed(f"table-{self.id}")
+        self.match = Match(seed=seed)
+        self.odds = None
+        self.odds_future = None
+        if self.pricer is not None:
+            f1, f2 = self.match.fighters
+            self.odds_future = self.pricer(((f1.x, f1.y), (f2.x, f2.y)), seed)
+        self.broadcast({"op": "betting", "match": self.id, "round": self.round,
+                        "closes_in": self.betting_ticks / TICK_RATE})
+
+    def _check_odds(self):
+        future = self.odds_future
+        if future is None or not future.done():
+            return
+        self.odds_future = None
+        if future.exception() is None:
+            self.odds = odds = future.result()
+            self.broadcast({"op": "odds", "match": self.id, "round": self.round,
+                            "p_red": odds.p_red, "p_blue": odds.p_blue, "p_draw": odds.p_draw,
+                            "pays": {side: bet_delta(side, side, odds) for side in SIDES}})
+
+    def broadcast(self, msg):
+        for b in list(self.watchers):
+            b.send(msg)
+
+    def summary(self):
+        return {"id": self.id, "round": self.round, "phase": self.phase,
+                "frame": self.match.frame, "bets": len(self.bets)}
+
+    def place(self, bettor, side):
+        """Record (or change) a bet; returns an error string or None"""
+        if side not in SIDES:
+            return f"side must be one of {SIDES}"
+        if self.phase != BETTING:
+            return "betting is closed"
+        self.bets[bettor] = (side, self.odds)   # priced as the game does: at bet time
+        self.watchers.add(bettor)
+        return None
+
+    def tick(self):
+        if self.phase == PLAYING:
+            self.match.step()
+            if self.match.over:
+                self._settle()
+        elif self.phase == BETTING:
+            self._check_odds()
+            self.countdown -= 1
+            if self.countdown <= 0:
+                self.phase = PLAYING
+                self.broadcast({"op": "started", "match": self.id, "round": self.round})
+        else:
+            self.countdown -= 1
+            if self.countdown <= 0:
+                self._open_betting()
+
+    def _settle(self):
+        winner = self.match.winner
+        self.phase = RESULT
+        self.countdown = self.result_ticks
+        self.broadcast({"op": "result", "match": self.id, "round": self.round,
+                        "winner": winner, "frames": self.match.frame})
+        for bettor, (side, odds) in self.bets.items():
+            delta = bet_delta(side, winner, odds)
+            bettor.score = max(0, bettor.score + delta)
+            if bettor.score <= 0:
+                bettor.score = START_SCORE   # new run, as in the game
+            bettor.send({"op": "score", "match": self.id, "round": self.round, "side": side,
+                         "pays": bet_delta(side, side, odds), "delta": delta,
+                         "score": bettor.score})
+        self.bets = {}
+
+    def forget(self, bettor):
+        self.watchers.discard(bettor)
+        self.bets.pop(bettor, None)
+
+
+class MatchHost:
+    """Many independent matches and their bettors on one asyncio loop.
+
+    Every table is stepped from a single 60 Hz ticker task, so the cost of a
+    tick is one Match.step per playing table and nothing per idle client.
+    Clients speak newline-delimited JSON over TCP:
+
+        -> {"op": "hello", "name": "..."}           <- {"op": "welcome", "id", "score"}
+        -> {"op": "list"}                           <- {"op": "matches", "matches": [...]}
+        -> {"op": "watch", "match": id}             <- {"op": "watching", ...}
+        -> {"op": "bet", "match": id, "side": "RED"}  <- {"op": "bet_ok", ...} / {"op": "error"}
+
+    and are pushed "betting", "odds", "started" and "result" for the tables
+    they watch (betting on a table watches it), plus a personal "score"
+    message when a round they bet on is settled.
+
+    Bets settle with scoring.bet_delta, the game's own rules. With odds=True
+    (needs NumPy) every round is priced by the Monte Carlo odds engine on a
+    shared process pool while betting is open; a bet placed once the price
+    is known pays fair odds, one placed before it pays even odds -- exactly
+    as on the game's select screen.
+    """
+
+    def __init__(self, matches=100, seed=None, betting_seconds=BETTING_SECONDS,
+                 result_seconds=RESULT_SECONDS, tick_rate=TICK_RATE, odds=False):
+        self.streams = RngStreams(seed)
+        self.tick_rate = tick_rate
+        self._pool = None
+        pricer = None
+        if odds:
+            from odds import estimate_odds_async, make_pool
+            pool = self._pool = make_pool()
+
+            def pricer(spawns, seed):
+                return estimate_odds_async(spawns=spawns, precision=ODDS_PRECISION,
+                                           chunk=1024, seed=seed, pool=pool)
+        self.tables = [Table(i, self.streams, max(1, int(betting_seconds * TICK_RATE)),
+                             max(1, int(result_seconds * TICK_RATE)), pricer)
+                       for i in range(matches)]
+        self.bettors = set()
+        self._clients = set()    # _serve_client tasks, awaited by stop()
+        self.ticks = 0
+        self.late_ticks = 0      # ticks the host had to run back to back
+        self.tick_time = 0.0     # seconds spent inside tick()
+        self.max_tick = 0.0
+        self._next_id = 0
+        self._server = None
+        self._ticker = None
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """Listen for clients and start ticking; returns the bound port"""
+        self._server = await asyncio.start_server(self._serve_client, host, port, limit=MAX_LINE)
+        self._ticker = asyncio.get_running_loop().create_task(self._tick_forever())
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Stop ticking and drop every client; safe before (or after a failed) start()"""
+        if self._ticker is not None:
+            self._ticker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._ticker
+        if self._server is not None:
+            self._server.close()
+        for b in list(self.bettors):
+            b.close()
+        await asyncio.gather(*self._clients, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def tick(self):
+        start = time.perf_counter()
+        for table in self.tables:
+            table.tick()
+        self.ticks += 1
+        elapsed = time.perf_counter() - start
+        self.tick_time += elapsed
+        self.max_tick = max(self.max_tick, elapsed)
+
+    async def _tick_forever(self):
+        loop = asyncio.get_running_loop()
+        step = 1.0 / self.tick_rate
+        next_tick = loop.time()
+        while True:
+            ran = 0
+            while loop.time() >= next_tick and ran < MAX_CATCHUP_TICKS:
+                self.tick()
+                next_tick += step
+                ran += 1
+            if ran > 1:
+                self.late_ticks += ran - 1
+            if loop.time() >= next_tick:
+                next_tick = loop.time()   # too far behind: let the game slow down
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+    # --- clients ---
+    async def _serve_client(self, reader, writer):
+        self._next_id += 1
+        bettor = Bettor(self._next_id, writer)
+        self.bettors.add(bettor)
+        task = asyncio.current_task()
+        self._clients.add(task)
+        try:
+            while not bettor.closed:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    bettor.send({"op": "error", "error": "message too long"})
+                    break
+                if not line:
+                    break
+                try:
+                    msg = json.loads(line)
+                except ValueError:
+                    bettor.send({"op": "error", "error": "bad json"})
+                    continue
+                self._handle(bettor, msg)
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.discard(task)
+            self.bettors.discard(bettor)
+            for table in bettor.watching:
+                self.tables[table].forget(bettor)
+            bettor.close()
+
+    def _table(self, bettor, msg):
+        tid = msg.get("match")
+        if isinstance(tid, int) and 0 <= tid < len(self.tables):
+            return self.tables[tid]
+        bettor.send({"op": "error", "error": f"no match {tid!r}", "request": msg.get("op")})
+        return None
+
+    def _handle(self, bettor, msg):
+        op = msg.get("op") if isinstance(msg, dict) else None
+        if op == "hello":
+            bettor.name = str(msg.get("name", bettor.name))[:32]
+            bettor.send({"op": "welcome", "id": bettor.id, "name": bettor.name, "score": bettor.score})
+        elif op == "list":
+            bettor.send({"op": "matches", "matches": [t.summary() for t in self.tables]})
+        elif op == "watch":
+            table = self._table(bettor, msg)
+            if table is not None:
+                table.watchers.add(bettor)
+                bettor.watching.add(table.id)
+                bettor.send(dict(table.summary(), op="watching"))
+        elif op == "bet":
+            table = self._table(bettor, msg)
+            if table is None:
+                return
+            error = table.place(bettor, msg.get("side"))
+            if error:
+                bettor.send({"op": "error", "error": error, "request": "bet", "match": table.id})
+            else:
+                bettor.watching.add(table.id)
+                bettor.send({"op": "bet_ok", "match": table.id, "round": table.round,
+                             "side": msg["side"], "score": bettor.score})
+        else:
+            bettor.send({"op": "error", "error": f"unknown op {op!r}"})
+
+    def stats(self):
+        phases = {BETTING: 0, PLAYING: 0, RESULT: 0}
+        for t in self.tables:
+            phases[t.phase] += 1
+        return {"ticks": self.ticks, "late_ticks": self.late_ticks,
+                "tick_ms": 1000 * self.tick_time / max(self.ticks, 1),
+                "max_tick_ms": 1000 * self.max_tick,
+                "clients": len(self.bettors), "tables": phases}
+
+
+async def serve(host="127.0.0.1", port=8765, matches=100, seed=None, odds=False, report=10.0):
+    match_host = MatchHost(matches, seed, odds=odds)
+    port = await match_host.start(host, port)
+    print(f"hosting {matches} matches on {host}:{port}")
+    while True:
+        await asyncio.sleep(report)
+        print(match_host.stats())
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Host HitBox matches for remote bettors")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--matches", type=int, default=100)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--odds", action="store_true", help="price every round (needs NumPy)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.matches, args.seed, args.odds))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,66 @@
+class SpatialHash:
+    """Uniform-grid broadphase for axis-aligned boxes.
+
+    Boxes are bucketed by the grid cells they overlap; with cells at least
+    as large as a box each one lands in at most four cells, so building the
+    grid and finding overlapping pairs costs roughly O(n) for a spread-out
+    crowd instead of testing every pair. Overlap uses the same open-interval
+    test as pygame.Rect.colliderect.
+    """
+
+    def __init__(self, cell_size):
+        self.cell = cell_size
+        self.cells = {}
+        self.boxes = {}
+
+    def clear(self):
+        self.cells.clear()
+        self.boxes.clear()
+
+    def insert(self, key, x, y, w, h):
+        """Add box `key` with top-left (x, y) and size (w, h)"""
+        self.boxes[key] = (x, y, w, h)
+        cell = self.cell
+        cells = self.cells
+        for cx in range(int(x // cell), int((x + w) // cell) + 1):
+            for cy in range(int(y // cell), int((y + h) // cell) + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    cells[(cx, cy)] = [key]
+                else:
+                    bucket.append(key)
+
+    def pairs(self):
+        """Every overlapping (a, b) pair exactly once, sorted by key"""
+        cell = self.cell
+        boxes = self.boxes
+        found = []
+        for (cx, cy), bucket in self.cells.items():
+            if len(bucket) < 2:
+                continue
+            for i, a in enumerate(bucket):
+                ax, ay, aw, ah = boxes[a]
+                for b in bucket[i + 1:]:
+                    bx, by, bw, bh = boxes[b]
+                    if not (ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah):
+                        continue
+                    # both boxes share every cell their overlap touches; only
+                    # report the pair from the cell holding the overlap's corner
+                    if (int(max(ax, bx) // cell), int(max(ay, by) // cell)) != (cx, cy):
+                        continue
+                    found.append((a, b) if a < b else (b, a))
+        found.sort()
+        return found
+
+    def query(self, x, y, w, h):
+        """Keys of the boxes overlapping the given box, sorted"""
+        cell = self.cell
+        boxes = self.boxes
+        hits = set()
+        for cx in range(int(x // cell), int((x + w) // cell) + 1):
+            for cy in range(int(y // cell), int((y + h) // cell) + 1):
+                for k in self.cells.get((cx, cy), ()):
+                    bx, by, bw, bh = boxes[k]
+                    if bx < x + w and x < bx + bw and by < y + h and y < by + bh:
+                        hits.add(k)
+        return sorted(hits)
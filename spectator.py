@@ -0,0 +1,181 @@
+import asyncio
+import socket
+
+import broadcast
+from engine import (MatchConfig, RED_COLOR, BLUE_COLOR,
+                    ARENA_X, ARENA_Y, ARENA_WIDTH, ARENA_HEIGHT)
+from fighter import Fighter
+
+PICKUP_COLORS = {"health": (34, 197, 94), "inv": (255, 255, 255)}
+
+
+class SpectatorView:
+    """A broadcast match rebuilt locally: real Fighters, pickups and particles.
+
+    Every frame the fighters are stepped locally (move + update_effects, so
+    trails and blinking stay smooth between snapshots) and then snapped to
+    the newest snapshot, if one arrived. Sparks and explosions are not sent
+    at all; they are spawned here from the collision, KO and pickup events,
+    the same way main.py does it.
+    """
+
+    def __init__(self, particles=None, config=None):
+        self.config = config or MatchConfig()
+        self.particles = particles
+        self.round = None
+        self.tick = 0
+        self.pickups = []
+        self.fighters = ()
+
+    def _new_round(self, round_no):
+        c = self.config
+        self.round = round_no
+        self.fighters = tuple(Fighter(0, 0, 0, 0, c.fighter_width, c.fighter_height, color,
+                                      c.health, *c.arena) for color in (RED_COLOR, BLUE_COLOR))
+        if self.particles is not None:
+            self.particles.clear()
+
+    def step(self, snapshots):
+        """Advance one frame, applying the snapshots that came in since the last"""
+        for f in self.fighters:
+            f.move(); f.update_effects()
+        self.tick += 1
+        for pk in self.pickups:
+            pk.update()
+        for round_no, tick, fighters, pickups, events in snapshots:
+            if round_no != self.round:
+                self._new_round(round_no)
+            self.tick = tick
+            for f, fields in zip(self.fighters, fighters):
+                (f.x, f.y, f.dx, f.dy, f.health, f.invincible_timer, f.hurt_timer, inv) = fields
+                f.invincible = bool(inv)
+            self.pickups = [broadcast.build_pickup(*pk, tick) for pk in pickups]
+            for ev in events:
+                self._effect(ev)
+        self.pickups = [pk for pk in self.pickups if not pk.dead]
+        if self.particles is not None:
+            self.particles.update()
+
+    def _effect(self, ev):
+        ps = self.particles
+        if ps is None:
+            return
+        f1, f2 = self.fighters
+        if ev[0] == "collision":
+            _, dmg1, dmg2, (cx, cy) = ev
+            if dmg1 > 0 or dmg2 > 0:
+                ps.add_collision_sparks(cx, cy, 12)
+                ps.add_explosion(cx, cy, (255, 255, 255), 8)
+            if dmg1 > 0:
+                ps.add_damage_sparks(f1.x + f1.width / 2, f1.y + f1.height / 2, (255, 120, 120))
+            if dmg2 > 0:
+                ps.add_damage_sparks(f2.x + f2.width / 2, f2.y + f2.height / 2, (120, 170, 255))
+        elif ev[0] == "ko":
+            f = f1 if ev[1] == 1 else f2
+            ps.add_explosion(int(f.x + f.width / 2), int(f.y + f.height / 2), f.base_color, 55)
+        elif ev[0] == "pickup_taken" and ev[1] in PICKUP_COLORS:
+            ps.add_pickup_glow(ev[2], ev[3], PICKUP_COLORS[ev[1]])
+
+    def draw(self, screen):
+        import pygame
+        pygame.draw.rect(screen, "white", (ARENA_X-5, ARENA_Y-5, ARENA_WIDTH+10, ARENA_HEIGHT+10))
+        pygame.draw.rect(screen, "black", (ARENA_X, ARENA_Y, ARENA_WIDTH, ARENA_HEIGHT))
+        for pk in self.pickups:
+            pk.draw(screen)
+        for f in self.fighters:
+            if f.health > 0:
+                f.draw(screen)
+        if self.particles is not None:
+            self.particles.draw(screen)
+
+
+def watch(host="127.0.0.1", port=8766):
+    """Watch a broadcast in a window (see broadcast.py); Esc quits"""
+    import pygame
+    from particles import ParticleSystem
+    pygame.init()
+    screen = pygame.display.set_mode((600, 400))
+    clock = pygame.time.Clock()
+    sock = socket.create_connection((host, port))
+    sock.setblocking(False)
+    decoder = broadcast.SnapshotDecoder()
+    view = SpectatorView(ParticleSystem((ARENA_X, ARENA_Y, ARENA_WIDTH, ARENA_HEIGHT)))
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+        snapshots = []
+        while True:
+            try:
+                data = sock.recv(65536)
+            except BlockingIOError:
+                break
+            if not data:
+                running = False
+                break
+            snapshots.extend(decoder.feed(data))
+        if snapshots:
+            sock.send(broadcast.ack(snapshots[-1][1]))
+        view.step(snapshots)
+        screen.fill("black")
+        if view.fighters:
+            view.draw(screen)
+            f1, f2 = view.fighters
+            pygame.display.set_caption(f"HitBox spectator  round {view.round}  "
+                                       f"RED {f1.health}  BLUE {f2.health}")
+        pygame.display.flip()
+        clock.tick(60)
+    sock.close()
+    pygame.quit()
+
+
+# === Headless load test ===
+class _Bot(asyncio.Protocol):
+    """Decodes every snapshot and acks it, like a real spectator minus drawing"""
+
+    def __init__(self, totals):
+        self.decoder = broadcast.SnapshotDecoder()
+        self.totals = totals
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        snapshots = self.decoder.feed(data)
+        if snapshots:
+            self.totals["snapshots"] += len(snapshots)
+            self.totals["events"] += sum(len(s[4]) for s in snapshots)
+            self.transport.write(broadcast.ack(snapshots[-1][1]))
+        self.totals["bytes"] += len(data)
+
+
+async def run_bots(clients=1000, seconds=30.0, host="127.0.0.1", port=8766):
+    """Connect `clients` headless spectators for `seconds`; returns totals"""
+    loop = asyncio.get_running_loop()
+    totals = {"snapshots": 0, "events": 0, "bytes": 0}
+    bots = []
+    for _ in range(clients):
+        transport, bot = await loop.create_connection(lambda: _Bot(totals), host, port)
+        bots.append(transport)
+    await asyncio.sleep(seconds)
+    for transport in bots:
+        transport.close()
+    totals.update(clients=clients, seconds=seconds,
+                  bytes_per_client_second=totals["bytes"] / clients / seconds)
+    return totals
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Watch a HitBox broadcast")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--bots", type=int, help="connect this many headless spectators instead")
+    parser.add_argument("--seconds", type=float, default=30.0, help="how long the bots watch")
+    args = parser.parse_args()
+    if args.bots:
+        print(asyncio.run(run_bots(args.bots, args.seconds, args.host, args.port)))
+    else:
+        watch(args.host, args.port)
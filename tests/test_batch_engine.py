@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from batch_engine import BatchMatch, WINNER_NAMES
+from engine import Match, MatchConfig, random_spawn
+
+# No pickups: the only randomness is the spawns, which both sides share.
+# Without heals or invincibility both fighters go down on the same frame
+# (a draw), so frame counts and timeouts carry the comparison; the cap is
+# low enough that some of the seeded rounds time out.
+CONFIG = MatchConfig(pickup_chance=0.0, max_frames=4000)
+
+
+def scalar_results(spawns, config=CONFIG):
+    out = []
+    for sp in spawns:
+        r = Match(config, spawns=sp).run()
+        out.append((r.winner, r.frames, r.timed_out))
+    return out
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_matches_scalar_engine_with_row_refill(seed):
+    rng = random.Random(seed)
+    spawns = [(random_spawn(rng, CONFIG), random_spawn(rng, CONFIG)) for _ in range(40)]
+    # 40 rounds through 6 rows: finished rows are refilled, then dropped
+    batch = BatchMatch(len(spawns), CONFIG, seed=seed, spawns=spawns, width=6)
+    result = batch.run()
+    got = [(WINNER_NAMES[int(w)], int(f), bool(t))
+           for w, f, t in zip(result.winners, result.frames, result.timed_out)]
+    assert got == scalar_results(spawns)
+    assert batch.next_id == len(spawns) and len(batch.ids) == 0
+
+
+class SharedRng(random.Random):
+    """One random.Random that also answers BatchMatch's Generator calls.
+
+    With a single row, BatchMatch makes its pickup draws (spawn roll, x, y,
+    kind, tie-break) in the same order and from the same ranges as Match,
+    so both engines fed the same stream play out identical rounds.
+    """
+
+    def random(self, size=None):
+        draw = super().random
+        return draw() if size is None else np.array([draw() for _ in range(size)])
+
+    def integers(self, low, high, size):
+        return np.array([self.randint(low, high - 1) for _ in range(size)])
+
+
+@pytest.mark.parametrize("seed", [4, 5, 6])
+def test_matches_scalar_engine_with_pickups(seed):
+    config = MatchConfig()               # default pickup settings
+    rng = random.Random(seed)
+    spawns = [(random_spawn(rng, config), random_spawn(rng, config)) for _ in range(15)]
+    scalar_rng = SharedRng(seed)
+    want = []
+    for sp in spawns:
+        r = Match(config, rng=scalar_rng, spawns=sp).run()
+        want.append((r.winner, r.frames, r.timed_out))
+    # one row, refilled round after round from the same stream
+    batch = BatchMatch(len(spawns), config, rng=SharedRng(seed), spawns=spawns, width=1)
+    result = batch.run()
+    got = [(WINNER_NAMES[int(w)], int(f), bool(t))
+           for w, f, t in zip(result.winners, result.frames, result.timed_out)]
+    assert got == want
+    # pickups decided rounds: not every round is the symmetric draw
+    assert {w for w, _, _ in want} - {None}
+
+
+def test_shared_spawns_give_identical_rounds():
+    spawns = ((60, 70), (400, 200))
+    result = BatchMatch(5, CONFIG, spawns=spawns, width=2).run()
+    (winner, frames, timed_out), = scalar_results([spawns])
+    assert all(result.winner(i) == winner for i in range(5))
+    assert (result.frames == frames).all()
+    assert (result.timed_out == timed_out).all()
@@ -0,0 +1,211 @@
+import random
+
+import pytest
+
+import broadcast
+from arena import ArenaMatch
+from engine import Match
+from replay import write_varint, read_varint
+from rng import RngStreams
+
+
+class FakeTransport:
+    """Collects what the broadcaster writes; backlog fakes a full socket"""
+
+    def __init__(self):
+        self.out = bytearray()
+        self.backlog = 0
+
+    def write(self, data):
+        self.out += data
+
+    def get_write_buffer_size(self):
+        return self.backlog
+
+
+@pytest.mark.parametrize("v, z", [(0, 0), (-1, 1), (1, 2), (-2, 3), (2, 4), (-64, 127), (64, 128)])
+def test_zigzag(v, z):
+    assert broadcast._zigzag(v) == z
+    assert broadcast._unzigzag(z) == v
+
+
+def test_zigzag_varint_round_trip():
+    values = [0, 1, -1, 63, -64, 64, -65, 8191, -8192, 2**31, -2**31, 2**40 + 3, -2**40]
+    out = bytearray()
+    for v in values:
+        write_varint(out, broadcast._zigzag(v))
+    pos = 0
+    for v in values:
+        z, pos = read_varint(out, pos)
+        assert broadcast._unzigzag(z) == v
+    assert pos == len(out)
+    assert len(out) < 4 * len(values)   # small magnitudes stay small either side of 0
+
+
+def played_states(seed=3, ticks=400):
+    match = Match(seed=seed)
+    states = {}
+    for tick in range(1, ticks + 1):
+        match.step()
+        states[tick] = broadcast.match_state(match, tick)
+    return states
+
+
+def test_encode_decode_full_and_delta():
+    states = played_states()
+    dec = broadcast.SnapshotDecoder()
+    assert dec.decode(broadcast.encode(1, 100, states[100]))[2:4] == states[100]
+    for tick in (103, 110, 160, 220):
+        payload = broadcast.encode(1, tick, states[tick], 100, states[100])
+        assert dec.decode(payload)[2:4] == states[tick]
+
+
+@pytest.mark.parametrize("n", [3, 12])
+def test_any_number_of_fighters(n):
+    match = ArenaMatch(n, seed=n)
+    states = {}
+    for tick in range(1, 91):
+        match.step()
+        states[tick] = broadcast.match_state(match, tick)
+    dec = broadcast.SnapshotDecoder()
+    assert dec.decode(broadcast.encode(1, 30, states[30]))[2:4] == states[30]
+    for tick in (33, 60, 90):
+        assert dec.decode(broadcast.encode(1, tick, states[tick], 30, states[30]))[2:4] == states[tick]
+    assert len(dec.states[90][0]) == n
+    with pytest.raises(ValueError):
+        broadcast.encode(1, 33, played_states()[33], 30, states[30])
+
+
+def test_prediction_hit_costs_one_byte_per_fighter():
+    states = played_states()
+    base = states[100]
+    fighters = tuple(broadcast.predict(f, 3) for f in base[0])
+    payload = broadcast.encode(1, 103, (fighters, base[1]), 100, base)
+    # round, tick, back, flags, then two zero masks and nothing else
+    assert payload[-2:] == b"\x00\x00" and len(payload) == 6
+    dec = broadcast.SnapshotDecoder()
+    dec.decode(broadcast.encode(1, 100, base))
+    assert dec.decode(payload)[2] == fighters
+
+
+def test_feed_reassembles_split_messages():
+    states = played_states()
+    stream = bytearray()
+    for tick in range(3, 301, 3):
+        base = (tick - 3, states[tick - 3]) if tick > 3 else ()
+        payload = broadcast.encode(1, tick, states[tick], *base)
+        stream += broadcast._LENGTH.pack(len(payload)) + payload
+    dec = broadcast.SnapshotDecoder()
+    got = []
+    for i in range(0, len(stream), 7):
+        got.extend(dec.feed(bytes(stream[i:i + 7])))
+    assert [s[1] for s in got] == list(range(3, 301, 3))
+    assert all((s[2], s[3]) == states[s[1]] for s in got)
+
+
+# === Broadcaster round trip ===
+# How each spectator acks: every snapshot, a random 30%, in shuffled batches
+# a few snapshots late, far too late (older than the host's history), never
+# at all, or every snapshot while its socket is often backed up.
+POLICIES = ("every", "dropped", "reordered", "stale", "never", "backlogged")
+
+
+class Watcher:
+    def __init__(self, broadcaster, policy, rng):
+        self.policy = policy
+        self.rng = rng
+        self.spectator = broadcast.Spectator(broadcaster)
+        self.transport = FakeTransport()
+        self.spectator.connection_made(self.transport)
+        self.decoder = broadcast.SnapshotDecoder()
+        self.pending = []        # acks not delivered yet
+        self.events = []
+        self.snapshots = 0
+        self.mismatches = 0
+
+    def receive(self, broadcaster):
+        if self.policy == "backlogged":
+            self.transport.backlog = broadcast.MAX_BUFFER + 1 if self.rng.random() < 0.3 else 0
+        snaps = self.decoder.feed(bytes(self.transport.out))
+        self.transport.out.clear()
+        for round_no, tick, fighters, pickups, events in snaps:
+            self.snapshots += 1
+            if round_no != broadcaster.round or (fighters, pickups) != broadcaster._states[tick]:
+                self.mismatches += 1
+            self.events.extend(events)
+            self.pending.append(tick)
+        self._ack()
+
+    def _ack(self):
+        p, pending = self.policy, self.pending
+        if p in ("every", "backlogged"):
+            send, self.pending = pending, []
+        elif p == "dropped":
+            send = [t for t in pending if self.rng.random() < 0.3]
+            self.pending = []
+        elif p == "reordered":
+            if len(pending) < 4:
+                return
+            send, self.pending = pending, []
+            self.rng.shuffle(send)
+        elif p == "stale":
+            keep = broadcast.HISTORY_TICKS // broadcast.SEND_EVERY + 5
+            send, self.pending = pending[:-keep], pending[-keep:]
+        else:
+            send, self.pending = [], []
+        for tick in send:
+            data = broadcast.ack(tick)
+            self.spectator.data_received(data[:1])   # acks may arrive split
+            self.spectator.data_received(data[1:])
+
+
+@pytest.fixture(scope="module")
+def broadcast_run():
+    b = broadcast.Broadcaster()
+    rng = random.Random(11)
+    watchers = {p: Watcher(b, p, random.Random(rng.random())) for p in POLICIES}
+    streams = RngStreams(7)
+    events = []
+    backwards = 0            # times a spectator's acked tick went down
+    for _ in range(2):
+        match = Match(seed=streams.next_seed("rounds"))
+        b.new_round()
+        after = 0
+        while after < 60:
+            evs = match.step()
+            b.publish(match, evs)
+            events.extend(evs)
+            if match.over:
+                after += 1
+            for w in watchers.values():
+                before = w.spectator.acked
+                w.receive(b)
+                if before is not None and w.spectator.acked < before:
+                    backwards += 1
+    return b, watchers, events, backwards
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+def test_every_snapshot_decodes_to_the_host_state(broadcast_run, policy):
+    b, watchers, events, _ = broadcast_run
+    w = watchers[policy]
+    assert w.snapshots > 100
+    assert w.mismatches == 0
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+def test_events_are_delivered_exactly_once(broadcast_run, policy):
+    b, watchers, events, _ = broadcast_run
+    assert len(events) > 20
+    assert watchers[policy].events == events
+
+
+def test_acks_pick_the_base(broadcast_run):
+    b, watchers, _, backwards = broadcast_run
+    # shuffled acks never move a spectator's base backwards
+    assert backwards == 0
+    assert watchers["never"].spectator.acked is None
+    assert watchers["stale"].spectator.acked < b.tick - broadcast.HISTORY_TICKS
+    assert b.skipped > 0
+    # spectators sharing a base share one encode
+    assert b.encodes < b.snapshots
@@ -0,0 +1,34 @@
+import pytest
+
+from engine import Match, MatchConfig, MAX_ROUND_FRAMES
+from event_sim import EventMatch
+
+
+def same_result(a, b):
+    return (a.winner, a.frames, a.timed_out, a.stats) == (b.winner, b.frames, b.timed_out, b.stats)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_matches_engine_with_pickups(seed):
+    # default rules: pickups spawn, expire, heal and grant invincibility
+    assert same_result(EventMatch(seed=seed).run(), Match(seed=seed).run())
+
+
+@pytest.mark.parametrize("config", [
+    MatchConfig(pickup_chance=0.2, pickup_cooldown=30, pickup_lifetime=90),
+    MatchConfig(dx=7, dy=2, damage=25, invincibility_frames=40),
+    MatchConfig(max_pickups=0),
+])
+def test_matches_engine_on_other_configs(config):
+    for seed in range(10):
+        assert same_result(EventMatch(config, seed=seed).run(), Match(config, seed=seed).run())
+
+
+@pytest.mark.parametrize("seed", [3, 11])
+def test_round_cap_is_a_draw(seed):
+    # without damage nobody can be knocked out, so the round runs into the cap
+    config = MatchConfig(damage=0)
+    event, scalar = EventMatch(config, seed=seed).run(), Match(config, seed=seed).run()
+    assert same_result(event, scalar)
+    assert event.winner is None and event.timed_out
+    assert event.frames == MAX_ROUND_FRAMES
@@ -0,0 +1,117 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from arena import ArenaMatch
+from fighter import Fighter
+from fighter_store import FighterStore, FighterView
+
+ARENA = (50, 50, 500, 300)
+SPAWNS = [(60, 60, 4, 3), (200, 100, -4, 3), (300, 200, 4, -3), (400, 250, -4, -3)]
+COLORS = [(255, 0, 0), (0, 0, 255), (0, 255, 0), (255, 255, 0)]
+
+
+def make_pair(health=25):
+    store = FighterStore(SPAWNS, COLORS, 50, 50, health, *ARENA)
+    objects = [Fighter(x, y, dx, dy, 50, 50, color, health, *ARENA)
+               for (x, y, dx, dy), color in zip(SPAWNS, COLORS)]
+    return store, objects
+
+
+def test_damage_with_repeated_indices_matches_sequential_hits():
+    store, objects = make_pair(health=25)
+    store.views[3].grant_invincibility(30); objects[3].grant_invincibility(30)
+    # fighter 0 is hit three times (the third finds it at 0), 1 twice, 3 is invincible
+    idx = [0, 1, 0, 3, 0, 2, 1]
+    applied = store.damage(idx, 10)
+    expected = [objects[i].take_damage(10) for i in idx]
+    assert applied.tolist() == expected == [10, 10, 10, 0, 5, 10, 10]
+    assert store.health.tolist() == [f.health for f in objects]
+    assert store.hurt_timer.tolist() == [f.hurt_timer for f in objects]
+
+
+def test_damage_edge_cases():
+    store, _ = make_pair()
+    assert store.damage([], 10).tolist() == []
+    assert store.damage([0, 0], 0).tolist() == [0, 0]
+    assert store.health.tolist() == [25] * 4
+
+
+def test_view_reads_and_writes_the_arrays():
+    store, objects = make_pair()
+    view = store.view(1)
+    assert isinstance(view, FighterView) and view is store.views[1]
+    f = objects[1]
+    for name in ("x", "y", "dx", "dy", "health", "displayed_health", "invincible",
+                 "invincible_timer", "hurt_timer", "width", "height", "max_health", "base_color"):
+        assert getattr(view, name) == getattr(f, name), name
+    assert type(view.x) is int   # plain Python values, not NumPy scalars
+
+    view.x = 123; view.dy = -7; view.hurt_timer = 4
+    assert (store.x[1], store.dy[1], store.hurt_timer[1]) == (123, -7, 4)
+    view.base_color = (1, 2, 3)
+    assert store.base_color[1] == (1, 2, 3)
+    with pytest.raises(AttributeError):
+        view.colour = (0, 0, 0)   # __slots__: no stray attributes
+
+
+def test_view_methods_match_fighter():
+    store, objects = make_pair()
+    view, f = store.view(2), objects[2]
+    assert view.take_damage(10) == f.take_damage(10)
+    view.heal(4); f.heal(4)
+    view.heal(100); f.heal(100)
+    view.grant_invincibility(12); f.grant_invincibility(12)
+    assert view.take_damage(10) == f.take_damage(10) == 0
+    assert (view.health, view.invincible, view.invincible_timer) == (f.health, f.invincible, f.invincible_timer)
+    assert view.get_rect() == f.get_rect()
+    assert view.collides_with(store.view(1)) == f.collides_with(objects[1])
+
+    for _ in range(20):
+        store.move(); store.update_effects()
+        for g in objects:
+            g.move(); g.update_effects()
+    for v, g in zip(store.views, objects):
+        assert (v.x, v.y, v.dx, v.dy, v.invincible, v.invincible_timer, v.hurt_timer) == \
+               (g.x, g.y, g.dx, g.dy, g.invincible, g.invincible_timer, g.hurt_timer)
+        assert v.trail_positions == g.trail_positions
+
+
+def test_ease_health_matches_update_health_bar_value():
+    store, objects = make_pair(health=40)
+    rng = np.random.default_rng(6)
+    for step in range(160):
+        if step % 7 == 0 and step < 120:
+            hits = rng.integers(0, 4, size=3)
+            store.damage(hits, 6)
+            for i in hits.tolist():
+                objects[i].take_damage(6)
+        if step % 11 == 0 and step < 120:
+            store.view(step % 4).heal(9); objects[step % 4].heal(9)
+        store.ease_health()
+        for f in objects:
+            f.update_health_bar_value()
+        assert store.displayed_health.tolist() == [f.displayed_health for f in objects]
+    assert store.displayed_health.tolist() == store.health.tolist()
+
+    view, f = store.view(1), objects[1]
+    view.take_damage(5); f.take_damage(5)
+    for _ in range(3):
+        view.update_health_bar_value(speed=2); f.update_health_bar_value(speed=2)
+        assert view.displayed_health == f.displayed_health
+
+
+def fighter_rows(match):
+    return [(f.x, f.y, f.dx, f.dy, f.health, f.displayed_health, f.invincible,
+             f.invincible_timer, f.hurt_timer) for f in match.fighters]
+
+
+@pytest.mark.parametrize("n,seed", [(2, 1), (5, 2), (30, 3), (120, 4)])
+def test_arena_arrays_backend_matches_objects(n, seed):
+    objects = ArenaMatch(n, seed=seed, fighters="objects")
+    arrays = ArenaMatch(n, seed=seed, fighters="arrays")
+    while not objects.over:
+        assert arrays.step() == objects.step()
+        assert fighter_rows(arrays) == fighter_rows(objects)
+    assert arrays.over
+    assert (arrays.winner, arrays.frame, arrays.stats) == (objects.winner, objects.frame, objects.stats)
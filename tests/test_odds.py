@@ -0,0 +1,37 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import odds
+
+
+class CountingPool(ThreadPoolExecutor):
+    """Thread pool that records how many chunks were handed to it"""
+
+    def __init__(self, workers):
+        super().__init__(max_workers=workers)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+def test_in_flight_chunks_follow_the_pool_size():
+    with CountingPool(1) as pool:
+        est = odds.estimate_odds(precision=1.0, chunk=64, seed=1, pool=pool)
+    assert est.rounds == 64
+    assert pool.submitted == 2       # two per worker, not two per CPU
+
+
+def test_pool_matches_in_process_estimate():
+    with CountingPool(2) as pool:
+        pooled = odds.estimate_odds(precision=0.1, chunk=128, seed=4, pool=pool)
+    local = odds.estimate_odds(precision=0.1, chunk=128, seed=4, workers=0)
+    assert pooled.counts == local.counts
+
+
+def test_importing_the_game_starts_no_pool():
+    import main
+    assert main.odds_pool is None
+    main.prepare_next_round()
+    assert main.odds_future.result(timeout=120).rounds > 0
+    assert main.odds_pool is None    # that estimate ran on a pool of its own
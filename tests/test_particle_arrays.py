@@ -0,0 +1,95 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from particle_arrays import ArrayParticleSystem, TYPE_NAMES
+from particles import Particle
+
+
+def test_grows_from_zero_capacity():
+    ps = ArrayParticleSystem((0, 0, 600, 400), capacity=0, seed=1)
+    ps.add_explosion(300, 200, (255, 0, 0), count=20)
+    assert len(ps) > 0
+    assert len(ps.x) >= len(ps)
+    ps.update()
+
+
+class MidRng:
+    """Stands in for both random.Random and a NumPy Generator: every draw is
+    the middle of its range, so wind and bounce jitter are exactly zero"""
+
+    def uniform(self, low, high, size=None):
+        mid = (low + high) / 2
+        return mid if size is None else np.full(size, mid)
+
+
+def objects_from_rows(ps, bounds):
+    """Particle objects holding exactly the array system's live rows"""
+    out = []
+    for i in range(len(ps)):
+        name = TYPE_NAMES[int(ps.ptype[i])]
+        p = Particle(ps.x[i], ps.y[i], tuple(ps.color[i].tolist()), ps.width[i], ps.height[i],
+                     int(ps.lifetime[i]), name, bounds, random.Random(0))
+        p.dx, p.dy = float(ps.dx[i]), float(ps.dy[i])
+        p.lifetime = int(ps.lifetime[i])
+        p.base_color = tuple(ps.base_color[i].tolist())
+        out.append(p)
+    return out
+
+
+def rows(ps):
+    n = len(ps)
+    return list(zip(ps.x[:n].tolist(), ps.y[:n].tolist(), ps.dx[:n].tolist(), ps.dy[:n].tolist(),
+                    ps.age[:n].tolist(), map(tuple, ps.color[:n].tolist())))
+
+
+def test_update_matches_particle_update():
+    bounds = (50, 50, 200, 120)
+    ps = ArrayParticleSystem(bounds, seed=3)
+    ps.add_explosion(70, 60, (200, 60, 60), count=30)      # near a corner: lots of bounces
+    ps.add_damage_sparks(150, 100, (120, 170, 255), count=10)
+    ps.add_pickup_glow(240, 160, (34, 197, 94), count=8)
+    ps._emit(150, 100, (90, 90, 90), 5, 5, 40, "normal", 6)
+    objects = objects_from_rows(ps, bounds)
+    ps.rng = rng = MidRng()
+    assert len(objects) == 64
+    frames = bounces = 0
+    while objects:
+        ps.update()
+        for p in objects:
+            p.update((0, 0), rng)
+        objects = [p for p in objects if not p.dead]   # survivors keep their order
+        assert rows(ps) == [(p.x, p.y, p.dx, p.dy, p.age, p.color) for p in objects]
+        frames += 1
+        bounces += sum(p.bounced for p in objects)
+    assert len(ps) == 0 and frames >= 20 and bounces > 0
+
+
+def test_spark_fades_and_dies_at_its_lifetime():
+    ps = ArrayParticleSystem(None, seed=1)
+    ps.add_damage_sparks(300, 200, (255, 255, 200), count=5)
+    lifetime = int(ps.lifetime[0])
+    greens = []
+    for _ in range(lifetime - 1):
+        ps.update()
+        greens.append(int(ps.color[0, 1]))
+    assert len(ps) == 5
+    assert greens[:lifetime // 3] == [255] * (lifetime // 3)
+    assert greens == sorted(greens, reverse=True) and greens[-1] < 40
+    ps.update()
+    assert len(ps) == 0
+
+
+def test_wall_bounces_keep_particles_inside():
+    ax, ay, aw, ah = bounds = (50, 50, 100, 60)
+    ps = ArrayParticleSystem(bounds, seed=2)
+    for _ in range(5):
+        ps.add_explosion(100, 80, (255, 0, 0), count=40)
+        for _ in range(12):
+            ps.update()
+            n = len(ps)
+            assert ((ps.x[:n] >= ax) & (ps.x[:n] <= ax + aw)).all()
+            assert ((ps.y[:n] >= ay) & (ps.y[:n] <= ay + ah)).all()
+    assert ps.bounced[:len(ps)].any()
@@ -0,0 +1,59 @@
+import random
+
+from particles import Particle, ParticleRenderer, quantize_color, quantize_size
+
+BOUNDS = (50, 50, 500, 300)
+
+
+def fade_sparks(renderer, count, rng):
+    """Run `count` sparks to death, fetching a sprite every frame; returns
+    the distinct unquantized (w, h, colour) they asked for"""
+    raw = set()
+    for _ in range(count):
+        p = Particle(300, 200, (255, 255, rng.randrange(256)), 8, 8, 18, "spark", BOUNDS, rng)
+        while not p.dead:
+            p.update(rng=rng)
+            w, h = p.size()
+            raw.add((w, h, p.color))
+            renderer.sprite(w, h, p.color, p.particle_type)
+    return raw
+
+
+def test_fading_sparks_share_a_bounded_set_of_sprites():
+    renderer = ParticleRenderer()
+    rng = random.Random(1)
+    raw = fade_sparks(renderer, 200, rng)
+    cached = len(renderer._sprites)
+    assert len(raw) > 500
+    assert cached < len(raw) // 5
+    # a second wave of the same sparks is (almost) all cache hits
+    fade_sparks(renderer, 200, rng)
+    assert len(renderer._sprites) - cached < 10
+
+
+def test_quantized_sprites_keep_their_look():
+    assert quantize_color((255, 255, 255)) == (255, 255, 255)
+    assert quantize_color((0, 7, 8)) == (0, 0, 16)
+    assert [quantize_size(v) for v in range(1, 13)] == [1, 2, 3, 4, 4, 6, 6, 8, 8, 10, 10, 12]
+    renderer = ParticleRenderer()
+    surf = renderer.sprite(5, 3, (250, 100, 3))
+    assert surf.get_size() == (4, 3)
+    assert tuple(surf.get_at((0, 0)))[:3] == (255, 96, 0)
+    assert renderer.sprite(4, 3, (255, 97, 1)) is surf
+
+
+def test_particle_type_is_part_of_the_key():
+    renderer = ParticleRenderer()
+    assert renderer.sprite(4, 4, (255, 0, 0), "spark") is not renderer.sprite(4, 4, (255, 0, 0), "trail")
+    assert len(renderer._sprites) == 2
+
+
+def test_full_cache_evicts_the_least_recently_used():
+    renderer = ParticleRenderer(max_sprites=3)
+    a, b, c = (renderer.sprite(2, 2, (i * 64, 0, 0)) for i in range(3))
+    assert renderer.sprite(2, 2, (0, 0, 0)) is a    # touch a; b is now the coldest
+    renderer.sprite(2, 2, (255, 255, 255))
+    assert len(renderer._sprites) == 3
+    assert renderer.sprite(2, 2, (0, 0, 0)) is a
+    assert renderer.sprite(2, 2, (128, 0, 0)) is c
+    assert renderer.sprite(2, 2, (64, 0, 0)) is not b
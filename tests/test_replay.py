@@ -0,0 +1,73 @@
+import pytest
+
+import replay
+from engine import Match
+from replay import (MatchRecorder, Replay, ReplayPlayer, pack_state, read_varint, write_varint,
+                    pack_event, unpack_event)
+
+SEED = 5
+INTERVAL = 60
+
+
+@pytest.fixture(scope="module")
+def recorded():
+    """A small recorded round: its bytes, the scalar result, and every
+    frame's packed state from a plain Match for comparison"""
+    recorder = MatchRecorder(Match(seed=SEED), interval=INTERVAL)
+    result = recorder.run()
+    match = Match(seed=SEED)
+    states = [pack_state(match)]
+    while not match.over:
+        match.step()
+        states.append(pack_state(match))
+    return recorder.to_bytes(), result, states
+
+
+@pytest.mark.parametrize("n", [0, 1, 127, 128, 255, 300, 16383, 16384, 2 ** 32 + 5])
+def test_varint_round_trip(n):
+    out = bytearray(b"\xff")
+    write_varint(out, n)
+    assert len(out) - 1 == max(1, -(-n.bit_length() // 7))
+    assert read_varint(bytes(out), 1) == (n, len(out))
+
+
+def test_event_round_trip():
+    events = [("pickup_spawn", "health", 120, 200), ("pickup_expired", "inv", 60, 70),
+              ("pickup_taken", "inv", 300, 100, 2), ("collision", 10, 0, (250, 180)),
+              ("ko", 1), ("round_over", "BLUE"), ("round_over", None)]
+    data = b"".join(pack_event(ev) for ev in events)
+    pos = 0
+    for ev in events:
+        got, pos = unpack_event(data, pos)
+        assert got == ev
+    assert pos == len(data)
+
+
+def test_recording_replays_to_same_result(recorded):
+    data, result, _ = recorded
+    rep = Replay(data)
+    assert rep.seed == SEED and rep.interval == INTERVAL
+    assert (rep.winner, rep.frames) == (result.winner, result.frames)
+    assert len(rep.keyframes) == result.frames // INTERVAL + 1
+    played = ReplayPlayer(rep).fast_forward()
+    assert (played.winner, played.frames, played.stats) == (result.winner, result.frames, result.stats)
+
+
+def test_seek_lands_on_the_recorded_state(recorded):
+    data, result, states = recorded
+    player = ReplayPlayer(Replay(data))
+    for frame in (0, 1, INTERVAL - 1, INTERVAL, INTERVAL + 1, 3 * INTERVAL + 17, 2000,
+                  result.frames):
+        player.seek(frame)
+        assert player.frame == frame
+        assert pack_state(player.match) == states[frame]
+    player.seek(result.frames + 500)   # clamped to the end
+    assert player.frame == result.frames and player.finished
+
+
+def test_rejects_foreign_data(recorded):
+    data, _, _ = recorded
+    with pytest.raises(ValueError):
+        Replay(b"NOPE" + data[4:])
+    with pytest.raises(ValueError):
+        Replay(data[:4] + bytes([replay.VERSION + 1]) + data[5:])
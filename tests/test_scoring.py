@@ -0,0 +1,97 @@
+import asyncio
+import json
+from concurrent.futures import Future
+
+import pytest
+
+import server
+from odds import OddsEstimate
+from rng import RngStreams
+from scoring import START_SCORE, POINT_WIN, POINT_LOSS, fair_payout, bet_delta
+
+
+def estimate(red, blue, draw):
+    return OddsEstimate({"RED": red, "BLUE": blue, "DRAW": draw}, 0.95)
+
+
+class FakeBettor:
+    def __init__(self):
+        self.score = START_SCORE
+        self.sent = []
+
+    def send(self, msg):
+        self.sent.append(msg)
+
+
+def test_fair_payout():
+    assert fair_payout(POINT_WIN, 0.5) == POINT_WIN
+    assert fair_payout(POINT_WIN, 0.25) == 3 * POINT_WIN
+    assert fair_payout(POINT_WIN, 0.4, 0.2) == POINT_WIN
+    assert fair_payout(POINT_WIN, 0.0, 0.1) == fair_payout(POINT_WIN, 0.02, 0.1) == 1100
+    assert fair_payout(POINT_WIN, 0.99) == 1
+
+
+def test_bet_delta():
+    odds = estimate(20, 70, 10)
+    assert bet_delta("RED", None, odds) == 0
+    assert bet_delta("RED", "BLUE", odds) == POINT_LOSS
+    assert bet_delta("RED", "RED") == POINT_WIN
+    assert bet_delta("RED", "RED", odds) == fair_payout(POINT_WIN, 0.2, 0.1) == 88
+    assert bet_delta("BLUE", "BLUE", odds) == fair_payout(POINT_WIN, 0.7, 0.1) == 7
+
+
+def play_out(table):
+    while table.phase != server.RESULT:
+        table.tick()
+
+
+def test_table_prices_bets_when_they_are_placed():
+    odds = estimate(20, 70, 10)
+    future = Future()
+    table = server.Table(0, RngStreams(3), betting_ticks=10, result_ticks=1,
+                         pricer=lambda spawns, seed: future)
+    early, late = FakeBettor(), FakeBettor()
+    table.place(early, "RED")
+    future.set_result(odds)
+    table.tick()
+    assert table.odds is odds
+    table.place(late, "RED")
+    play_out(table)
+    winner = table.match.winner
+    for bettor, priced in ((early, None), (late, odds)):
+        score = bettor.sent[-1]
+        assert score["op"] == "score"
+        assert score["delta"] == bet_delta("RED", winner, priced)
+        assert score["pays"] == bet_delta("RED", "RED", priced)
+    pushed = early.sent[0]   # betting watches the table, so the price is pushed
+    assert pushed["op"] == "odds" and pushed["pays"] == {"RED": 88, "BLUE": 7}
+
+
+def test_stop_awaits_ticker_and_clients():
+    async def run():
+        host = server.MatchHost(matches=2, seed=1)
+        port = await host.start(port=0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b'{"op": "hello"}\n')
+        assert json.loads(await reader.readline())["op"] == "welcome"
+        await host.stop()
+        assert host._ticker.cancelled()
+        assert not host._clients
+        assert await reader.read() == b""
+        writer.close()
+
+    asyncio.run(run())
+
+
+def test_stop_before_or_after_a_failed_start():
+    async def run():
+        await server.MatchHost(matches=1).stop()
+        first = server.MatchHost(matches=1)
+        port = await first.start(port=0)
+        second = server.MatchHost(matches=1)
+        with pytest.raises(OSError):
+            await second.start(port=port)   # already taken
+        await second.stop()
+        await first.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,68 @@
+import itertools
+import random
+
+import pygame
+import pytest
+
+from spatial import SpatialHash
+
+CELL = 32
+
+
+def random_boxes(rng, n, big=False):
+    """Boxes on a small field so many overlap; sizes run from 1px to (with
+    big=True) several cells, and positions are snapped to the grid often
+    enough that boxes start, end and touch exactly on cell borders"""
+    boxes = {}
+    for k in range(n):
+        w = rng.randint(1, 4 * CELL if big else CELL)
+        h = rng.randint(1, 4 * CELL if big else CELL)
+        if rng.random() < 0.3:
+            x, y = rng.randint(-2, 8) * CELL, rng.randint(-2, 8) * CELL
+            x -= w * rng.randint(0, 1)   # sometimes end on the border instead
+        else:
+            x, y = rng.randint(-2 * CELL, 8 * CELL), rng.randint(-2 * CELL, 8 * CELL)
+        boxes[k] = (x, y, w, h)
+    return boxes
+
+
+def brute_pairs(boxes):
+    rects = {k: pygame.Rect(b) for k, b in boxes.items()}
+    return [(a, b) for a, b in itertools.combinations(sorted(boxes), 2)
+            if rects[a].colliderect(rects[b])]
+
+
+def build(boxes):
+    grid = SpatialHash(CELL)
+    for k, b in boxes.items():
+        grid.insert(k, *b)
+    return grid
+
+
+@pytest.mark.parametrize("seed,big", [(1, False), (2, False), (3, True), (4, True)])
+def test_pairs_match_brute_force(seed, big):
+    rng = random.Random(seed)
+    for _ in range(20):
+        boxes = random_boxes(rng, 60, big)
+        want = brute_pairs(boxes)
+        assert build(boxes).pairs() == want
+    assert want   # the field is crowded enough to overlap
+
+
+@pytest.mark.parametrize("seed", [5, 6])
+def test_query_matches_brute_force(seed):
+    rng = random.Random(seed)
+    boxes = random_boxes(rng, 80, big=True)
+    grid = build(boxes)
+    for probe in random_boxes(rng, 50, big=True).values():
+        r = pygame.Rect(probe)
+        assert grid.query(*probe) == sorted(k for k, b in boxes.items() if r.colliderect(b))
+
+
+def test_touching_edges_and_exact_borders():
+    grid = build({0: (0, 0, CELL, CELL), 1: (CELL, 0, CELL, CELL),      # share an edge only
+                  2: (CELL - 1, CELL - 1, 2, 2),                         # straddles four cells
+                  3: (-CELL, -CELL, 5 * CELL, 5 * CELL)})                # covers everything
+    assert grid.pairs() == [(0, 2), (0, 3), (1, 2), (1, 3), (2, 3)]
+    grid.clear()
+    assert grid.pairs() == [] and grid.query(0, 0, CELL, CELL) == []